@@ -1,21 +1,68 @@
-from .elevenlabs_sfx import generate_sfx_audio_elevenlabs
-from .elevenlabs_tts import generate_tts_audio_elevenlabs
-from .iembrace import generate_personalized_meditation, generate_tts_audio_iembrace
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from .elevenlabs_sfx import generate_sfx_audio_elevenlabs, generate_sfx_audio_elevenlabs_async
+from .elevenlabs_tts import (
+    generate_tts_audio_elevenlabs,
+    generate_tts_audio_elevenlabs_async,
+    generate_tts_audio_elevenlabs_chunked_async,
+    split_tts_script,
+    stream_tts_audio_elevenlabs,
+    stream_tts_audio_elevenlabs_async,
+)
+from .iembrace import (
+    generate_personalized_meditation,
+    generate_personalized_meditation_async,
+    generate_tts_audio_iembrace,
+    generate_tts_audio_iembrace_async,
+)
+from .tts_routing import TTSRouter, generate_tts_audio_routed_async
 from .types import SFXRequest, SFXResult, TTSRequest, TTSResult
 
-_ahap_import_error: Exception | None = None
-try:
-    from .ahap import convert_wav_to_ahap, generate_ahap, generate_ahap_from_file
-except ModuleNotFoundError as exc:
-    _ahap_import_error = exc
+if TYPE_CHECKING:
+    from .ahap import (
+        convert_wav_to_ahap,
+        generate_ahap,
+        generate_ahap_details_from_audio,
+        generate_ahap_from_audio,
+        generate_ahap_from_file,
+    )
+    from .ahap_batch import convert_wavs_to_ahap
+
+# AHAP generation pulls in numpy (and librosa/numba/scipy when installed), so it is
+# only imported on first use.
+_LAZY_ATTRIBUTES = {
+    "convert_wav_to_ahap": ".ahap",
+    "generate_ahap": ".ahap",
+    "generate_ahap_from_audio": ".ahap",
+    "generate_ahap_details_from_audio": ".ahap",
+    "generate_ahap_from_file": ".ahap",
+    "convert_wavs_to_ahap": ".ahap_batch",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+
+    try:
+        value = getattr(import_module(module_name, __name__), name)
+    except ModuleNotFoundError as exc:
+        ahap_import_error = exc
+
+        def _raise_missing_ahap_dependency(*args, **kwargs):  # type: ignore[no-untyped-def]
+            msg = f"AHAP generation requires optional dependency '{ahap_import_error.name}'."
+            raise RuntimeError(msg) from ahap_import_error
+
+        value = _raise_missing_ahap_dependency
 
-    def _raise_missing_ahap_dependency(*args, **kwargs):  # type: ignore[no-untyped-def]
-        msg = "AHAP generation requires optional dependency 'librosa'."
-        raise RuntimeError(msg) from _ahap_import_error
+    globals()[name] = value
+    return value
 
-    convert_wav_to_ahap = _raise_missing_ahap_dependency
-    generate_ahap = _raise_missing_ahap_dependency
-    generate_ahap_from_file = _raise_missing_ahap_dependency
 
 __all__ = [
     "SFXRequest",
@@ -23,10 +70,23 @@ __all__ = [
     "TTSRequest",
     "TTSResult",
     "generate_personalized_meditation",
+    "generate_personalized_meditation_async",
     "generate_tts_audio_iembrace",
+    "generate_tts_audio_iembrace_async",
     "generate_tts_audio_elevenlabs",
+    "generate_tts_audio_elevenlabs_async",
+    "generate_tts_audio_elevenlabs_chunked_async",
+    "split_tts_script",
+    "stream_tts_audio_elevenlabs",
+    "stream_tts_audio_elevenlabs_async",
+    "TTSRouter",
+    "generate_tts_audio_routed_async",
     "generate_sfx_audio_elevenlabs",
+    "generate_sfx_audio_elevenlabs_async",
     "generate_ahap",
     "convert_wav_to_ahap",
     "generate_ahap_from_file",
+    "generate_ahap_from_audio",
+    "generate_ahap_details_from_audio",
+    "convert_wavs_to_ahap",
 ]
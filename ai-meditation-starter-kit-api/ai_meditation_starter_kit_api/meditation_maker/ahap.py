@@ -1,12 +1,96 @@
 from __future__ import annotations
 
+import io
 import json
+import math
 import os
+import time
+import uuid
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO, TextIO
 
-import librosa
 import numpy as np
-from tqdm import tqdm
+
+from . import ahap_numpy
+from .ahap_cache import AhapCache, ahap_cache_key, default_ahap_cache, hash_audio
+from .ahap_compact import (
+    COMPACT_MERGE_TOLERANCE,
+    compact_continuous_pattern,
+    reconstruct_continuous_envelope,
+    round_floats,
+)
+from .ahap_hooks import AhapHooks, track_stage
+from .audio_decoding import WAVE_FORMAT_IEEE_FLOAT, WAVE_FORMAT_PCM, read_wav_info, wav_header
+
+try:
+    import librosa
+    import soundfile
+    from scipy.ndimage import median_filter
+except (ModuleNotFoundError, OSError):
+    # Without the librosa stack (or with soundfile installed but libsndfile missing),
+    # the NumPy backend keeps AHAP generation available.
+    librosa = None
+    soundfile = None
+    median_filter = None
+
+# Frame sizes at the reference rate; other analysis rates scale them to keep the
+# same frame spacing and bin width (see `_analysis_frame_sizes`).
+_REFERENCE_SAMPLE_RATE = 44100
+_FEATURE_HOP_LENGTH = 512
+_HPSS_N_FFT = 2048
+_ONSET_N_MELS = 128
+_HPSS_KERNEL_SIZE = 31
+_BASS_MARGIN = (1.0, 20.0)
+_ENERGY_WINDOW_SECONDS = 0.02
+_CENTROID_WINDOW_SECONDS = 0.05
+_ONSET_TOP_DB = 80.0
+_CONTINUOUS_TIME_STEP = 0.1
+_STREAM_BLOCK_SECONDS = 30.0
+_STREAM_CONTEXT_SECONDS = 1.0
+# Analysis rate for fast mode: a quarter of the reference rate keeps the 44.1 kHz
+# frame grid exactly and still covers speech and most SFX energy (see `fidelity_report`).
+FAST_ANALYSIS_SAMPLE_RATE = 11025
+_SPLIT_TARGETS = ("bass", "vocals", "drums", "other")
+_SPLIT_PROFILE_MULTIPLIERS = {
+    "vocals": (1.2, 1.1),
+    "drums": (1.5, 1.3),
+    "bass": (1.4, 0.9),
+    "other": (1.3, 1.2),
+}
+
+
+AHAP_BACKENDS = ("auto", "librosa", "numpy")
+
+
+def _resolve_backend(backend: str) -> str:
+    """Return the concrete analysis backend; ``auto`` prefers librosa when it is installed."""
+    if backend not in AHAP_BACKENDS:
+        msg = f"Unknown AHAP backend '{backend}'. Expected one of: {', '.join(AHAP_BACKENDS)}."
+        raise ValueError(msg)
+    if backend == "auto":
+        return "librosa" if librosa is not None else "numpy"
+    if backend == "librosa" and librosa is None:
+        msg = "The librosa AHAP backend requires optional dependency 'librosa'."
+        raise RuntimeError(msg)
+    return backend
+
+
+def _analysis_frame_sizes(sample_rate: int) -> tuple[int, int, int]:
+    """Return `(n_fft, hop_length, n_mels)` for analyzing audio at `sample_rate`.
+
+    Sizes scale with the rate so STFT frames stay ~11.6 ms apart with ~21.5 Hz
+    bins; a lower analysis rate only drops the top of the spectrum. The mel band
+    count shrinks with the bin count so no mel filter ends up empty.
+    """
+    scale = sample_rate / _REFERENCE_SAMPLE_RATE
+    hop_length = max(int(round(_FEATURE_HOP_LENGTH * scale)), 1)
+    n_fft = hop_length * (_HPSS_N_FFT // _FEATURE_HOP_LENGTH)
+    n_mels = min(_ONSET_N_MELS, max(int(round(_ONSET_N_MELS * scale)), 1))
+    return n_fft, hop_length, n_mels
 
 
 def _canonical_split(split: str) -> str:
@@ -21,80 +105,260 @@ def _safe_peak(signal: np.ndarray) -> float:
     return peak if peak > 0 else 1.0
 
 
-def write_ahap_file(output_ahap: str, ahap_data: dict[str, object]) -> None:
-    with open(output_ahap, "w", encoding="utf-8") as f:
-        json.dump(ahap_data, f, indent=2)
+def serialize_ahap(ahap_data: dict[str, object], compact: bool = False) -> str:
+    """Serialize an AHAP payload, minified with bounded float precision when `compact`."""
+    if compact:
+        return json.dumps(round_floats(ahap_data), separators=(",", ":"))
+    return json.dumps(ahap_data, indent=2)
 
 
-def calculate_parameters(
-    audio_data: np.ndarray,
-    time: float,
-    sample_rate: int,
+@contextmanager
+def _atomic_writer(output_path: str) -> Iterator[TextIO]:
+    """Write to a temporary sibling file and move it over `output_path` on success."""
+    temp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_path, "x", encoding="utf-8") as f:
+            yield f
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def write_ahap_file(output_ahap: str, ahap_data: dict[str, object], compact: bool = False) -> None:
+    with _atomic_writer(output_ahap) as f:
+        f.write(serialize_ahap(ahap_data, compact=compact))
+
+
+def write_ahap_events(
+    output_ahap: str,
+    events: HapticEvents,
     split: str,
-    sharpness_factor: float = 3.0,
-    intensity_factor: float = 2.5,
-) -> tuple[float, float]:
-    split = _canonical_split(split)
+    compact: bool = False,
+) -> int:
+    """Write the AHAP payload for one split entry by entry, without building it in memory.
+
+    Returns the number of pattern entries written.
+    """
+    separator = "," if compact else ",\n"
+    entry_count = 0
+    with _atomic_writer(output_ahap) as f:
+        f.write('{"Version":1.0,"Pattern":[' if compact else '{"Version": 1.0, "Pattern": [\n')
+        for entry in iter_ahap_pattern(events, split, compact=compact):
+            if entry_count:
+                f.write(separator)
+            if compact:
+                f.write(json.dumps(round_floats(entry), separators=(",", ":")))
+            else:
+                f.write(json.dumps(entry))
+            entry_count += 1
+        f.write("]}" if compact else "\n]}\n")
+    return entry_count
+
+
+@dataclass(slots=True)
+class AudioFeatures:
+    """Frame-level features computed once for a whole signal."""
+
+    sample_rate: int
+    hop_length: int
+    rms: np.ndarray
+    centroid: np.ndarray
+    onset_envelope: np.ndarray
+    peak: float
+
+    def frames_for_times(self, times: np.ndarray) -> np.ndarray:
+        frames = np.round(np.asarray(times) * self.sample_rate / self.hop_length).astype(int)
+        return np.clip(frames, 0, max(len(self.rms) - 1, 0))
+
+
+@dataclass(slots=True)
+class Decomposition:
+    """Harmonic, percussive and bass tracks derived from one shared STFT.
+
+    Tracks that were not requested from `decompose_audio` are left as `None`.
+    """
+
+    magnitude: np.ndarray
+    harmonic: np.ndarray | None = None
+    percussive: np.ndarray | None = None
+    bass: np.ndarray | None = None
+
+
+def decompose_audio(
+    audio_data: np.ndarray,
+    tracks: tuple[str, ...] = ("harmonic", "bass"),
+    kernel_size: int = _HPSS_KERNEL_SIZE,
+    bass_margin: tuple[float, float] = _BASS_MARGIN,
+    n_fft: int = _HPSS_N_FFT,
+    hop_length: int = _FEATURE_HOP_LENGTH,
+    backend: str = "librosa",
+) -> Decomposition:
+    """Split a signal into harmonic/percussive/bass tracks with a single STFT.
+
+    This matches running `librosa.effects.hpss` once with the default margin and
+    once with `bass_margin`, but the STFT and both median filters are computed once
+    and only the requested `tracks` are inverted back to the time domain.
+    """
+    unknown_tracks = set(tracks) - {"harmonic", "percussive", "bass"}
+    if unknown_tracks:
+        msg = f"Unknown decomposition tracks: {', '.join(sorted(unknown_tracks))}"
+        raise ValueError(msg)
+
+    if backend == "numpy":
+        stft = ahap_numpy.stft(audio_data, n_fft, hop_length)
+        magnitude = np.abs(stft)
+        harmonic_filtered = ahap_numpy.median_filter(magnitude, kernel_size, axis=1)
+        percussive_filtered = ahap_numpy.median_filter(magnitude, kernel_size, axis=0)
+    else:
+        stft = librosa.stft(audio_data, n_fft=n_fft, hop_length=hop_length)
+        magnitude = np.abs(stft)
+        harmonic_filtered = median_filter(magnitude, size=(1, kernel_size), mode="reflect")
+        percussive_filtered = median_filter(magnitude, size=(kernel_size, 1), mode="reflect")
+
+    def _softmask(values: np.ndarray, reference: np.ndarray, split_zeros: bool) -> np.ndarray:
+        if backend == "numpy":
+            return ahap_numpy.softmask(values, reference, power=2.0, split_zeros=split_zeros)
+        return librosa.util.softmask(values, reference, power=2.0, split_zeros=split_zeros)
+
+    def _invert(mask: np.ndarray) -> np.ndarray:
+        if backend == "numpy":
+            return ahap_numpy.istft(stft * mask, n_fft, hop_length, len(audio_data), audio_data.dtype)
+        return librosa.istft(
+            stft * mask,
+            n_fft=n_fft,
+            hop_length=hop_length,
+            length=len(audio_data),
+            dtype=audio_data.dtype,
+        )
+
+    decomposition = Decomposition(magnitude=magnitude)
+    if "harmonic" in tracks:
+        decomposition.harmonic = _invert(_softmask(harmonic_filtered, percussive_filtered, split_zeros=True))
+    if "percussive" in tracks:
+        decomposition.percussive = _invert(_softmask(percussive_filtered, harmonic_filtered, split_zeros=True))
+    if "bass" in tracks:
+        margin_harm, margin_perc = bass_margin
+        mask = _softmask(
+            harmonic_filtered,
+            percussive_filtered * margin_harm,
+            split_zeros=margin_harm == 1 and margin_perc == 1,
+        )
+        decomposition.bass = _invert(mask)
+
+    return decomposition
+
 
-    window_size = int(sample_rate * 0.02)
-    start_index = max(0, int((time - 0.01) * sample_rate))
-    end_index = min(len(audio_data), start_index + window_size)
+def extract_features(
+    audio_data: np.ndarray,
+    sample_rate: int,
+    hop_length: int = _FEATURE_HOP_LENGTH,
+    magnitude: np.ndarray | None = None,
+    mel_peak: float | None = None,
+    n_fft: int = _HPSS_N_FFT,
+    n_mels: int = _ONSET_N_MELS,
+    backend: str = "librosa",
+) -> AudioFeatures:
+    """Compute RMS, spectral-centroid and onset-strength frames for the whole signal in one pass.
+
+    A `magnitude` spectrogram computed at the same hop length (for example
+    `Decomposition.magnitude`) is reused instead of running another STFT.
+    `mel_peak` overrides the mel power used as the 80 dB floor reference, so a
+    block of a longer signal can be floored against the whole signal's peak.
+    """
+    energy_window = max(int(sample_rate * _ENERGY_WINDOW_SECONDS), 1)
+    if backend == "numpy":
+        if magnitude is None:
+            magnitude = np.abs(ahap_numpy.stft(audio_data, n_fft, hop_length))
+        rms = ahap_numpy.rms(audio_data, energy_window, hop_length)
+        centroid = ahap_numpy.spectral_centroid(magnitude, sample_rate, n_fft)
+        mel = ahap_numpy.mel_filterbank(sample_rate, n_fft, n_mels) @ magnitude**2
+        mel_db = np.maximum(
+            ahap_numpy.power_to_db(mel),
+            ahap_numpy.power_to_db(mel.max() if mel_peak is None else mel_peak) - _ONSET_TOP_DB,
+        )
+        onset_envelope = ahap_numpy.onset_strength(mel_db, n_fft, hop_length)
+    elif magnitude is not None:
+        rms = librosa.feature.rms(y=audio_data, frame_length=energy_window, hop_length=hop_length)[0]
+        centroid = librosa.feature.spectral_centroid(S=magnitude, sr=sample_rate, n_fft=n_fft)[0]
+        mel = librosa.feature.melspectrogram(S=magnitude**2, sr=sample_rate, n_fft=n_fft, n_mels=n_mels)
+        mel_db = np.maximum(
+            librosa.power_to_db(mel, top_db=None),
+            librosa.power_to_db(mel.max() if mel_peak is None else mel_peak) - _ONSET_TOP_DB,
+        )
+        onset_envelope = librosa.onset.onset_strength(
+            S=mel_db, sr=sample_rate, n_fft=n_fft, hop_length=hop_length
+        )
+    else:
+        rms = librosa.feature.rms(y=audio_data, frame_length=energy_window, hop_length=hop_length)[0]
+        centroid = librosa.feature.spectral_centroid(
+            y=audio_data, sr=sample_rate, n_fft=n_fft, hop_length=hop_length
+        )[0]
+        onset_envelope = librosa.onset.onset_strength(
+            y=audio_data, sr=sample_rate, n_fft=n_fft, hop_length=hop_length, n_mels=n_mels
+        )
 
-    window = audio_data[start_index:end_index]
-    if window.size == 0:
-        return 0.0, 0.0
+    # All features are centered on the frame, so they line up index for index.
+    frame_count = min(len(rms), len(centroid), len(onset_envelope))
+    return AudioFeatures(
+        sample_rate=sample_rate,
+        hop_length=hop_length,
+        rms=rms[:frame_count],
+        centroid=centroid[:frame_count],
+        onset_envelope=onset_envelope[:frame_count],
+        peak=_safe_peak(audio_data),
+    )
 
-    energy = float(np.sqrt(np.mean(window**2)))
 
-    centroid_window_size = int(sample_rate * 0.05)
-    centroid_start = max(0, int((time - 0.025) * sample_rate))
-    centroid_end = min(len(audio_data), centroid_start + centroid_window_size)
+def _centroid_windows(features: AudioFeatures, frames: np.ndarray) -> np.ndarray:
+    """Return the centroid frames covering a 50 ms window around each frame index."""
+    radius = int(round(_CENTROID_WINDOW_SECONDS / 2 * features.sample_rate / features.hop_length))
+    offsets = np.arange(-radius, radius + 1)
+    indices = np.clip(frames[:, None] + offsets[None, :], 0, max(len(features.centroid) - 1, 0))
+    return features.centroid[indices]
 
-    centroid_window = audio_data[centroid_start:centroid_end]
-    if centroid_window.size == 0:
-        return min(max(energy * intensity_factor, 0.0), 1.0), 0.0
 
-    spectral_centroid = librosa.feature.spectral_centroid(y=centroid_window, sr=sample_rate)
-    sharpness = float(np.mean(spectral_centroid))
+def calculate_parameters(
+    features: AudioFeatures,
+    frames: np.ndarray,
+    split: str,
+    sharpness_factor: float = 3.0,
+    intensity_factor: float = 2.5,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return intensity and sharpness arrays for the given feature frames."""
+    split = _canonical_split(split)
+    frames = np.asarray(frames, dtype=int)
+    if frames.size == 0 or features.rms.size == 0:
+        return np.zeros(frames.shape), np.zeros(frames.shape)
 
-    scaled_energy = np.clip(energy / _safe_peak(audio_data), 0, 1) * intensity_factor
-    scaled_energy = float(np.clip(scaled_energy, 0, 1))
+    energy = features.rms[frames]
+    windows = _centroid_windows(features, frames)
+    window_peak = windows.max(axis=1)
+    window_peak = np.where(window_peak > 0, window_peak, 1.0)
 
-    scaled_sharpness = np.clip(sharpness / _safe_peak(spectral_centroid), 0, 1) * sharpness_factor
-    scaled_sharpness = float(np.clip(scaled_sharpness, 0, 1))
+    scaled_energy = np.clip(np.clip(energy / features.peak, 0, 1) * intensity_factor, 0, 1)
+    scaled_sharpness = np.clip(np.clip(windows.mean(axis=1) / window_peak, 0, 1) * sharpness_factor, 0, 1)
 
-    profile_multiplier = {
-        "vocals": (1.2, 1.1),
-        "drums": (1.5, 1.3),
-        "bass": (1.4, 0.9),
-        "other": (1.3, 1.2),
-    }
+    return apply_split_profile(scaled_energy, scaled_sharpness, split)
 
-    energy_mult, sharpness_mult = profile_multiplier.get(split, (1.0, 1.0))
-    scaled_energy = float(np.clip(scaled_energy * energy_mult, 0, 1))
-    scaled_sharpness = float(np.clip(scaled_sharpness * sharpness_mult, 0, 1))
 
-    return scaled_energy, scaled_sharpness
+def apply_split_profile(
+    intensity: np.ndarray,
+    sharpness: np.ndarray,
+    split: str,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Scale split-agnostic intensity/sharpness arrays by the split's profile multipliers."""
+    energy_mult, sharpness_mult = _SPLIT_PROFILE_MULTIPLIERS.get(_canonical_split(split), (1.0, 1.0))
+    return np.clip(intensity * energy_mult, 0, 1), np.clip(sharpness * sharpness_mult, 0, 1)
 
 
 def create_event(
     event_type: str,
     time: float,
-    audio_data: np.ndarray,
-    sample_rate: int,
-    split: str,
-    sharpness_factor: float,
-    intensity_factor: float,
+    intensity: float,
+    sharpness: float,
 ) -> dict[str, object]:
-    intensity, sharpness = calculate_parameters(
-        audio_data,
-        time,
-        sample_rate,
-        split,
-        sharpness_factor=sharpness_factor,
-        intensity_factor=intensity_factor,
-    )
-
     event: dict[str, object] = {
         "Event": {
             "Time": float(time),
@@ -112,58 +376,102 @@ def create_event(
     return event
 
 
-def determine_haptic_mode(
-    audio_data: np.ndarray,
-    time: float,
-    sample_rate: int,
+def determine_haptic_modes(
+    features: AudioFeatures,
+    frames: np.ndarray,
     mode: str,
-    harmonic: np.ndarray,
-    percussive: np.ndarray,
-    bass: np.ndarray,
-) -> str:
-    window_size = int(sample_rate * 0.02)
-    start_index = max(0, int((time - 0.01) * sample_rate))
-    end_index = min(len(audio_data), start_index + window_size)
-
-    window = audio_data[start_index:end_index]
-    if window.size == 0:
-        return "continuous"
-
-    energy = float(np.sqrt(np.mean(window**2)))
-
-    _ = float(np.sqrt(np.mean(bass[start_index:end_index] ** 2))) if bass[start_index:end_index].size else 0.0
-    _ = (
-        float(np.sqrt(np.mean(percussive[start_index:end_index] ** 2)))
-        if percussive[start_index:end_index].size
-        else 0.0
-    )
-    _ = float(np.sqrt(np.mean(harmonic[start_index:end_index] ** 2))) if harmonic[start_index:end_index].size else 0.0
-
-    centroid_window_size = int(sample_rate * 0.05)
-    centroid_start = max(0, int((time - 0.025) * sample_rate))
-    centroid_end = min(len(audio_data), centroid_start + centroid_window_size)
-    centroid_window = audio_data[centroid_start:centroid_end]
+) -> np.ndarray:
+    """Classify each frame as ``transient``, ``continuous`` or ``both``."""
+    frames = np.asarray(frames, dtype=int)
+    if frames.size == 0 or features.rms.size == 0:
+        return np.full(frames.shape, "continuous", dtype=object)
 
-    if centroid_window.size == 0:
-        return "continuous"
-
-    spectral_centroid = librosa.feature.spectral_centroid(y=centroid_window, sr=sample_rate)
-    spectral_centroid_mean = float(np.mean(spectral_centroid))
+    energy = features.rms[frames]
+    windows = _centroid_windows(features, frames)
+    spectral_centroid_mean = windows.mean(axis=1)
 
     if mode == "sfx":
         transient_rms_threshold = 0.5
         continuous_rms_threshold = 0.2
-        spectral_threshold = float(np.percentile(spectral_centroid, 90))
+        spectral_threshold = np.percentile(windows, 90, axis=1)
     else:
         transient_rms_threshold = 0.2
         continuous_rms_threshold = 0.1
-        spectral_threshold = float(np.percentile(spectral_centroid, 70))
+        spectral_threshold = np.percentile(windows, 70, axis=1)
+
+    modes = np.full(frames.shape, "both", dtype=object)
+    modes[energy < continuous_rms_threshold] = "continuous"
+    modes[(energy > transient_rms_threshold) & (spectral_centroid_mean > spectral_threshold)] = "transient"
+    return modes
+
+
+def _framed_sum_squares(signal: np.ndarray, frame_length: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return sums of squares and sample counts of consecutive non-overlapping frames.
+
+    The last frame may be partial.
+    """
+    if signal.size == 0 or frame_length <= 0:
+        return np.zeros(0), np.zeros(0)
 
-    if energy > transient_rms_threshold and spectral_centroid_mean > spectral_threshold:
-        return "transient"
-    if energy < continuous_rms_threshold:
-        return "continuous"
-    return "both"
+    full_count = len(signal) // frame_length
+    full_frames = signal[: full_count * frame_length].reshape(full_count, frame_length)
+    sums = np.einsum("ij,ij->i", full_frames, full_frames, dtype=np.float64)
+    counts = np.full(full_count, frame_length, dtype=np.float64)
+
+    tail = signal[full_count * frame_length :]
+    if tail.size:
+        sums = np.append(sums, np.dot(tail.astype(np.float64), tail))
+        counts = np.append(counts, tail.size)
+
+    return sums, counts
+
+
+def _framed_rms(signal: np.ndarray, frame_length: int) -> np.ndarray:
+    """Return the RMS of consecutive non-overlapping frames; the last frame may be partial."""
+    sums, counts = _framed_sum_squares(signal, frame_length)
+    return np.sqrt(sums / counts) if sums.size else sums
+
+
+def _continuous_parameters_from_energy(
+    bass_energy: np.ndarray,
+    harmonic_energy: np.ndarray,
+    bass_peak: float,
+    harmonic_peak: float,
+    time_step: float,
+    intensity_factor: float,
+    sharpness_factor: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    intensity = np.clip(np.clip(bass_energy / bass_peak, 0, 1) * intensity_factor, 0, 1)
+    sharpness = np.clip(np.clip(harmonic_energy / harmonic_peak, 0, 1) * sharpness_factor, 0, 1)
+    times = np.arange(len(intensity)) * time_step
+    return times, intensity, sharpness
+
+
+def continuous_event_parameters(
+    sample_rate: int,
+    harmonic: np.ndarray,
+    bass: np.ndarray,
+    duration: float,
+    time_step: float,
+    intensity_factor: float = 2.5,
+    sharpness_factor: float = 3.0,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return times, intensities and sharpnesses for fixed-step continuous events."""
+    step_samples = int(round(time_step * sample_rate))
+    signal_length = min(len(bass), len(harmonic), int(np.ceil(duration * sample_rate)) if duration > 0 else 0)
+    if step_samples <= 0 or signal_length == 0:
+        empty = np.zeros(0)
+        return empty, empty, empty
+
+    return _continuous_parameters_from_energy(
+        _framed_rms(bass[:signal_length], step_samples),
+        _framed_rms(harmonic[:signal_length], step_samples),
+        _safe_peak(bass),
+        _safe_peak(harmonic),
+        time_step,
+        intensity_factor=intensity_factor,
+        sharpness_factor=sharpness_factor,
+    )
 
 
 def add_continuous_events(
@@ -177,109 +485,889 @@ def add_continuous_events(
     intensity_factor: float = 2.5,
     sharpness_factor: float = 3.0,
 ) -> None:
-    num_steps = int(duration / time_step) if duration > 0 else 0
+    times, intensities, sharpnesses = continuous_event_parameters(
+        sample_rate,
+        harmonic,
+        bass,
+        duration,
+        time_step,
+        intensity_factor=intensity_factor,
+        sharpness_factor=sharpness_factor,
+    )
 
-    for t in tqdm(np.arange(0, duration, time_step), total=num_steps, desc="Processing continuous events"):
-        start = int(t * sample_rate)
-        end = int((t + time_step) * sample_rate)
+    pattern.extend(_continuous_events(times, intensities, sharpnesses, time_step))
 
-        bass_window = bass[start:end]
-        harmonic_window = harmonic[start:end]
-        if bass_window.size == 0 or harmonic_window.size == 0:
-            continue
 
-        bass_energy = float(np.sqrt(np.mean(bass_window**2)))
-        harmonic_energy = float(np.sqrt(np.mean(harmonic_window**2)))
-
-        intensity = np.clip(bass_energy / _safe_peak(bass), 0, 1) * intensity_factor
-        intensity = float(np.clip(intensity, 0, 1))
-
-        sharpness = np.clip(harmonic_energy / _safe_peak(harmonic), 0, 1) * sharpness_factor
-        sharpness = float(np.clip(sharpness, 0, 1))
-
-        pattern.append(
-            {
-                "Event": {
-                    "Time": float(t),
-                    "EventType": "HapticContinuous",
-                    "EventDuration": time_step,
-                    "EventParameters": [
-                        {"ParameterID": "HapticIntensity", "ParameterValue": intensity},
-                        {"ParameterID": "HapticSharpness", "ParameterValue": sharpness},
-                    ],
-                }
+def _continuous_events(
+    times: np.ndarray,
+    intensities: np.ndarray,
+    sharpnesses: np.ndarray,
+    time_step: float,
+) -> list[dict[str, object]]:
+    return [
+        {
+            "Event": {
+                "Time": t,
+                "EventType": "HapticContinuous",
+                "EventDuration": time_step,
+                "EventParameters": [
+                    {"ParameterID": "HapticIntensity", "ParameterValue": intensity},
+                    {"ParameterID": "HapticSharpness", "ParameterValue": sharpness},
+                ],
             }
-        )
+        }
+        for t, intensity, sharpness in zip(times.tolist(), intensities.tolist(), sharpnesses.tolist())
+    ]
 
 
-def generate_ahap(
+@dataclass(slots=True)
+class HapticEvents:
+    """Split-agnostic haptic event arrays shared by every split variant of one signal."""
+
+    onset_times: np.ndarray
+    onset_modes: np.ndarray
+    onset_intensities: np.ndarray
+    onset_sharpnesses: np.ndarray
+    continuous_times: np.ndarray
+    continuous_intensities: np.ndarray
+    continuous_sharpnesses: np.ndarray
+    time_step: float
+
+
+def compute_haptic_events(
     audio_data: np.ndarray,
     sample_rate: int,
     mode: str,
     harmonic: np.ndarray,
-    percussive: np.ndarray,
     bass: np.ndarray,
     duration: float,
-    split: str,
     sharpness_factor: float,
     intensity_factor: float,
-) -> dict[str, object]:
-    """Generate AHAP payload data from prepared audio arrays and decomposition tracks."""
-    pattern: list[dict[str, object]] = []
-
-    onsets = librosa.onset.onset_detect(y=audio_data, sr=sample_rate)
-    event_times = librosa.frames_to_time(onsets, sr=sample_rate)
+    features: AudioFeatures | None = None,
+    backend: str = "librosa",
+    hooks: AhapHooks | None = None,
+) -> HapticEvents:
+    """Run onset detection, mode decisions and continuous events once for a signal."""
+    if features is None:
+        n_fft, hop_length, n_mels = _analysis_frame_sizes(sample_rate)
+        with track_stage(hooks, "features") as stage:
+            features = extract_features(
+                audio_data,
+                sample_rate,
+                hop_length=hop_length,
+                n_fft=n_fft,
+                n_mels=n_mels,
+                backend=backend,
+            )
+            stage.count = len(features.rms)
 
-    for event_time in tqdm(event_times, total=len(event_times), desc="Processing transient events"):
-        haptic_mode = determine_haptic_mode(
-            audio_data,
-            float(event_time),
+    with track_stage(hooks, "continuous_events") as stage:
+        continuous = continuous_event_parameters(
             sample_rate,
-            mode,
             harmonic,
-            percussive,
             bass,
+            duration,
+            _CONTINUOUS_TIME_STEP,
+            intensity_factor=intensity_factor,
+            sharpness_factor=sharpness_factor,
         )
+        stage.count = len(continuous[0])
+    return _haptic_events_from_features(
+        features,
+        mode,
+        continuous,
+        sharpness_factor=sharpness_factor,
+        intensity_factor=intensity_factor,
+        backend=backend,
+        hooks=hooks,
+    )
 
-        if haptic_mode in {"transient", "both"}:
-            pattern.append(
-                create_event(
-                    "HapticTransient",
-                    float(event_time),
-                    audio_data,
-                    sample_rate,
-                    split,
-                    sharpness_factor=sharpness_factor,
-                    intensity_factor=intensity_factor,
-                )
+
+def _haptic_events_from_features(
+    features: AudioFeatures,
+    mode: str,
+    continuous: tuple[np.ndarray, np.ndarray, np.ndarray],
+    sharpness_factor: float,
+    intensity_factor: float,
+    backend: str = "librosa",
+    hooks: AhapHooks | None = None,
+) -> HapticEvents:
+    with track_stage(hooks, "onset_detection") as stage:
+        if backend == "numpy":
+            onsets = ahap_numpy.onset_detect(features.onset_envelope, features.sample_rate, features.hop_length)
+        else:
+            onsets = librosa.onset.onset_detect(
+                onset_envelope=features.onset_envelope,
+                sr=features.sample_rate,
+                hop_length=features.hop_length,
             )
+        stage.count = len(onsets)
+
+    with track_stage(hooks, "transient_events") as stage:
+        event_times = onsets * features.hop_length / features.sample_rate
+        frames = features.frames_for_times(event_times)
+
+        onset_intensities, onset_sharpnesses = calculate_parameters(
+            features,
+            frames,
+            "none",
+            sharpness_factor=sharpness_factor,
+            intensity_factor=intensity_factor,
+        )
+        onset_modes = determine_haptic_modes(features, frames, mode)
+        stage.count = len(event_times)
+    continuous_times, continuous_intensities, continuous_sharpnesses = continuous
+
+    return HapticEvents(
+        onset_times=event_times,
+        onset_modes=onset_modes,
+        onset_intensities=onset_intensities,
+        onset_sharpnesses=onset_sharpnesses,
+        continuous_times=continuous_times,
+        continuous_intensities=continuous_intensities,
+        continuous_sharpnesses=continuous_sharpnesses,
+        time_step=_CONTINUOUS_TIME_STEP,
+    )
+
+
+def iter_ahap_pattern(events: HapticEvents, split: str, compact: bool = False) -> Iterator[dict[str, object]]:
+    """Yield the AHAP pattern entries for one split from shared haptic events.
+
+    With `compact`, fixed-step continuous events are merged and expressed as
+    parameter curves where possible (see `ahap_compact`).
+    """
+    intensities, sharpnesses = apply_split_profile(events.onset_intensities, events.onset_sharpnesses, split)
+
+    for event_time, haptic_mode, intensity, sharpness in zip(
+        events.onset_times, events.onset_modes, intensities, sharpnesses
+    ):
+        if haptic_mode in {"transient", "both"}:
+            yield create_event("HapticTransient", event_time, intensity, sharpness)
 
         if haptic_mode in {"continuous", "both"}:
-            pattern.append(
-                create_event(
-                    "HapticContinuous",
-                    float(event_time),
-                    audio_data,
-                    sample_rate,
-                    split,
-                    sharpness_factor=sharpness_factor,
-                    intensity_factor=intensity_factor,
-                )
-            )
+            yield create_event("HapticContinuous", event_time, intensity, sharpness)
+
+    if compact:
+        yield from compact_continuous_pattern(
+            events.continuous_intensities,
+            events.continuous_sharpnesses,
+            events.time_step,
+            events.onset_times,
+        )
+    else:
+        yield from _continuous_events(
+            events.continuous_times,
+            events.continuous_intensities,
+            events.continuous_sharpnesses,
+            events.time_step,
+        )
+
+
+def build_ahap(events: HapticEvents, split: str, compact: bool = False) -> dict[str, object]:
+    """Build the AHAP payload for one split from shared haptic events.
+
+    Args:
+        events: Split-agnostic events from `compute_haptic_events`.
+        split: Output split the events are shaped for.
+        compact: Merge continuous events into parameter curves with bounded precision.
+    """
+    return {"Version": 1.0, "Pattern": list(iter_ahap_pattern(events, split, compact=compact))}
+
+
+@dataclass(frozen=True, slots=True)
+class HapticDetail:
+    """Event density of one haptic level of detail."""
+
+    # Consecutive continuous steps averaged into one event.
+    continuous_steps: int
+    # Minimum spacing between kept onsets, in seconds; the strongest onsets win.
+    min_onset_gap: float
+
+
+HAPTIC_DETAILS = {
+    "full": HapticDetail(continuous_steps=1, min_onset_gap=0.0),
+    "reduced": HapticDetail(continuous_steps=3, min_onset_gap=0.25),
+    "minimal": HapticDetail(continuous_steps=5, min_onset_gap=0.5),
+}
+
+
+def _strongest_spaced_onsets(times: np.ndarray, intensities: np.ndarray, min_gap: float) -> np.ndarray:
+    """Return sorted indices of onsets at least `min_gap` apart, preferring stronger ones."""
+    kept_times: list[float] = []
+    kept: list[int] = []
+    for index in np.argsort(-intensities, kind="stable").tolist():
+        event_time = float(times[index])
+        position = bisect_left(kept_times, event_time)
+        if position > 0 and event_time - kept_times[position - 1] < min_gap:
+            continue
+        if position < len(kept_times) and kept_times[position] - event_time < min_gap:
+            continue
+        kept_times.insert(position, event_time)
+        kept.append(index)
+    return np.sort(np.asarray(kept, dtype=int))
+
+
+def reduce_haptic_events(events: HapticEvents, detail: str) -> HapticEvents:
+    """Derive a lower-density level of detail from full-density haptic events.
+
+    Continuous steps are averaged in groups of `continuous_steps` and onsets are
+    thinned to `min_onset_gap`, so devices schedule far fewer events while the
+    overall envelope and the strongest accents are kept (see `HAPTIC_DETAILS`).
+    """
+    level = HAPTIC_DETAILS.get(detail)
+    if level is None:
+        msg = f"Unknown haptic detail '{detail}'. Expected one of: {', '.join(HAPTIC_DETAILS)}."
+        raise ValueError(msg)
+    if level.continuous_steps == 1 and level.min_onset_gap <= 0:
+        return events
+
+    onsets = slice(None)
+    if level.min_onset_gap > 0 and len(events.onset_times):
+        onsets = _strongest_spaced_onsets(events.onset_times, events.onset_intensities, level.min_onset_gap)
+
+    continuous_times = events.continuous_times
+    continuous_intensities = events.continuous_intensities
+    continuous_sharpnesses = events.continuous_sharpnesses
+    if level.continuous_steps > 1 and len(continuous_times):
+        starts = np.arange(0, len(continuous_times), level.continuous_steps)
+        group_sizes = np.diff(np.append(starts, len(continuous_times)))
+        continuous_times = continuous_times[starts]
+        continuous_intensities = np.add.reduceat(continuous_intensities, starts) / group_sizes
+        continuous_sharpnesses = np.add.reduceat(continuous_sharpnesses, starts) / group_sizes
+
+    return HapticEvents(
+        onset_times=events.onset_times[onsets],
+        onset_modes=events.onset_modes[onsets],
+        onset_intensities=events.onset_intensities[onsets],
+        onset_sharpnesses=events.onset_sharpnesses[onsets],
+        continuous_times=continuous_times,
+        continuous_intensities=continuous_intensities,
+        continuous_sharpnesses=continuous_sharpnesses,
+        time_step=round(events.time_step * level.continuous_steps, 6),
+    )
+
+
+@dataclass(slots=True)
+class CompactionReport:
+    """Size and fidelity of a compact AHAP payload compared with the full one."""
+
+    full_bytes: int
+    compact_bytes: int
+    full_entries: int
+    compact_entries: int
+    parameter_curves: int
+    max_intensity_error: float
+    mean_intensity_error: float
+    max_sharpness_error: float
+    mean_sharpness_error: float
+
+    @property
+    def size_ratio(self) -> float:
+        return self.compact_bytes / self.full_bytes if self.full_bytes else 1.0
+
+
+def compaction_report(
+    events: HapticEvents,
+    split: str = "none",
+    tolerance: float = COMPACT_MERGE_TOLERANCE,
+) -> CompactionReport:
+    """Compare the full and compact AHAP output for the same events.
+
+    Errors are measured on the continuous envelope a device plays back, per step.
+    """
+    full_payload = build_ahap(events, split)
+    compact_payload = build_ahap(events, split, compact=True)
+    full_pattern: list[dict[str, object]] = full_payload["Pattern"]  # type: ignore[assignment]
+    compact_pattern: list[dict[str, object]] = compact_payload["Pattern"]  # type: ignore[assignment]
+
+    played_intensity, played_sharpness = reconstruct_continuous_envelope(
+        events.continuous_intensities,
+        events.continuous_sharpnesses,
+        events.time_step,
+        events.onset_times,
+        tolerance=tolerance,
+    )
+    intensity_error = np.abs(played_intensity - events.continuous_intensities)
+    sharpness_error = np.abs(played_sharpness - events.continuous_sharpnesses)
+
+    return CompactionReport(
+        full_bytes=len(serialize_ahap(full_payload).encode("utf-8")),
+        compact_bytes=len(serialize_ahap(compact_payload, compact=True).encode("utf-8")),
+        full_entries=len(full_pattern),
+        compact_entries=len(compact_pattern),
+        parameter_curves=sum(1 for entry in compact_pattern if "ParameterCurve" in entry),
+        max_intensity_error=float(intensity_error.max()) if intensity_error.size else 0.0,
+        mean_intensity_error=float(intensity_error.mean()) if intensity_error.size else 0.0,
+        max_sharpness_error=float(sharpness_error.max()) if sharpness_error.size else 0.0,
+        mean_sharpness_error=float(sharpness_error.mean()) if sharpness_error.size else 0.0,
+    )
 
-    add_continuous_events(
-        pattern,
+
+@dataclass(slots=True)
+class FidelityReport:
+    """Agreement of haptic events computed at a candidate analysis rate with reference events."""
+
+    reference_onsets: int
+    candidate_onsets: int
+    matched_onsets: int
+    mean_timing_error: float
+    max_onset_intensity_error: float
+    max_onset_sharpness_error: float
+    mode_agreement: float
+    max_intensity_error: float
+    mean_intensity_error: float
+    max_sharpness_error: float
+    mean_sharpness_error: float
+
+    @property
+    def onset_recall(self) -> float:
+        return self.matched_onsets / self.reference_onsets if self.reference_onsets else 1.0
+
+    @property
+    def onset_precision(self) -> float:
+        return self.matched_onsets / self.candidate_onsets if self.candidate_onsets else 1.0
+
+
+def _match_onsets(
+    reference_times: np.ndarray,
+    candidate_times: np.ndarray,
+    tolerance: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pair onsets one-to-one, closest pairs first, within `tolerance` seconds.
+
+    Only pairs inside the tolerance window are considered, found with a binary
+    search over the sorted candidate times, so the cost grows with the onset
+    counts rather than their product. Returns matched reference and candidate indices.
+    """
+    candidate_order = np.argsort(candidate_times, kind="stable")
+    sorted_times = candidate_times[candidate_order]
+    starts = np.searchsorted(sorted_times, reference_times - tolerance, side="left")
+    counts = np.searchsorted(sorted_times, reference_times + tolerance, side="right") - starts
+
+    # Every (reference, candidate) pair whose times are within the window.
+    pair_reference = np.repeat(np.arange(len(reference_times)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    pair_candidate = candidate_order[np.repeat(starts, counts) + offsets]
+    pair_distances = np.abs(reference_times[pair_reference] - candidate_times[pair_candidate])
+
+    matched_reference = np.zeros(len(reference_times), dtype=bool)
+    matched_candidate = np.zeros(len(candidate_times), dtype=bool)
+    reference_indices: list[int] = []
+    candidate_indices: list[int] = []
+    for pair in np.lexsort((pair_candidate, pair_reference, pair_distances)):
+        reference_index, candidate_index = pair_reference[pair], pair_candidate[pair]
+        if pair_distances[pair] > tolerance:
+            continue
+        if matched_reference[reference_index] or matched_candidate[candidate_index]:
+            continue
+        matched_reference[reference_index] = matched_candidate[candidate_index] = True
+        reference_indices.append(int(reference_index))
+        candidate_indices.append(int(candidate_index))
+    return np.array(reference_indices, dtype=int), np.array(candidate_indices, dtype=int)
+
+
+def fidelity_report(
+    reference: HapticEvents,
+    candidate: HapticEvents,
+    onset_tolerance: float = 0.025,
+) -> FidelityReport:
+    """Compare onset timing/parameters and the continuous envelope of two analyses.
+
+    Onsets are matched one-to-one, closest pairs first, within `onset_tolerance`
+    seconds. Continuous errors are measured per step over the common duration.
+    """
+    reference_indices, candidate_indices = _match_onsets(
+        reference.onset_times, candidate.onset_times, onset_tolerance
+    )
+    matched = len(reference_indices)
+
+    def _max_error(reference_values: np.ndarray, candidate_values: np.ndarray) -> float:
+        if not matched:
+            return 0.0
+        return float(np.max(np.abs(reference_values[reference_indices] - candidate_values[candidate_indices])))
+
+    step_count = min(len(reference.continuous_intensities), len(candidate.continuous_intensities))
+    intensity_error = np.abs(
+        reference.continuous_intensities[:step_count] - candidate.continuous_intensities[:step_count]
+    )
+    sharpness_error = np.abs(
+        reference.continuous_sharpnesses[:step_count] - candidate.continuous_sharpnesses[:step_count]
+    )
+
+    return FidelityReport(
+        reference_onsets=len(reference.onset_times),
+        candidate_onsets=len(candidate.onset_times),
+        matched_onsets=matched,
+        mean_timing_error=float(
+            np.mean(np.abs(reference.onset_times[reference_indices] - candidate.onset_times[candidate_indices]))
+        )
+        if matched
+        else 0.0,
+        max_onset_intensity_error=_max_error(reference.onset_intensities, candidate.onset_intensities),
+        max_onset_sharpness_error=_max_error(reference.onset_sharpnesses, candidate.onset_sharpnesses),
+        mode_agreement=float(
+            np.mean(reference.onset_modes[reference_indices] == candidate.onset_modes[candidate_indices])
+        )
+        if matched
+        else 1.0,
+        max_intensity_error=float(intensity_error.max()) if intensity_error.size else 0.0,
+        mean_intensity_error=float(intensity_error.mean()) if intensity_error.size else 0.0,
+        max_sharpness_error=float(sharpness_error.max()) if sharpness_error.size else 0.0,
+        mean_sharpness_error=float(sharpness_error.mean()) if sharpness_error.size else 0.0,
+    )
+
+
+def generate_ahap(
+    audio_data: np.ndarray,
+    sample_rate: int,
+    mode: str,
+    harmonic: np.ndarray,
+    percussive: np.ndarray | None,
+    bass: np.ndarray,
+    duration: float,
+    split: str,
+    sharpness_factor: float,
+    intensity_factor: float,
+    features: AudioFeatures | None = None,
+    backend: str = "auto",
+    hooks: AhapHooks | None = None,
+    detail: str = "full",
+) -> dict[str, object]:
+    """Generate AHAP payload data from prepared audio arrays and decomposition tracks.
+
+    Pass precomputed `features` to reuse one feature extraction across several calls.
+    To produce several splits or levels of detail of the same signal, call
+    `compute_haptic_events` once and `build_ahap` (after `reduce_haptic_events`)
+    per variant instead.
+    """
+    events = compute_haptic_events(
         audio_data,
         sample_rate,
+        mode,
         harmonic,
         bass,
         duration,
-        time_step=0.1,
+        sharpness_factor=sharpness_factor,
         intensity_factor=intensity_factor,
+        features=features,
+        backend=_resolve_backend(backend),
+        hooks=hooks,
+    )
+    with track_stage(hooks, "serialization") as stage:
+        ahap_data = build_ahap(reduce_haptic_events(events, detail), split)
+        stage.count = len(ahap_data["Pattern"])  # type: ignore[arg-type]
+    return ahap_data
+
+
+def analyze_audio_file(
+    input_wav: str | BinaryIO,
+    mode: str,
+    sample_rate: int = 44100,
+    sharpness_factor: float = 3.0,
+    intensity_factor: float = 2.5,
+    backend: str = "auto",
+    hooks: AhapHooks | None = None,
+) -> HapticEvents:
+    """Load an audio file and compute its split-agnostic haptic events.
+
+    The `numpy` backend reads PCM/float WAV files only.
+    """
+    backend = _resolve_backend(backend)
+    with track_stage(hooks, "load") as stage:
+        if backend == "numpy":
+            if isinstance(input_wav, str):
+                audio_bytes = Path(input_wav).read_bytes()
+            else:
+                audio_bytes = input_wav.read()
+            audio_data, loaded_sample_rate = _decode_wav_or_raise(audio_bytes)
+        else:
+            audio_data, loaded_sample_rate = librosa.load(input_wav, sr=sample_rate, mono=True)
+        stage.count = len(audio_data)
+
+    return analyze_audio_array(
+        audio_data,
+        loaded_sample_rate,
+        mode,
+        sample_rate=sample_rate,
         sharpness_factor=sharpness_factor,
+        intensity_factor=intensity_factor,
+        backend=backend,
+        hooks=hooks,
     )
 
-    return {"Version": 1.0, "Pattern": pattern}
+
+def analyze_audio_array(
+    audio_data: np.ndarray,
+    source_sample_rate: int,
+    mode: str,
+    sample_rate: int = 44100,
+    sharpness_factor: float = 3.0,
+    intensity_factor: float = 2.5,
+    backend: str = "auto",
+    hooks: AhapHooks | None = None,
+) -> HapticEvents:
+    """Compute split-agnostic haptic events for mono samples already in memory.
+
+    Samples are only resampled when `source_sample_rate` differs from `sample_rate`.
+    Stage timings are reported to `hooks` (see `ahap_hooks`).
+    """
+    backend = _resolve_backend(backend)
+    if source_sample_rate != sample_rate:
+        with track_stage(hooks, "resample") as stage:
+            if backend == "numpy":
+                audio_data = ahap_numpy.resample(audio_data, source_sample_rate, sample_rate)
+            else:
+                audio_data = librosa.resample(audio_data, orig_sr=source_sample_rate, target_sr=sample_rate)
+            stage.count = len(audio_data)
+    duration = len(audio_data) / sample_rate if sample_rate else 0.0
+
+    # Only the harmonic and bass tracks feed continuous events; the percussive
+    # track is never needed in the time domain.
+    n_fft, hop_length, n_mels = _analysis_frame_sizes(sample_rate)
+    with track_stage(hooks, "hpss") as stage:
+        decomposition = decompose_audio(
+            audio_data,
+            tracks=("harmonic", "bass"),
+            n_fft=n_fft,
+            hop_length=hop_length,
+            backend=backend,
+        )
+        stage.count = decomposition.magnitude.shape[1]
+    with track_stage(hooks, "features") as stage:
+        features = extract_features(
+            audio_data,
+            sample_rate,
+            hop_length=hop_length,
+            magnitude=decomposition.magnitude,
+            n_fft=n_fft,
+            n_mels=n_mels,
+            backend=backend,
+        )
+        stage.count = len(features.rms)
+    return compute_haptic_events(
+        audio_data,
+        sample_rate,
+        mode,
+        decomposition.harmonic,
+        decomposition.bass,
+        duration,
+        sharpness_factor=sharpness_factor,
+        intensity_factor=intensity_factor,
+        features=features,
+        backend=backend,
+        hooks=hooks,
+    )
+
+
+# (format tag, bits per sample) -> little-endian sample dtype and full-scale value.
+_WAV_SAMPLE_FORMATS = {
+    (WAVE_FORMAT_PCM, 8): ("u1", 128.0),
+    (WAVE_FORMAT_PCM, 16): ("<i2", 32768.0),
+    (WAVE_FORMAT_PCM, 32): ("<i4", 2147483648.0),
+    (WAVE_FORMAT_IEEE_FLOAT, 32): ("<f4", 1.0),
+    (WAVE_FORMAT_IEEE_FLOAT, 64): ("<f8", 1.0),
+}
+
+
+def decode_wav_bytes(audio_bytes: bytes | bytearray | memoryview) -> tuple[np.ndarray, int] | None:
+    """Decode an in-memory PCM/float WAV to mono float32 samples and its sample rate.
+
+    Samples are read straight out of the buffer with `np.frombuffer`, at the
+    offsets `read_wav_info` finds (so a streaming encoder's oversized data chunk
+    is read to the end of the buffer). Returns None for anything other than an
+    8/16/32-bit integer or 32/64-bit float WAV.
+    """
+    try:
+        info = read_wav_info(audio_bytes)
+    except ValueError:
+        return None
+    dtype_scale = _WAV_SAMPLE_FORMATS.get((info.format_tag, info.sample_width * 8))
+    if dtype_scale is None:
+        return None
+    dtype, full_scale = dtype_scale
+
+    view = memoryview(audio_bytes).cast("B")
+    samples = np.frombuffer(view, dtype=dtype, count=info.frame_count * info.channels, offset=info.data_offset)
+    audio_data = samples.astype(np.float32)
+    if dtype == "u1":
+        audio_data -= 128.0
+    if full_scale != 1.0:
+        audio_data /= full_scale
+    if info.channels > 1:
+        audio_data = audio_data.reshape(-1, info.channels).mean(axis=1)
+    return audio_data, info.sample_rate
+
+
+def _decode_wav_or_raise(audio_bytes: bytes | bytearray | memoryview) -> tuple[np.ndarray, int]:
+    decoded = decode_wav_bytes(audio_bytes)
+    if decoded is None:
+        msg = "The numpy AHAP backend only reads PCM/float WAV audio; install librosa for other formats."
+        raise ValueError(msg)
+    return decoded
+
+
+def generate_ahap_from_audio(
+    audio: bytes | bytearray | memoryview | BinaryIO | np.ndarray,
+    mode: str = "sfx",
+    split: str = "none",
+    sample_rate: int = 44100,
+    source_sample_rate: int | None = None,
+    sharpness_factor: float = 3.0,
+    intensity_factor: float = 2.5,
+    compact: bool = False,
+    as_bytes: bool = False,
+    backend: str = "auto",
+    hooks: AhapHooks | None = None,
+    detail: str = "full",
+) -> dict[str, object] | bytes:
+    """Generate one AHAP pattern from audio held in memory, without touching disk.
+
+    `audio` may be WAV bytes (e.g. `TTSResult.audioBytes`), a binary buffer, or a
+    mono sample array together with `source_sample_rate`. WAV data is parsed in
+    place and only resampled when its rate differs from `sample_rate`; other
+    encoded formats fall back to `librosa.load` (librosa backend only). Returns the
+    AHAP dict, or its serialized UTF-8 bytes with `as_bytes`.
+    """
+    return generate_ahap_details_from_audio(
+        audio,
+        (detail,),
+        mode=mode,
+        split=split,
+        sample_rate=sample_rate,
+        source_sample_rate=source_sample_rate,
+        sharpness_factor=sharpness_factor,
+        intensity_factor=intensity_factor,
+        compact=compact,
+        as_bytes=as_bytes,
+        backend=backend,
+        hooks=hooks,
+    )[detail]
+
+
+def generate_ahap_details_from_audio(
+    audio: bytes | bytearray | memoryview | BinaryIO | np.ndarray,
+    details: tuple[str, ...] = tuple(HAPTIC_DETAILS),
+    mode: str = "sfx",
+    split: str = "none",
+    sample_rate: int = 44100,
+    source_sample_rate: int | None = None,
+    sharpness_factor: float = 3.0,
+    intensity_factor: float = 2.5,
+    compact: bool = False,
+    as_bytes: bool = False,
+    backend: str = "auto",
+    hooks: AhapHooks | None = None,
+) -> dict[str, dict[str, object] | bytes]:
+    """Generate one AHAP pattern per level of detail from a single analysis.
+
+    Accepts the same inputs as `generate_ahap_from_audio` and returns a mapping
+    of detail name (see `HAPTIC_DETAILS`) to its AHAP dict or serialized bytes.
+    """
+    backend = _resolve_backend(backend)
+    split = _canonical_split(split)
+    if split == "all":
+        msg = "generate_ahap_from_audio produces a single pattern; pass one split instead of 'all'."
+        raise ValueError(msg)
+    unknown_details = set(details) - set(HAPTIC_DETAILS)
+    if unknown_details:
+        msg = f"Unknown haptic details: {', '.join(sorted(unknown_details))}"
+        raise ValueError(msg)
+
+    if isinstance(audio, np.ndarray):
+        if source_sample_rate is None:
+            msg = "source_sample_rate is required for sample array input."
+            raise ValueError(msg)
+        audio_data, audio_rate = np.asarray(audio, dtype=np.float32), source_sample_rate
+        if audio_data.ndim > 1:
+            audio_data = audio_data.mean(axis=0)
+    else:
+        with track_stage(hooks, "load") as stage:
+            if isinstance(audio, io.BytesIO):
+                audio_buffer: bytes | bytearray | memoryview = audio.getbuffer()
+            elif isinstance(audio, (bytes, bytearray, memoryview)):
+                audio_buffer = audio
+            else:
+                audio_buffer = audio.read()
+
+            if backend == "numpy":
+                decoded = _decode_wav_or_raise(audio_buffer)
+            else:
+                decoded = decode_wav_bytes(audio_buffer)
+                if decoded is None:
+                    decoded = librosa.load(io.BytesIO(audio_buffer), sr=sample_rate, mono=True)
+            audio_data, audio_rate = decoded
+            stage.count = len(audio_data)
+
+    events = analyze_audio_array(
+        audio_data,
+        audio_rate,
+        mode,
+        sample_rate=sample_rate,
+        sharpness_factor=sharpness_factor,
+        intensity_factor=intensity_factor,
+        backend=backend,
+        hooks=hooks,
+    )
+    payloads: dict[str, dict[str, object] | bytes] = {}
+    for detail in details:
+        with track_stage(hooks, "serialization") as stage:
+            ahap_data = build_ahap(reduce_haptic_events(events, detail), split, compact=compact)
+            stage.count = len(ahap_data["Pattern"])  # type: ignore[arg-type]
+            if as_bytes:
+                payloads[detail] = serialize_ahap(ahap_data, compact=compact).encode("utf-8")
+            else:
+                payloads[detail] = ahap_data
+    return payloads
+
+
+def _read_block(
+    audio_file: soundfile.SoundFile,
+    start: int,
+    stop: int,
+    sample_rate: int,
+) -> np.ndarray:
+    """Read target-rate samples ``[start, stop)`` from `audio_file` as mono float32."""
+    source_rate = audio_file.samplerate
+    source_start = start * source_rate // sample_rate
+    source_stop = min(-(-stop * source_rate // sample_rate), audio_file.frames)
+
+    audio_file.seek(source_start)
+    block = audio_file.read(source_stop - source_start, dtype="float32", always_2d=True).mean(axis=1)
+    if source_rate != sample_rate:
+        block = librosa.resample(block, orig_sr=source_rate, target_sr=sample_rate)
+    return librosa.util.fix_length(block, size=stop - start)
+
+
+def analyze_audio_file_streaming(
+    input_wav: str | BinaryIO,
+    mode: str,
+    sample_rate: int = 44100,
+    sharpness_factor: float = 3.0,
+    intensity_factor: float = 2.5,
+    block_seconds: float = _STREAM_BLOCK_SECONDS,
+    hooks: AhapHooks | None = None,
+) -> HapticEvents:
+    """Compute haptic events by reading an audio file in overlapping blocks.
+
+    Each block is decomposed with enough context on both sides that frames in its
+    core are unaffected by the cut, and only the frame-level features of the core
+    are kept. Onsets are picked once on the stitched onset envelope, so events at
+    block boundaries match a whole-file analysis while memory stays bounded by the
+    block size rather than the file duration. Streaming always uses librosa.
+    """
+    _resolve_backend("librosa")
+    n_fft, hop_length, n_mels = _analysis_frame_sizes(sample_rate)
+    step_samples = int(round(_CONTINUOUS_TIME_STEP * sample_rate))
+
+    with soundfile.SoundFile(input_wav) as audio_file:
+        # Block edges must fall on feature frames, continuous steps and whole source samples.
+        rate_unit = sample_rate // math.gcd(sample_rate, audio_file.samplerate)
+        core_alignment = math.lcm(hop_length, step_samples, rate_unit)
+        core_length = core_alignment * max(1, round(block_seconds * sample_rate / core_alignment))
+        context_alignment = math.lcm(hop_length, rate_unit)
+        context_length = context_alignment * math.ceil(_STREAM_CONTEXT_SECONDS * sample_rate / context_alignment)
+
+        total_length = math.ceil(audio_file.frames * sample_rate / audio_file.samplerate)
+
+        # Onset strength floors the mel spectrogram 80 dB below its peak, so find the
+        # whole-file peak first to keep every block on the same floor.
+        mel_peak = 0.0
+        for core_start in range(0, total_length, core_length):
+            block = _read_block(audio_file, core_start, min(core_start + core_length, total_length), sample_rate)
+            mel = librosa.feature.melspectrogram(
+                y=block, sr=sample_rate, n_fft=n_fft, hop_length=hop_length, n_mels=n_mels
+            )
+            mel_peak = max(mel_peak, float(mel.max()))
+
+        frame_count = 1 + total_length // hop_length
+        rms = np.zeros(frame_count, dtype=np.float32)
+        centroid = np.zeros(frame_count, dtype=np.float32)
+        onset_envelope = np.zeros(frame_count, dtype=np.float32)
+        bass_sums: list[np.ndarray] = []
+        harmonic_sums: list[np.ndarray] = []
+        step_counts: list[np.ndarray] = []
+        peak = bass_peak = harmonic_peak = 0.0
+
+        for core_start in range(0, total_length, core_length):
+            core_end = min(core_start + core_length, total_length)
+            window_start = max(core_start - context_length, 0)
+            window_end = min(core_end + context_length, total_length)
+            with track_stage(hooks, "load") as stage:
+                block = _read_block(audio_file, window_start, window_end, sample_rate)
+                stage.count = len(block)
+
+            with track_stage(hooks, "hpss") as stage:
+                decomposition = decompose_audio(
+                    block, tracks=("harmonic", "bass"), n_fft=n_fft, hop_length=hop_length
+                )
+                stage.count = decomposition.magnitude.shape[1]
+            with track_stage(hooks, "features") as stage:
+                block_features = extract_features(
+                    block,
+                    sample_rate,
+                    hop_length=hop_length,
+                    magnitude=decomposition.magnitude,
+                    mel_peak=mel_peak,
+                    n_fft=n_fft,
+                    n_mels=n_mels,
+                )
+                stage.count = len(block_features.rms)
+
+            first_frame = window_start // hop_length
+            keep_start = core_start // hop_length
+            keep_stop = frame_count if core_end == total_length else core_end // hop_length
+            local = slice(keep_start - first_frame, keep_stop - first_frame)
+            rms[keep_start:keep_stop] = block_features.rms[local]
+            centroid[keep_start:keep_stop] = block_features.centroid[local]
+            onset_envelope[keep_start:keep_stop] = block_features.onset_envelope[local]
+
+            core = slice(core_start - window_start, core_end - window_start)
+            bass_core = decomposition.bass[core]
+            harmonic_core = decomposition.harmonic[core]
+            peak = max(peak, float(np.max(np.abs(block[core]))))
+            bass_peak = max(bass_peak, float(np.max(np.abs(bass_core))))
+            harmonic_peak = max(harmonic_peak, float(np.max(np.abs(harmonic_core))))
+
+            bass_step_sums, counts = _framed_sum_squares(bass_core, step_samples)
+            harmonic_step_sums, _ = _framed_sum_squares(harmonic_core, step_samples)
+            bass_sums.append(bass_step_sums)
+            harmonic_sums.append(harmonic_step_sums)
+            step_counts.append(counts)
+
+    if step_counts:
+        counts = np.concatenate(step_counts)
+        bass_energy = np.sqrt(np.concatenate(bass_sums) / counts)
+        harmonic_energy = np.sqrt(np.concatenate(harmonic_sums) / counts)
+    else:
+        bass_energy = harmonic_energy = np.zeros(0)
+
+    with track_stage(hooks, "continuous_events") as stage:
+        continuous = _continuous_parameters_from_energy(
+            bass_energy,
+            harmonic_energy,
+            bass_peak if bass_peak > 0 else 1.0,
+            harmonic_peak if harmonic_peak > 0 else 1.0,
+            _CONTINUOUS_TIME_STEP,
+            intensity_factor=intensity_factor,
+            sharpness_factor=sharpness_factor,
+        )
+        stage.count = len(continuous[0])
+    features = AudioFeatures(
+        sample_rate=sample_rate,
+        hop_length=hop_length,
+        rms=rms,
+        centroid=centroid,
+        onset_envelope=onset_envelope,
+        peak=peak if peak > 0 else 1.0,
+    )
+    return _haptic_events_from_features(
+        features,
+        mode,
+        continuous,
+        sharpness_factor=sharpness_factor,
+        intensity_factor=intensity_factor,
+        hooks=hooks,
+    )
 
 
 def convert_wav_to_ahap(
@@ -290,69 +1378,222 @@ def convert_wav_to_ahap(
     sample_rate: int = 44100,
     sharpness_factor: float = 3.0,
     intensity_factor: float = 2.5,
+    compact: bool = False,
+    streaming: bool = False,
+    cache: AhapCache | None = None,
+    backend: str = "auto",
+    hooks: AhapHooks | None = None,
 ) -> list[str]:
-    """Convert an input audio file into one or more `.ahap` files."""
-    split = _canonical_split(split)
-
+    """Convert an audio file into one `.ahap` file per split and return their paths.
+
+    Args:
+        input_wav: Audio file to analyze.
+        output_dir: Directory for the outputs; defaults to the input's directory.
+        mode: Haptic mode passed to the analyzer.
+        split: `none`, `all` or a single split such as `vocals` (see `ahap_output_paths`).
+        sample_rate: Analysis rate; `FAST_ANALYSIS_SAMPLE_RATE` trades fidelity for speed.
+        sharpness_factor: Scale applied to event sharpness.
+        intensity_factor: Scale applied to event intensity.
+        compact: Write minified output with merged continuous events.
+        streaming: Analyze in bounded-memory blocks, for long-form audio.
+        cache: AHAP cache to use instead of the one `AHAP_CACHE_DIR` configures.
+        backend: Analysis backend, one of `AHAP_BACKENDS`.
+        hooks: Receives per-stage timings; a cache hit reports none.
+    """
     if not output_dir:
         output_dir = str(Path(input_wav).resolve().parent)
 
-    os.makedirs(output_dir, exist_ok=True)
-
-    audio_data, loaded_sample_rate = librosa.load(input_wav, sr=sample_rate, mono=True)
-    duration = len(audio_data) / loaded_sample_rate if loaded_sample_rate else 0.0
-
-    harmonic, percussive = librosa.effects.hpss(audio_data)
-    bass = librosa.effects.hpss(audio_data, margin=(1.0, 20.0))[0]
+    return convert_audio_to_ahap(
+        input_wav,
+        Path(input_wav).name,
+        output_dir,
+        mode,
+        split,
+        sample_rate=sample_rate,
+        sharpness_factor=sharpness_factor,
+        intensity_factor=intensity_factor,
+        compact=compact,
+        streaming=streaming,
+        cache=cache,
+        backend=backend,
+        hooks=hooks,
+    )
 
-    output_files: list[str] = []
-    input_base = Path(input_wav).name
 
-    if split == "none":
-        ahap_data = generate_ahap(
-            audio_data,
-            loaded_sample_rate,
+def convert_audio_to_ahap(
+    audio_input: str | BinaryIO,
+    input_name: str,
+    output_dir: str,
+    mode: str,
+    split: str,
+    sample_rate: int = 44100,
+    sharpness_factor: float = 3.0,
+    intensity_factor: float = 2.5,
+    compact: bool = False,
+    streaming: bool = False,
+    cache: AhapCache | None = None,
+    backend: str = "auto",
+    hooks: AhapHooks | None = None,
+) -> list[str]:
+    """Convert a path or binary stream to `.ahap` files named after `input_name`."""
+    backend = _resolve_backend(backend)
+    if streaming and backend != "librosa":
+        msg = "Streaming analysis requires the librosa backend."
+        raise ValueError(msg)
+    split = _canonical_split(split)
+    os.makedirs(output_dir, exist_ok=True)
+    output_paths = ahap_output_paths(input_name, output_dir, split)
+
+    if cache is None:
+        cache = default_ahap_cache()
+    cache_key = None
+    if cache is not None:
+        cache_key = ahap_cache_key(
+            hash_audio(audio_input),
             mode,
-            harmonic,
-            percussive,
-            bass,
-            duration,
             split,
+            sample_rate,
+            sharpness_factor,
+            intensity_factor,
+            compact=compact,
+            backend=backend,
+            streaming=streaming,
+        )
+        if cache.restore(cache_key, output_paths):
+            return [output_path for output_path, _ in output_paths]
+
+    if streaming:
+        events = analyze_audio_file_streaming(
+            audio_input,
+            mode,
+            sample_rate=sample_rate,
             sharpness_factor=sharpness_factor,
             intensity_factor=intensity_factor,
+            hooks=hooks,
         )
-        output_ahap = os.path.join(output_dir, input_base.replace(Path(input_wav).suffix, ".ahap"))
-        output_ahap = output_ahap.replace("_background", "")
-        write_ahap_file(output_ahap, ahap_data)
-        output_files.append(output_ahap)
-        return output_files
-
-    split_targets = ["bass", "vocals", "drums", "other"] if split == "all" else [split]
-
-    for split_type in split_targets:
-        ahap_data = generate_ahap(
-            audio_data,
-            loaded_sample_rate,
+    else:
+        events = analyze_audio_file(
+            audio_input,
             mode,
-            harmonic,
-            percussive,
-            bass,
-            duration,
-            split_type,
+            sample_rate=sample_rate,
             sharpness_factor=sharpness_factor,
             intensity_factor=intensity_factor,
+            backend=backend,
+            hooks=hooks,
         )
-        output_ahap = os.path.join(
-            output_dir,
-            input_base.replace(Path(input_wav).suffix, f"_{split_type}.ahap"),
+    output_files = write_ahap_outputs(
+        events,
+        input_name,
+        output_dir,
+        split,
+        compact=compact,
+        incremental=streaming,
+        hooks=hooks,
+    )
+
+    if cache is not None and cache_key is not None:
+        cache.store(cache_key, output_paths)
+    return output_files
+
+
+def ahap_output_paths(input_name: str, output_dir: str, split: str) -> list[tuple[str, str]]:
+    """Return the `(output_path, split_type)` pairs written for `input_name` and `split`."""
+    split = _canonical_split(split)
+    suffix = Path(input_name).suffix
+
+    if split == "none":
+        output_ahap = os.path.join(output_dir, input_name.replace(suffix, ".ahap") if suffix else f"{input_name}.ahap")
+        return [(output_ahap.replace("_background", ""), split)]
+
+    split_targets = _SPLIT_TARGETS if split == "all" else (split,)
+    return [
+        (
+            os.path.join(
+                output_dir,
+                input_name.replace(suffix, f"_{split_type}.ahap") if suffix else f"{input_name}_{split_type}.ahap",
+            ),
+            split_type,
         )
-        write_ahap_file(output_ahap, ahap_data)
+        for split_type in split_targets
+    ]
+
+
+def write_ahap_outputs(
+    events: HapticEvents,
+    input_name: str,
+    output_dir: str,
+    split: str,
+    compact: bool = False,
+    incremental: bool = False,
+    hooks: AhapHooks | None = None,
+) -> list[str]:
+    """Write the `.ahap` file(s) for `split` next to each other in `output_dir`.
+
+    Output names come from `ahap_output_paths`. Every file is written atomically.
+    """
+    output_files: list[str] = []
+
+    # Splits only differ by their profile multipliers, so every variant is built
+    # from the same event arrays.
+    for output_ahap, split_type in ahap_output_paths(input_name, output_dir, split):
+        with track_stage(hooks, "serialization") as stage:
+            if incremental:
+                stage.count = write_ahap_events(output_ahap, events, split_type, compact=compact)
+            else:
+                ahap_data = build_ahap(events, split_type, compact=compact)
+                write_ahap_file(output_ahap, ahap_data, compact=compact)
+                stage.count = len(ahap_data["Pattern"])  # type: ignore[arg-type]
         output_files.append(output_ahap)
 
     return output_files
 
 
-def generate_ahap_from_file(background_file: str, output_dir: str = "ahap_outputs") -> str:
+def generate_ahap_from_file(
+    background_file: str,
+    output_dir: str = "ahap_outputs",
+    cache: AhapCache | None = None,
+    backend: str = "auto",
+    hooks: AhapHooks | None = None,
+) -> str:
     """Generate a single `.ahap` output file from a background audio file path."""
-    outputs = convert_wav_to_ahap(background_file, output_dir, mode="sfx", split="none")
+    outputs = convert_wav_to_ahap(
+        background_file,
+        output_dir,
+        mode="sfx",
+        split="none",
+        cache=cache,
+        backend=backend,
+        hooks=hooks,
+    )
     return outputs[0]
+
+
+_WARMUP_SAMPLE_RATE = 16000
+_WARMUP_SECONDS = 1.0
+
+
+def _warmup_wav_bytes() -> bytes:
+    """Return a short 16-bit WAV of a low tone with a click every quarter second."""
+    t = np.arange(int(_WARMUP_SAMPLE_RATE * _WARMUP_SECONDS)) / _WARMUP_SAMPLE_RATE
+    signal = 0.2 * np.sin(2 * np.pi * 220.0 * t)
+    signal[:: _WARMUP_SAMPLE_RATE // 4] += 0.8
+    pcm = (np.clip(signal, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    return wav_header(len(pcm), _WARMUP_SAMPLE_RATE) + pcm
+
+
+def warm_up_ahap(sample_rate: int = 44100, backend: str = "auto") -> float:
+    """Run AHAP analysis once on a tiny synthetic signal; return the seconds it took.
+
+    This resolves librosa's lazily loaded submodules and compiles its numba
+    kernels (onset peak picking, HPSS, spectral features), so the first real
+    conversion in a process does not pay for them. Numba also writes the compiled
+    kernels to its on-disk cache (`NUMBA_CACHE_DIR` when set), which later
+    processes load instead of recompiling. The signal is resampled on the way
+    in, as lower-rate TTS audio is, so the resampler is loaded too.
+    """
+    started = time.perf_counter()
+    backend = _resolve_backend(backend)
+    wav_bytes = _warmup_wav_bytes()
+    analyze_audio_file(io.BytesIO(wav_bytes), "sfx", sample_rate=sample_rate, backend=backend)
+    generate_ahap_from_audio(wav_bytes, sample_rate=sample_rate, backend=backend, as_bytes=True)
+    return time.perf_counter() - started
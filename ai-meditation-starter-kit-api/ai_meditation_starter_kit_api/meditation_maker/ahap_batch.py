@@ -0,0 +1,234 @@
+"""Convert many audio files or in-memory buffers to AHAP over a process pool."""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .ahap import AHAP_BACKENDS, FAST_ANALYSIS_SAMPLE_RATE, ahap_output_paths, convert_audio_to_ahap
+from .ahap_cache import AhapCache, default_ahap_cache
+from .ahap_hooks import StageTimings
+
+# A batch input is either a path or a `(name, wav_bytes)` pair.
+BatchInput = str | os.PathLike[str] | tuple[str, bytes]
+
+
+@dataclass(slots=True)
+class BatchResult:
+    """Outcome of converting one batch input."""
+
+    source: str
+    output_files: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+    stage_seconds: dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+def default_worker_count() -> int:
+    """Return the number of CPU cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return os.cpu_count() or 1
+
+
+def _source_label(source: BatchInput) -> str:
+    return source[0] if isinstance(source, tuple) else str(source)
+
+
+def _output_paths(source: BatchInput, output_dir: str | None, split: str) -> list[str]:
+    """Return the paths `_convert_one` would write `source`'s outputs to."""
+    if isinstance(source, tuple):
+        target_dir, name = output_dir or "", source[0]
+    else:
+        target_dir, name = output_dir or str(Path(source).resolve().parent), Path(source).name
+    return [output_path for output_path, _ in ahap_output_paths(name, target_dir, split)]
+
+
+def _convert_one(
+    source: BatchInput,
+    output_dir: str | None,
+    mode: str,
+    split: str,
+    sample_rate: int,
+    sharpness_factor: float,
+    intensity_factor: float,
+    compact: bool,
+    streaming: bool,
+    cache: AhapCache | None,
+    backend: str,
+) -> BatchResult:
+    started = time.perf_counter()
+    audio_input: str | io.BytesIO
+    if isinstance(source, tuple):
+        name, audio_bytes = source
+        audio_input = io.BytesIO(audio_bytes)
+        result = BatchResult(source=name)
+        default_dir = None
+    else:
+        name = Path(source).name
+        audio_input = str(source)
+        result = BatchResult(source=audio_input)
+        default_dir = str(Path(source).resolve().parent)
+
+    timings = StageTimings()
+    try:
+        target_dir = output_dir or default_dir
+        if not target_dir:
+            msg = "output_dir is required for in-memory inputs."
+            raise ValueError(msg)
+        result.output_files = convert_audio_to_ahap(
+            audio_input,
+            name,
+            target_dir,
+            mode,
+            split,
+            sample_rate=sample_rate,
+            sharpness_factor=sharpness_factor,
+            intensity_factor=intensity_factor,
+            compact=compact,
+            streaming=streaming,
+            cache=cache,
+            backend=backend,
+            hooks=timings,
+        )
+    except Exception as error:
+        result.error = f"{type(error).__name__}: {error}"
+
+    result.seconds = time.perf_counter() - started
+    result.stage_seconds = timings.seconds
+    return result
+
+
+def convert_wavs_to_ahap(
+    sources: Iterable[BatchInput],
+    output_dir: str | None,
+    mode: str,
+    split: str,
+    sample_rate: int = 44100,
+    sharpness_factor: float = 3.0,
+    intensity_factor: float = 2.5,
+    compact: bool = False,
+    streaming: bool = False,
+    max_workers: int | None = None,
+    cache: AhapCache | None = None,
+    backend: str = "auto",
+) -> list[BatchResult]:
+    """Convert many audio inputs to `.ahap` files in parallel.
+
+    `sources` may mix file paths and ``(name, wav_bytes)`` pairs; in-memory inputs
+    are named after `name` and require `output_dir`; inputs whose outputs would
+    share a name in one directory raise `ValueError`. Each input is analyzed in
+    its own worker process (one per core by default) and every output is written
+    atomically. Failures, including a crashed worker, are reported per input
+    instead of aborting the batch.
+    Results are returned in input order, each with its per-stage timings (see
+    `ahap_hooks`). Inputs already converted with the same parameters are served
+    from `cache` (see `convert_audio_to_ahap`).
+    """
+    source_list = list(sources)
+    if not source_list:
+        return []
+
+    writers: dict[str, str] = {}
+    for source in source_list:
+        for output_path in _output_paths(source, output_dir, split):
+            if output_path in writers:
+                msg = f"Batch inputs {writers[output_path]!r} and {_source_label(source)!r} would both write {output_path}."
+                raise ValueError(msg)
+            writers[output_path] = _source_label(source)
+
+    if cache is None:
+        cache = default_ahap_cache()
+    options = (
+        output_dir,
+        mode,
+        split,
+        sample_rate,
+        sharpness_factor,
+        intensity_factor,
+        compact,
+        streaming,
+        cache,
+        backend,
+    )
+    worker_count = min(max_workers or default_worker_count(), len(source_list))
+    if worker_count == 1:
+        return [_convert_one(source, *options) for source in source_list]
+
+    results: list[BatchResult | None] = [None] * len(source_list)
+    with ProcessPoolExecutor(max_workers=worker_count) as executor:
+        futures = {executor.submit(_convert_one, source, *options): index for index, source in enumerate(source_list)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as error:
+                # E.g. BrokenProcessPool after a worker was OOM-killed, or an
+                # exception that could not be pickled back.
+                results[index] = BatchResult(
+                    source=_source_label(source_list[index]), error=f"{type(error).__name__}: {error}"
+                )
+
+    return [result for result in results if result is not None]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert audio files to AHAP haptics in parallel.")
+    parser.add_argument("paths", nargs="+", type=Path, help="Audio files to convert.")
+    parser.add_argument("--output-dir", default=None, help="Output directory (defaults to each input's directory).")
+    parser.add_argument("--mode", default="sfx", help="Haptic mode: 'sfx' or anything else for speech.")
+    parser.add_argument("--split", default="none", help="'none', 'all' or one of bass/vocals/drums/other.")
+    parser.add_argument(
+        "--sample-rate",
+        type=int,
+        default=44100,
+        help=f"Analysis sample rate ({FAST_ANALYSIS_SAMPLE_RATE} for fast analysis).",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (defaults to CPU cores).")
+    parser.add_argument("--compact", action="store_true", help="Write compact AHAP output.")
+    parser.add_argument("--streaming", action="store_true", help="Analyze in bounded-memory blocks.")
+    parser.add_argument(
+        "--backend",
+        choices=AHAP_BACKENDS,
+        default="auto",
+        help="Analysis backend ('auto' uses librosa when installed, NumPy otherwise).",
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = convert_wavs_to_ahap(
+        [str(path) for path in args.paths],
+        args.output_dir,
+        mode=args.mode,
+        split=args.split,
+        sample_rate=args.sample_rate,
+        compact=args.compact,
+        streaming=args.streaming,
+        max_workers=args.workers,
+        backend=args.backend,
+    )
+
+    for result in results:
+        if result.success:
+            print(f"{result.seconds:8.2f}s  {result.source} -> {', '.join(result.output_files)}")
+        else:
+            print(f"{result.seconds:8.2f}s  {result.source} FAILED: {result.error}")
+
+    failures = sum(1 for result in results if not result.success)
+    print(f"\n{len(results) - failures}/{len(results)} converted in {time.perf_counter() - started:.2f}s")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Content-addressed cache for generated `.ahap` files.
+
+Entries are keyed on the audio bytes plus every parameter that changes the
+output, so identical bells, chimes and SFX are analyzed once per parameter set
+no matter which file name or meditation they arrive under.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from .config import (
+    get_ahap_cache_dir,
+    get_ahap_cache_max_bytes,
+    get_ahap_shared_cache_dir,
+    get_ahap_shared_cache_max_bytes,
+    load_project_env,
+)
+from .disk_cache import LruDiskTier, default_tier
+
+# Bump whenever the analysis changes its output for the same inputs.
+AHAP_CACHE_VERSION = 3
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def hash_audio(audio_input: str | os.PathLike[str] | BinaryIO | bytes) -> str:
+    """Return the SHA-256 hex digest of an audio file, stream or byte string."""
+    digest = hashlib.sha256()
+    if isinstance(audio_input, bytes):
+        digest.update(audio_input)
+    elif isinstance(audio_input, (str, os.PathLike)):
+        with open(audio_input, "rb") as f:
+            while chunk := f.read(_HASH_CHUNK_BYTES):
+                digest.update(chunk)
+    else:
+        position = audio_input.tell()
+        while chunk := audio_input.read(_HASH_CHUNK_BYTES):
+            digest.update(chunk)
+        audio_input.seek(position)
+    return digest.hexdigest()
+
+
+def ahap_cache_key(
+    audio_hash: str,
+    mode: str,
+    split: str,
+    sample_rate: int,
+    sharpness_factor: float,
+    intensity_factor: float,
+    compact: bool = False,
+    backend: str = "librosa",
+    streaming: bool = False,
+) -> str:
+    """Return the cache key for one audio content hash and parameter set.
+
+    `streaming` is part of the key because block-wise analysis resamples and
+    normalizes per block, so its output may differ from whole-file analysis.
+    """
+    parameters = {
+        "version": AHAP_CACHE_VERSION,
+        "audio": audio_hash,
+        "mode": mode,
+        "split": split,
+        "sample_rate": sample_rate,
+        "sharpness_factor": float(sharpness_factor),
+        "intensity_factor": float(intensity_factor),
+        "compact": compact,
+        "backend": backend,
+        "streaming": streaming,
+    }
+    return hashlib.sha256(json.dumps(parameters, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _copy_atomic(source: Path, destination: Path) -> None:
+    temp_path = f"{destination}.{uuid.uuid4().hex}.tmp"
+    try:
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, destination)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+@dataclass(slots=True)
+class DiskCacheTier(LruDiskTier):
+    """An `LruDiskTier` whose entries are directories of `<split>.ahap` files.
+
+    Entries are published with a single directory rename, so concurrent writers
+    and readers never observe a partial entry.
+    """
+
+    def get(self, key: str) -> dict[str, Path] | None:
+        entry_dir = self._entry_path(key)
+        try:
+            files = {path.stem: path for path in entry_dir.glob("*.ahap")}
+        except OSError:
+            return None
+        return files if files and self._touch(entry_dir) else None
+
+    def put(self, key: str, files: dict[str, str | Path]) -> None:
+        entry_dir = self._entry_path(key)
+        if entry_dir.exists():
+            return
+
+        entry_dir.parent.mkdir(parents=True, exist_ok=True)
+        staging_dir = entry_dir.parent / f".staging-{uuid.uuid4().hex}"
+        staging_dir.mkdir()
+        entry_bytes = 0
+        try:
+            for split_type, path in files.items():
+                shutil.copyfile(path, staging_dir / f"{split_type}.ahap")
+                entry_bytes += (staging_dir / f"{split_type}.ahap").stat().st_size
+            os.rename(staging_dir, entry_dir)
+        except OSError:
+            # Another writer published the same entry first.
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            if not entry_dir.exists():
+                raise
+            return
+        self._added(entry_bytes)
+
+
+@dataclass(slots=True)
+class AhapCache:
+    """A local-disk cache tier backed by an optional shared, size-bounded tier."""
+
+    local: DiskCacheTier
+    shared: DiskCacheTier | None = None
+
+    def restore(self, key: str, output_paths: list[tuple[str, str]]) -> bool:
+        """Copy a cached entry to `(output_path, split_type)` targets; return whether it hit."""
+        try:
+            files = self.local.get(key)
+            if files is None and self.shared is not None:
+                files = self.shared.get(key)
+                if files is not None:
+                    self.local.put(key, dict(files))
+            if files is None or any(split_type not in files for _, split_type in output_paths):
+                return False
+
+            for output_path, split_type in output_paths:
+                _copy_atomic(files[split_type], Path(output_path))
+        except OSError:
+            # The entry was evicted while we were reading it; treat it as a miss.
+            return False
+        return True
+
+    def store(self, key: str, output_paths: list[tuple[str, str]]) -> None:
+        """Record freshly written `(output_path, split_type)` files under `key`."""
+        files: dict[str, str | Path] = {split_type: output_path for output_path, split_type in output_paths}
+        self.local.put(key, files)
+        if self.shared is not None:
+            self.shared.put(key, files)
+
+
+def default_ahap_cache() -> AhapCache | None:
+    """Build the cache configured by `AHAP_CACHE_DIR` / `AHAP_SHARED_CACHE_DIR`, if any."""
+    load_project_env()
+
+    local_dir = get_ahap_cache_dir()
+    if not local_dir:
+        return None
+
+    shared_dir = get_ahap_shared_cache_dir()
+    shared = default_tier(DiskCacheTier, shared_dir, get_ahap_shared_cache_max_bytes()) if shared_dir else None
+    return AhapCache(local=default_tier(DiskCacheTier, local_dir, get_ahap_cache_max_bytes()), shared=shared)
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+COMPACT_FLOAT_PRECISION = 3
+COMPACT_MERGE_TOLERANCE = 0.02
+
+# Core Haptics limits for a single continuous event and a single parameter curve.
+_MAX_CONTINUOUS_DURATION = 30.0
+_MAX_CURVE_CONTROL_POINTS = 16
+
+
+@dataclass(slots=True)
+class ContinuousRun:
+    """A run of fixed-step continuous events, as step indices ``[start, stop)``."""
+
+    start: int
+    stop: int
+    intensity: float
+    sharpness: float
+
+    def control_steps(self) -> list[int]:
+        # Curves interpolate linearly, so longer runs get a second point to hold their value.
+        return [self.start] if self.stop - self.start == 1 else [self.start, self.stop - 1]
+
+
+def merge_continuous_runs(
+    intensities: np.ndarray,
+    sharpnesses: np.ndarray,
+    tolerance: float = COMPACT_MERGE_TOLERANCE,
+) -> list[ContinuousRun]:
+    """Merge adjacent steps whose intensity and sharpness stay within `tolerance` of the run start."""
+    intensity_values = intensities.tolist()
+    sharpness_values = sharpnesses.tolist()
+    step_count = len(intensity_values)
+
+    runs: list[ContinuousRun] = []
+    start = 0
+    for index in range(1, step_count + 1):
+        if (
+            index < step_count
+            and abs(intensity_values[index] - intensity_values[start]) <= tolerance
+            and abs(sharpness_values[index] - sharpness_values[start]) <= tolerance
+        ):
+            continue
+        runs.append(
+            ContinuousRun(
+                start=start,
+                stop=index,
+                intensity=float(np.mean(intensities[start:index])),
+                sharpness=float(np.mean(sharpnesses[start:index])),
+            )
+        )
+        start = index
+
+    return runs
+
+
+def _curve_segments(
+    runs: list[ContinuousRun],
+    onset_times: np.ndarray,
+    time_step: float,
+) -> list[list[ContinuousRun]]:
+    """Group runs into segments that can share one event plus parameter curves.
+
+    Parameter curves scale every event that is playing, so runs that overlap an
+    onset event stay as standalone events to keep onset intensities untouched.
+    """
+    onset_steps = np.sort(np.floor(np.asarray(onset_times) / time_step).astype(int))
+    max_segment_steps = int(_MAX_CONTINUOUS_DURATION / time_step)
+
+    segments: list[list[ContinuousRun]] = []
+    current: list[ContinuousRun] = []
+    current_points = 0
+    for run in runs:
+        overlaps_onset = np.searchsorted(onset_steps, run.start) < np.searchsorted(onset_steps, run.stop)
+        run_points = len(run.control_steps())
+        fits = (
+            current
+            and current_points + run_points <= _MAX_CURVE_CONTROL_POINTS
+            and run.stop - current[0].start <= max_segment_steps
+        )
+        if overlaps_onset or not fits:
+            if current:
+                segments.append(current)
+            current = []
+            current_points = 0
+        if overlaps_onset:
+            segments.append([run])
+        else:
+            current.append(run)
+            current_points += run_points
+
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _event(time: float, duration: float, intensity: float, sharpness: float) -> dict[str, object]:
+    return {
+        "Event": {
+            "Time": time,
+            "EventType": "HapticContinuous",
+            "EventDuration": duration,
+            "EventParameters": [
+                {"ParameterID": "HapticIntensity", "ParameterValue": intensity},
+                {"ParameterID": "HapticSharpness", "ParameterValue": sharpness},
+            ],
+        }
+    }
+
+
+def _curve(parameter_id: str, time: float, points: list[tuple[float, float]]) -> dict[str, object]:
+    return {
+        "ParameterCurve": {
+            "ParameterID": parameter_id,
+            "Time": time,
+            "ParameterCurveControlPoints": [
+                {"Time": point_time, "ParameterValue": value} for point_time, value in points
+            ],
+        }
+    }
+
+
+def compact_continuous_pattern(
+    intensities: np.ndarray,
+    sharpnesses: np.ndarray,
+    time_step: float,
+    onset_times: np.ndarray,
+    tolerance: float = COMPACT_MERGE_TOLERANCE,
+    use_curves: bool = True,
+) -> list[dict[str, object]]:
+    """Return pattern entries for fixed-step continuous events in compact form.
+
+    Adjacent steps are merged into longer events, and with `use_curves` runs of
+    merged events become one full-scale event driven by intensity/sharpness
+    ``ParameterCurve`` entries.
+    """
+    runs = merge_continuous_runs(intensities, sharpnesses, tolerance)
+    segments = _curve_segments(runs, onset_times, time_step) if use_curves else [[run] for run in runs]
+
+    pattern: list[dict[str, object]] = []
+    for segment in segments:
+        segment_time = segment[0].start * time_step
+        segment_duration = (segment[-1].stop - segment[0].start) * time_step
+        if len(segment) == 1:
+            run = segment[0]
+            pattern.append(_event(segment_time, segment_duration, run.intensity, run.sharpness))
+            continue
+
+        # Intensity control multiplies the event intensity and sharpness control is
+        # added to the event sharpness, so a (1.0, 0.0) base event plays the curve values.
+        pattern.append(_event(segment_time, segment_duration, 1.0, 0.0))
+        points = [(step * time_step - segment_time, run) for run in segment for step in run.control_steps()]
+        pattern.append(
+            _curve("HapticIntensityControl", segment_time, [(offset, run.intensity) for offset, run in points])
+        )
+        pattern.append(
+            _curve("HapticSharpnessControl", segment_time, [(offset, run.sharpness) for offset, run in points])
+        )
+
+    return pattern
+
+
+def reconstruct_continuous_envelope(
+    intensities: np.ndarray,
+    sharpnesses: np.ndarray,
+    time_step: float,
+    onset_times: np.ndarray,
+    tolerance: float = COMPACT_MERGE_TOLERANCE,
+    use_curves: bool = True,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the per-step intensity/sharpness a device plays for the compact pattern."""
+    runs = merge_continuous_runs(intensities, sharpnesses, tolerance)
+    segments = _curve_segments(runs, onset_times, time_step) if use_curves else [[run] for run in runs]
+
+    played_intensity = np.zeros(len(intensities))
+    played_sharpness = np.zeros(len(sharpnesses))
+    for segment in segments:
+        start, stop = segment[0].start, segment[-1].stop
+        if len(segment) == 1:
+            played_intensity[start:stop] = segment[0].intensity
+            played_sharpness[start:stop] = segment[0].sharpness
+            continue
+
+        # Curves interpolate linearly between control points and hold the last value.
+        steps = np.arange(start, stop)
+        points = [(step, run) for run in segment for step in run.control_steps()]
+        point_steps = [step for step, _ in points]
+        played_intensity[start:stop] = np.interp(steps, point_steps, [run.intensity for _, run in points])
+        played_sharpness[start:stop] = np.interp(steps, point_steps, [run.sharpness for _, run in points])
+
+    return played_intensity, played_sharpness
+
+
+def round_floats(value: object, precision: int = COMPACT_FLOAT_PRECISION) -> object:
+    """Recursively round every float in an AHAP payload."""
+    if isinstance(value, float):
+        return round(value, precision)
+    if isinstance(value, dict):
+        return {key: round_floats(item, precision) for key, item in value.items()}
+    if isinstance(value, list):
+        return [round_floats(item, precision) for item in value]
+    return value
@@ -0,0 +1,78 @@
+"""Stage hooks for AHAP generation.
+
+Generation reports each stage it runs (see `AHAP_STAGES`) to an optional
+`AhapHooks` object, once per stage rather than once per event, so progress and
+timings can be exported to metrics without a console progress bar. With no
+hooks, no clock is read at all.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+# Stage names in pipeline order. `count` is the number of items a stage produced:
+# samples for load/resample, STFT frames for hpss/features, onsets for
+# onset_detection/transient_events, continuous steps for continuous_events and
+# pattern entries for serialization.
+AHAP_STAGES = (
+    "load",
+    "resample",
+    "hpss",
+    "features",
+    "onset_detection",
+    "transient_events",
+    "continuous_events",
+    "serialization",
+)
+
+
+class AhapHooks:
+    """Receives AHAP generation stage boundaries; the base class ignores them.
+
+    Subclass and override either method. Streaming analysis reports its
+    per-block stages (load, resample, hpss, features) once per block.
+    """
+
+    def stage_started(self, stage: str) -> None:
+        pass
+
+    def stage_finished(self, stage: str, seconds: float, count: int) -> None:
+        pass
+
+
+@dataclass(slots=True)
+class StageTimings(AhapHooks):
+    """Hooks that sum wall time and item counts per stage."""
+
+    seconds: dict[str, float] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=dict)
+
+    def stage_finished(self, stage: str, seconds: float, count: int) -> None:
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+        self.counts[stage] = self.counts.get(stage, 0) + count
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.seconds.values())
+
+
+@dataclass(slots=True)
+class _StageRecord:
+    count: int = 0
+
+
+@contextmanager
+def track_stage(hooks: AhapHooks | None, stage: str) -> Iterator[_StageRecord]:
+    """Report `stage` to `hooks` around the block; set `.count` on the yielded record."""
+    record = _StageRecord()
+    if hooks is None:
+        yield record
+        return
+
+    hooks.stage_started(stage)
+    started = time.perf_counter()
+    yield record
+    hooks.stage_finished(stage, time.perf_counter() - started, record.count)
@@ -0,0 +1,231 @@
+"""Pure-NumPy versions of the librosa/scipy routines used for AHAP analysis.
+
+Each function follows the librosa (0.10+) or scipy default it replaces, so the
+`numpy` backend in `ahap.py` produces the same features without pulling in
+librosa, numba, scipy or soundfile. Resampling is the one approximation: it is
+FFT-based rather than soxr.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Upper bound on temporary elements per median-filter chunk (~16 MB of float32).
+_MEDIAN_CHUNK_ELEMENTS = 4 * 1024 * 1024
+
+
+def _tiny(values: np.ndarray) -> float:
+    dtype = values.dtype if np.issubdtype(values.dtype, np.floating) else np.dtype(np.float32)
+    return float(np.finfo(dtype).tiny)
+
+
+def _hann(n_fft: int) -> np.ndarray:
+    """Periodic Hann window, as `scipy.signal.get_window("hann", n_fft)`."""
+    return (0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(n_fft) / n_fft)).astype(np.float32)
+
+
+def _frames(signal: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """Return a strided `(frames, frame_length)` view of consecutive frames."""
+    if len(signal) < frame_length:
+        return np.zeros((0, frame_length), dtype=signal.dtype)
+    return sliding_window_view(signal, frame_length)[::hop_length]
+
+
+def stft(audio_data: np.ndarray, n_fft: int, hop_length: int) -> np.ndarray:
+    """Centered, zero-padded Hann STFT, shaped `(1 + n_fft // 2, frames)`."""
+    padded = np.pad(audio_data, n_fft // 2)
+    frames = _frames(padded, n_fft, hop_length)
+    spectrum = np.fft.rfft(frames * _hann(n_fft), axis=1)
+    return spectrum.T.astype(np.complex64 if audio_data.dtype == np.float32 else np.complex128)
+
+
+def istft(stft_matrix: np.ndarray, n_fft: int, hop_length: int, length: int, dtype: np.dtype) -> np.ndarray:
+    """Inverse of `stft` by weighted overlap-add, trimmed to `length` samples."""
+    window = _hann(n_fft)
+    frame_count = min(stft_matrix.shape[1], math.ceil((length + 2 * (n_fft // 2)) / hop_length))
+    frames = np.fft.irfft(stft_matrix[:, :frame_count].T, n=n_fft, axis=1).astype(dtype) * window
+
+    signal_length = n_fft + hop_length * (frame_count - 1)
+    signal = np.zeros(signal_length, dtype=dtype)
+    window_sum = np.zeros(signal_length, dtype=dtype)
+    if n_fft % hop_length == 0:
+        # Add every `n_fft // hop_length`-th hop slice of all frames at once.
+        hops_per_frame = n_fft // hop_length
+        frame_hops = frames.reshape(frame_count, hops_per_frame, hop_length)
+        window_hops = (window**2).reshape(hops_per_frame, hop_length)
+        for index in range(hops_per_frame):
+            start = index * hop_length
+            stop = start + frame_count * hop_length
+            signal[start:stop] += frame_hops[:, index, :].reshape(-1)
+            window_sum[start:stop] += np.tile(window_hops[index], frame_count)
+    else:
+        for index in range(frame_count):
+            start = index * hop_length
+            signal[start : start + n_fft] += frames[index]
+            window_sum[start : start + n_fft] += window**2
+
+    nonzero = window_sum > _tiny(window_sum)
+    signal[nonzero] /= window_sum[nonzero]
+
+    signal = signal[n_fft // 2 :]
+    if len(signal) < length:
+        signal = np.pad(signal, (0, length - len(signal)))
+    return signal[:length]
+
+
+def median_filter(values: np.ndarray, size: int, axis: int) -> np.ndarray:
+    """Running median of odd `size` along `axis` of a 2-D array.
+
+    Matches `scipy.ndimage.median_filter(values, size=..., mode="reflect")` with
+    a window that spans only `axis`. Windows are materialized in chunks along
+    the other axis to bound memory.
+    """
+    half = size // 2
+    pad_width = [(0, 0), (0, 0)]
+    pad_width[axis] = (half, half)
+    windows = sliding_window_view(np.pad(values, pad_width, mode="symmetric"), size, axis=axis)
+
+    other_axis = 1 - axis
+    chunk = max(_MEDIAN_CHUNK_ELEMENTS // max(values.shape[axis] * size, 1), 1)
+    filtered = np.empty_like(values)
+    for start in range(0, values.shape[other_axis], chunk):
+        index = [slice(None), slice(None)]
+        index[other_axis] = slice(start, start + chunk)
+        filtered[tuple(index)] = np.median(windows[tuple(index)], axis=-1)
+    return filtered
+
+
+def softmask(values: np.ndarray, reference: np.ndarray, power: float, split_zeros: bool) -> np.ndarray:
+    """Soft mask `values ** power / (values ** power + reference ** power)`."""
+    dtype = values.dtype if np.issubdtype(values.dtype, np.floating) else np.float32
+    scale = np.maximum(values, reference).astype(dtype)
+    bad = scale < np.finfo(dtype).tiny
+    scale[bad] = 1
+
+    mask = (values / scale) ** power
+    reference_mask = (reference / scale) ** power
+    good = ~bad
+    mask[good] /= mask[good] + reference_mask[good]
+    mask[bad] = 0.5 if split_zeros else 0.0
+    return mask
+
+
+def rms(audio_data: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """Centered frame RMS, as `librosa.feature.rms(y=...)[0]`."""
+    padded = np.pad(audio_data, frame_length // 2)
+    frames = _frames(padded, frame_length, hop_length)
+    power = np.einsum("ij,ij->i", frames, frames) / frame_length
+    return np.sqrt(power).astype(audio_data.dtype)
+
+
+def fft_frequencies(sample_rate: int, n_fft: int) -> np.ndarray:
+    return np.fft.rfftfreq(n_fft, d=1.0 / sample_rate)
+
+
+def spectral_centroid(magnitude: np.ndarray, sample_rate: int, n_fft: int) -> np.ndarray:
+    """Per-frame spectral centroid of a magnitude spectrogram."""
+    totals = magnitude.sum(axis=0)
+    totals = np.where(totals < _tiny(magnitude), 1.0, totals)
+    return (fft_frequencies(sample_rate, n_fft) @ magnitude) / totals
+
+
+def _hz_to_mel(frequencies: np.ndarray) -> np.ndarray:
+    """Slaney mel scale: linear below 1 kHz, logarithmic above."""
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    mels = frequencies / (200.0 / 3)
+    log_region = frequencies >= 1000.0
+    mels[log_region] = 15.0 + np.log(frequencies[log_region] / 1000.0) / (np.log(6.4) / 27.0)
+    return mels
+
+
+def _mel_to_hz(mels: np.ndarray) -> np.ndarray:
+    mels = np.asarray(mels, dtype=np.float64)
+    frequencies = mels * (200.0 / 3)
+    log_region = mels >= 15.0
+    frequencies[log_region] = 1000.0 * np.exp((np.log(6.4) / 27.0) * (mels[log_region] - 15.0))
+    return frequencies
+
+
+def mel_filterbank(sample_rate: int, n_fft: int, n_mels: int) -> np.ndarray:
+    """Slaney-normalized triangular mel filters, as `librosa.filters.mel`."""
+    fft_freqs = fft_frequencies(sample_rate, n_fft)
+    max_mel = _hz_to_mel(np.array([sample_rate / 2.0]))[0]
+    mel_freqs = _mel_to_hz(np.linspace(0.0, max_mel, n_mels + 2))
+    widths = np.diff(mel_freqs)
+    ramps = mel_freqs[:, None] - fft_freqs[None, :]
+
+    lower = -ramps[:-2] / widths[:-1, None]
+    upper = ramps[2:] / widths[1:, None]
+    weights = np.maximum(0, np.minimum(lower, upper))
+    weights *= (2.0 / (mel_freqs[2:] - mel_freqs[:-2]))[:, None]
+    return weights.astype(np.float32)
+
+
+def power_to_db(power: np.ndarray | float, amin: float = 1e-10) -> np.ndarray:
+    return 10.0 * np.log10(np.maximum(amin, power))
+
+
+def onset_strength(mel_db: np.ndarray, n_fft: int, hop_length: int, lag: int = 1) -> np.ndarray:
+    """Spectral flux of a dB mel spectrogram, centered like `librosa.onset.onset_strength`."""
+    flux = np.maximum(0.0, mel_db[:, lag:] - mel_db[:, :-lag]).mean(axis=0)
+    shift = lag + n_fft // (2 * hop_length)
+    return np.pad(flux, (shift, 0))[: mel_db.shape[1]]
+
+
+def onset_detect(onset_envelope: np.ndarray, sample_rate: int, hop_length: int) -> np.ndarray:
+    """Peak-pick onset frames with librosa's default `onset_detect` heuristics."""
+    envelope = np.asarray(onset_envelope, dtype=np.float64)
+    if envelope.size == 0 or not envelope.any():
+        return np.array([], dtype=int)
+
+    envelope = envelope - envelope.min()
+    envelope /= envelope.max() + np.finfo(np.float64).tiny
+
+    pre_max = int(0.03 * sample_rate // hop_length)
+    post_max = int(0.00 * sample_rate // hop_length + 1)
+    pre_avg = int(0.10 * sample_rate // hop_length)
+    post_avg = int(0.10 * sample_rate // hop_length + 1)
+    wait = int(0.03 * sample_rate // hop_length)
+    delta = 0.07
+
+    # x[n] must be the maximum of x[n - pre_max:n + post_max] and at least
+    # `delta` above the mean of x[n - pre_avg:n + post_avg].
+    count = len(envelope)
+    padded_max = np.pad(envelope, (pre_max, post_max - 1), constant_values=-np.inf)
+    local_max = sliding_window_view(padded_max, pre_max + post_max).max(axis=1)
+
+    cumulative = np.concatenate(([0.0], np.cumsum(envelope)))
+    positions = np.arange(count)
+    window_start = np.maximum(positions - pre_avg, 0)
+    window_stop = np.minimum(positions + post_avg, count)
+    local_mean = (cumulative[window_stop] - cumulative[window_start]) / (window_stop - window_start)
+
+    candidates = np.flatnonzero((envelope == local_max) & (envelope >= local_mean + delta))
+
+    # After each peak, the next `wait` frames are skipped.
+    onsets: list[int] = []
+    for frame in candidates.tolist():
+        if not onsets or frame > onsets[-1] + wait:
+            onsets.append(frame)
+    return np.array(onsets, dtype=int)
+
+
+def resample(audio_data: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """Band-limited FFT resampling to `ceil(len * target_sr / orig_sr)` samples."""
+    if orig_sr == target_sr or audio_data.size == 0:
+        return audio_data
+
+    source_length = len(audio_data)
+    target_length = int(math.ceil(source_length * target_sr / orig_sr))
+    spectrum = np.fft.rfft(audio_data)
+    resized = np.zeros(target_length // 2 + 1, dtype=spectrum.dtype)
+    shared_bins = min(len(spectrum), len(resized))
+    resized[:shared_bins] = spectrum[:shared_bins]
+    if target_length < source_length and target_length % 2 == 0:
+        # The new Nyquist bin must be real.
+        resized[-1] = resized[-1].real
+    resampled = np.fft.irfft(resized, n=target_length) * (target_length / source_length)
+    return resampled.astype(audio_data.dtype)
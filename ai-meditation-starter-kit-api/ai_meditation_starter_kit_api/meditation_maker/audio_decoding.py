@@ -0,0 +1,353 @@
+"""Decode provider audio to 16-bit mono 44.1 kHz WAV with exact headers.
+
+ElevenLabs returns MP3 even when WAV is requested. Clips that libsndfile
+(through `soundfile`, which librosa installs) can read at 44.1 kHz, including
+ElevenLabs' MP3 when the installed libsndfile supports MP3, are decoded in
+process without spawning ffmpeg. Everything else, including audio that needs
+resampling and MP3 on an older libsndfile, falls back to one ffmpeg call. Either decoder yields raw
+PCM and the WAV header is written here, so its frame count is exact and
+durations can be read from the header rather than estimated from the file size.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import io
+import os
+import struct
+import subprocess
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterable, Callable, Iterable
+
+WAV_SAMPLE_RATE = 44100
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+_SAMPLE_WIDTH = 2
+_CHUNK_BYTES = 64 * 1024
+
+
+def _ffmpeg_to_pcm_command(input_format: str | None) -> list[str]:
+    """Return an ffmpeg command decoding stdin to raw 16-bit mono PCM on stdout."""
+    input_args = ["-f", input_format] if input_format else []
+    return [
+        "ffmpeg",
+        "-loglevel",
+        "error",
+        *input_args,
+        "-i",
+        "pipe:0",
+        "-ar",
+        str(WAV_SAMPLE_RATE),
+        "-ac",
+        "1",
+        "-f",
+        "s16le",
+        "pipe:1",
+    ]
+
+
+@dataclass(frozen=True, slots=True)
+class DecodedAudio:
+    """A 16-bit mono WAV and its exact length in frames."""
+
+    wav_bytes: bytes
+    frame_count: int
+    sample_rate: int = WAV_SAMPLE_RATE
+
+    @property
+    def duration_ms(self) -> int:
+        return self.frame_count * 1000 // self.sample_rate
+
+
+@dataclass(frozen=True, slots=True)
+class WavInfo:
+    """Format and length of a PCM WAV, as read by `read_wav_info`."""
+
+    frame_count: int
+    sample_rate: int
+    channels: int
+    sample_width: int
+    data_offset: int
+    format_tag: int = WAVE_FORMAT_PCM
+
+    @property
+    def duration_ms(self) -> int:
+        return self.frame_count * 1000 // self.sample_rate if self.sample_rate else 0
+
+
+def wav_header(data_bytes: int, sample_rate: int = WAV_SAMPLE_RATE) -> bytes:
+    """Return the 44-byte header of a 16-bit mono WAV holding `data_bytes` of PCM."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_bytes,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,
+        1,
+        sample_rate,
+        sample_rate * _SAMPLE_WIDTH,
+        _SAMPLE_WIDTH,
+        8 * _SAMPLE_WIDTH,
+        b"data",
+        data_bytes,
+    )
+
+
+def read_wav_info(source: str | os.PathLike[str] | BinaryIO | bytes | bytearray | memoryview) -> WavInfo:
+    """Read a WAV's format and frame count from its header chunks.
+
+    A data chunk whose declared size runs past the end of the file (as written by
+    ffmpeg to a pipe, where the size is left at its maximum) is measured by the
+    bytes actually present instead. `source` may also be the WAV's bytes, which
+    are not copied. For a stream, `data_offset` is relative to its position,
+    which is left unchanged.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return read_wav_info(f)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source).cast("B")
+        return _parse_wav_info(lambda offset, size: bytes(view[offset : offset + size]), len(view))
+
+    position = source.tell()
+
+    def _read_at(offset: int, size: int) -> bytes:
+        source.seek(position + offset)
+        return source.read(size)
+
+    try:
+        return _parse_wav_info(_read_at, source.seek(0, os.SEEK_END) - position)
+    finally:
+        source.seek(position)
+
+
+def _parse_wav_info(read_at: Callable[[int, int], bytes], size: int) -> WavInfo:
+    header = read_at(0, 12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        msg = "Not a RIFF/WAVE file."
+        raise ValueError(msg)
+
+    fmt: tuple[int, int, int, int] | None = None
+    offset = 12
+    while offset + 8 <= size:
+        chunk_id, chunk_size = struct.unpack("<4sI", read_at(offset, 8))
+        body = offset + 8
+        if chunk_id == b"fmt " and chunk_size >= 16:
+            fmt_chunk = read_at(body, min(chunk_size, 26))
+            format_tag, channels, sample_rate, _, block_align, bits = struct.unpack_from("<HHIIHH", fmt_chunk)
+            if format_tag == _WAVE_FORMAT_EXTENSIBLE and len(fmt_chunk) >= 26:
+                format_tag = struct.unpack_from("<H", fmt_chunk, 24)[0]
+            if not channels or not bits or bits % 8 or block_align != channels * bits // 8:
+                msg = f"Unsupported WAV sample layout: {channels} channel(s) of {bits} bits."
+                raise ValueError(msg)
+            fmt = (format_tag, channels, sample_rate, bits // 8)
+        elif chunk_id == b"data":
+            if fmt is None:
+                break
+            format_tag, channels, sample_rate, sample_width = fmt
+            frame_count = min(chunk_size, size - body) // (channels * sample_width)
+            return WavInfo(frame_count, sample_rate, channels, sample_width, body, format_tag)
+        offset = body + chunk_size + (chunk_size & 1)
+
+    msg = "WAV file has no readable fmt and data chunks."
+    raise ValueError(msg)
+
+
+@functools.cache
+def _mp3_soundfile() -> Any:
+    """Return the `soundfile` module if its libsndfile can decode MP3, else None."""
+    try:
+        import soundfile
+    except (ModuleNotFoundError, OSError):
+        # OSError: soundfile is installed but libsndfile itself is missing.
+        return None
+    return soundfile if "MP3" in soundfile.available_formats() else None
+
+
+def _pcm_from_soundfile(audio_bytes: bytes) -> bytes | None:
+    """Decode in process, or return None when the audio needs the ffmpeg path."""
+    soundfile = _mp3_soundfile()
+    if soundfile is None:
+        return None
+    try:
+        samples, sample_rate = soundfile.read(io.BytesIO(audio_bytes), dtype="int16", always_2d=True)
+    except RuntimeError:
+        return None
+    if sample_rate != WAV_SAMPLE_RATE:
+        return None
+    if samples.shape[1] > 1:
+        samples = samples.mean(axis=1).round().astype("<i2")
+    return samples.astype("<i2", copy=False).tobytes()
+
+
+def _pcm_from_ffmpeg(audio_bytes: bytes) -> bytes:
+    result = subprocess.run(
+        _ffmpeg_to_pcm_command(None),
+        input=audio_bytes,
+        capture_output=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        msg = f"ffmpeg MP3-to-WAV conversion failed: {result.stderr.decode(errors='replace')}"
+        raise RuntimeError(msg)
+    return result.stdout
+
+
+def decode_to_wav(audio_bytes: bytes) -> DecodedAudio:
+    """Decode MP3 (or anything ffmpeg reads) to a 16-bit mono 44.1 kHz WAV."""
+    pcm = _pcm_from_soundfile(audio_bytes)
+    if pcm is None:
+        pcm = _pcm_from_ffmpeg(audio_bytes)
+    return DecodedAudio(wav_header(len(pcm)) + pcm, len(pcm) // _SAMPLE_WIDTH)
+
+
+def wav_pcm(wav_bytes: bytes) -> memoryview:
+    """Return the PCM of a 16-bit mono 44.1 kHz WAV, as produced by `decode_to_wav`."""
+    info = read_wav_info(wav_bytes)
+    if (info.sample_rate, info.channels, info.sample_width) != (WAV_SAMPLE_RATE, 1, _SAMPLE_WIDTH):
+        msg = f"Expected 16-bit mono {WAV_SAMPLE_RATE} Hz WAV."
+        raise ValueError(msg)
+    return memoryview(wav_bytes)[info.data_offset : info.data_offset + info.frame_count * _SAMPLE_WIDTH]
+
+
+def silence_pcm(seconds: float) -> bytes:
+    """Return `seconds` of 16-bit mono 44.1 kHz digital silence."""
+    return bytes(round(max(seconds, 0.0) * WAV_SAMPLE_RATE) * _SAMPLE_WIDTH)
+
+
+def begin_wav(destination: BinaryIO) -> int:
+    """Write a placeholder WAV header for `finish_wav` to patch; return its offset."""
+    start = destination.tell()
+    destination.write(wav_header(0))
+    return start
+
+
+def finish_wav(destination: BinaryIO, start: int, data_bytes: int) -> int:
+    """Rewrite the placeholder header at `start` with the final size; return frames."""
+    end = destination.tell()
+    destination.seek(start)
+    destination.write(wav_header(data_bytes))
+    destination.seek(end)
+    return data_bytes // _SAMPLE_WIDTH
+
+
+def _raise_for_ffmpeg_stream(returncode: int, stderr: bytes) -> None:
+    if returncode != 0:
+        msg = f"ffmpeg MP3-to-WAV stream conversion failed: {stderr.decode(errors='replace')}"
+        raise RuntimeError(msg)
+
+
+def stream_mp3_to_wav(chunks: Iterable[bytes], destination: BinaryIO) -> int:
+    """Decode MP3 `chunks` into a WAV written to `destination` as they arrive.
+
+    ffmpeg emits raw PCM, so only one chunk is held in memory at a time; the WAV
+    header is written up front and its sizes patched once the stream ends, which
+    requires a seekable `destination`. Returns the number of frames written.
+    """
+    start = begin_wav(destination)
+    process = subprocess.Popen(
+        _ffmpeg_to_pcm_command("mp3"),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    data_bytes = 0
+    stderr_blocks: list[bytes] = []
+    drain_errors: list[BaseException] = []
+
+    def _drain() -> None:
+        nonlocal data_bytes
+        try:
+            while block := process.stdout.read(_CHUNK_BYTES):  # type: ignore[union-attr]
+                destination.write(block)
+                data_bytes += len(block)
+        except BaseException as error:
+            # E.g. a full disk. Killing ffmpeg breaks the feeding loop's pipe
+            # instead of leaving it blocked on a stdout nobody reads.
+            drain_errors.append(error)
+            process.kill()
+
+    def _drain_stderr() -> None:
+        stderr_blocks.append(process.stderr.read())  # type: ignore[union-attr]
+
+    # Both pipes are drained off the feeding thread so a full one never stalls ffmpeg.
+    readers = [threading.Thread(target=target, daemon=True) for target in (_drain, _drain_stderr)]
+    for reader in readers:
+        reader.start()
+    try:
+        try:
+            for chunk in chunks:
+                process.stdin.write(chunk)  # type: ignore[union-attr]
+        except BrokenPipeError:
+            # ffmpeg exited early; its return code and stderr explain why.
+            pass
+        finally:
+            process.stdin.close()  # type: ignore[union-attr]
+    except BaseException:
+        process.kill()
+        for reader in readers:
+            reader.join()
+        process.wait()
+        if drain_errors:
+            # Closing stdin on the killed process fails too; report the cause.
+            raise drain_errors[0] from None
+        raise
+
+    for reader in readers:
+        reader.join()
+    process.wait()
+    if drain_errors:
+        raise drain_errors[0]
+    _raise_for_ffmpeg_stream(process.returncode, b"".join(stderr_blocks))
+    return finish_wav(destination, start, data_bytes)
+
+
+async def stream_mp3_to_wav_async(chunks: AsyncIterable[bytes], destination: BinaryIO) -> int:
+    """Async `stream_mp3_to_wav` that feeds and drains ffmpeg on the event loop."""
+    start = begin_wav(destination)
+    process = await asyncio.create_subprocess_exec(
+        *_ffmpeg_to_pcm_command("mp3"),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    async def _feed() -> None:
+        try:
+            async for chunk in chunks:
+                process.stdin.write(chunk)  # type: ignore[union-attr]
+                await process.stdin.drain()  # type: ignore[union-attr]
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg exited early; its return code and stderr explain why.
+            pass
+        finally:
+            process.stdin.close()  # type: ignore[union-attr]
+
+    async def _drain() -> int:
+        data_bytes = 0
+        while block := await process.stdout.read(_CHUNK_BYTES):  # type: ignore[union-attr]
+            destination.write(block)
+            data_bytes += len(block)
+        return data_bytes
+
+    try:
+        _, data_bytes, stderr = await asyncio.gather(
+            _feed(),
+            _drain(),
+            process.stderr.read(),  # type: ignore[union-attr]
+        )
+    except BaseException:
+        process.kill()
+        await process.wait()
+        raise
+
+    _raise_for_ffmpeg_stream(await process.wait(), stderr)
+    return finish_wav(destination, start, data_bytes)
@@ -6,6 +6,18 @@ from pathlib import Path
 from dotenv import load_dotenv
 
 DEFAULT_ELEVENLABS_VOICE_ID = "SAz9YHcvj6GT2YYXdXww"  # River - Relaxed, Neutral
+DEFAULT_AHAP_CACHE_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_AHAP_SHARED_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+DEFAULT_SYNTHESIS_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Hosts with a cached connection pool, and keep-alive connections kept per host.
+DEFAULT_HTTP_POOL_CONNECTIONS = 4
+DEFAULT_HTTP_POOL_MAXSIZE = 10
+# Concurrent ElevenLabs requests per chunked synthesis; plan limits range from 2 to 15.
+DEFAULT_ELEVENLABS_MAX_CONCURRENCY = 4
+# Longest a provider call queues for a fleet-wide rate-limit slot before failing.
+DEFAULT_PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS = 300.0
+# TTS providers the router may choose between, fastest healthy first.
+DEFAULT_TTS_PROVIDERS = ("elevenlabs",)
 
 
 def load_project_env() -> None:
@@ -39,3 +51,77 @@ def get_elevenlabs_api_key() -> str:
 
 def get_elevenlabs_voice_id() -> str:
     return os.getenv("ELEVENLABS_VOICE_ID", DEFAULT_ELEVENLABS_VOICE_ID)
+
+
+def get_elevenlabs_max_concurrency() -> int:
+    return int(os.getenv("ELEVENLABS_MAX_CONCURRENCY", str(DEFAULT_ELEVENLABS_MAX_CONCURRENCY)))
+
+
+def get_tts_providers() -> tuple[str, ...]:
+    configured = os.getenv("TTS_PROVIDERS", "")
+    providers = tuple(name.strip().lower() for name in configured.split(",") if name.strip())
+    return providers or DEFAULT_TTS_PROVIDERS
+
+
+def get_tts_hedging_enabled() -> bool:
+    return os.getenv("TTS_HEDGING", "0").strip() == "1"
+
+
+def get_ahap_cache_dir() -> str | None:
+    return os.getenv("AHAP_CACHE_DIR") or None
+
+
+def get_ahap_cache_max_bytes() -> int:
+    return int(os.getenv("AHAP_CACHE_MAX_BYTES", str(DEFAULT_AHAP_CACHE_MAX_BYTES)))
+
+
+def get_ahap_shared_cache_dir() -> str | None:
+    return os.getenv("AHAP_SHARED_CACHE_DIR") or None
+
+
+def get_ahap_shared_cache_max_bytes() -> int:
+    return int(os.getenv("AHAP_SHARED_CACHE_MAX_BYTES", str(DEFAULT_AHAP_SHARED_CACHE_MAX_BYTES)))
+
+
+def get_synthesis_cache_dir() -> str | None:
+    return os.getenv("SYNTHESIS_CACHE_DIR") or None
+
+
+def get_synthesis_cache_max_bytes() -> int:
+    return int(os.getenv("SYNTHESIS_CACHE_MAX_BYTES", str(DEFAULT_SYNTHESIS_CACHE_MAX_BYTES)))
+
+
+def get_synthesis_shared_cache_enabled() -> bool:
+    return os.getenv("SYNTHESIS_SHARED_CACHE", "0").strip() == "1"
+
+
+def get_http_pool_connections() -> int:
+    return int(os.getenv("PROVIDER_HTTP_POOL_CONNECTIONS", str(DEFAULT_HTTP_POOL_CONNECTIONS)))
+
+
+def get_http_pool_maxsize() -> int:
+    return int(os.getenv("PROVIDER_HTTP_POOL_MAXSIZE", str(DEFAULT_HTTP_POOL_MAXSIZE)))
+
+
+def _provider_env_prefix(provider: str) -> str:
+    return provider.upper().replace("-", "_")
+
+
+def get_provider_requests_per_second(provider: str) -> float | None:
+    value = os.getenv(f"{_provider_env_prefix(provider)}_REQUESTS_PER_SECOND")
+    return float(value) if value else None
+
+
+def get_provider_rate_limit_burst(provider: str) -> int:
+    return int(os.getenv(f"{_provider_env_prefix(provider)}_RATE_LIMIT_BURST", "1"))
+
+
+def get_provider_max_in_flight(provider: str) -> int | None:
+    value = os.getenv(f"{_provider_env_prefix(provider)}_MAX_IN_FLIGHT")
+    return int(value) if value else None
+
+
+def get_provider_rate_limit_max_wait_seconds() -> float:
+    return float(
+        os.getenv("PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS", str(DEFAULT_PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS))
+    )
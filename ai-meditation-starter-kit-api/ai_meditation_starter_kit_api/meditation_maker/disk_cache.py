@@ -0,0 +1,116 @@
+"""Size-bounded, least-recently-used directory of cache entries.
+
+Shared by the AHAP cache (`ahap_cache.py`) and the synthesis cache
+(`synthesis_cache.py`). An entry lives at `<root>/<key[:2]>/<key>` and is either
+a file or a directory of files; reading it refreshes its mtime, which orders
+eviction.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TypeVar
+
+# A tier's tracked size misses entries written by other processes, so it is
+# rescanned at least this often.
+_RESCAN_SECONDS = 300.0
+# Eviction frees space down to this fraction of `max_bytes`, so a full tier is
+# not rescanned on every put.
+_EVICT_TO_FRACTION = 0.9
+
+_default_tiers: dict[tuple[type, str, int | None], LruDiskTier] = {}
+
+TierT = TypeVar("TierT", bound="LruDiskTier")
+
+
+def _entry_size(entry_path: Path) -> int:
+    if entry_path.is_dir():
+        return sum(path.stat().st_size for path in entry_path.iterdir())
+    return entry_path.stat().st_size
+
+
+@dataclass(slots=True)
+class LruDiskTier:
+    """A directory of cache entries, evicted least-recently-used past `max_bytes`.
+
+    The tier's size is tracked as entries are added; the tree is only rescanned
+    when that total passes `max_bytes` or every few minutes, to account for
+    other processes' writes. Without `max_bytes` the tier is unbounded.
+    """
+
+    root: Path
+    max_bytes: int | None = None
+    _total_bytes: int | None = field(default=None, init=False, repr=False)
+    _scanned_at: float = field(default=0.0, init=False, repr=False)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _touch(self, entry_path: Path) -> bool:
+        """Mark an entry as just used; return False if it does not exist."""
+        try:
+            os.utime(entry_path)
+        except OSError:
+            return False
+        return True
+
+    def _added(self, entry_bytes: int) -> None:
+        """Account for `entry_bytes` just written, evicting if the tier is over its bound."""
+        if self.max_bytes is None:
+            return
+        if self._total_bytes is not None:
+            self._total_bytes += entry_bytes
+        if (
+            self._total_bytes is None
+            or self._total_bytes > self.max_bytes
+            or time.monotonic() - self._scanned_at > _RESCAN_SECONDS
+        ):
+            self.evict()
+
+    def evict(self) -> None:
+        """Rescan the tier; past `max_bytes`, remove least-recently-used entries."""
+        if self.max_bytes is None or not self.root.exists():
+            return
+
+        entries: list[tuple[float, int, Path]] = []
+        total_bytes = 0
+        for entry_path in self.root.glob("??/*"):
+            if entry_path.name.startswith("."):
+                continue
+            try:
+                size = _entry_size(entry_path)
+                entries.append((entry_path.stat().st_mtime, size, entry_path))
+            except OSError:
+                continue
+            total_bytes += size
+
+        if total_bytes > self.max_bytes:
+            entries.sort()
+            target_bytes = self.max_bytes * _EVICT_TO_FRACTION
+            for _, size, entry_path in entries:
+                if total_bytes <= target_bytes:
+                    break
+                if entry_path.is_dir():
+                    shutil.rmtree(entry_path, ignore_errors=True)
+                else:
+                    entry_path.unlink(missing_ok=True)
+                total_bytes -= size
+
+        self._total_bytes = total_bytes
+        self._scanned_at = time.monotonic()
+
+
+def default_tier(tier_type: type[TierT], root: str, max_bytes: int | None) -> TierT:
+    """Return this process's `tier_type` over `root`, creating it on first use.
+
+    Tiers are reused across calls so their tracked size survives between them.
+    """
+    key = (tier_type, root, max_bytes)
+    tier = _default_tiers.get(key)
+    if tier is None:
+        tier = _default_tiers.setdefault(key, tier_type(Path(root), max_bytes))
+    return tier  # type: ignore[return-value]
@@ -1,16 +1,22 @@
 from __future__ import annotations
 
-import subprocess
+import asyncio
 from typing import TYPE_CHECKING, Any
 
-import requests
-
+from .audio_decoding import decode_to_wav
 from .config import get_elevenlabs_api_key, load_project_env
+from .http_session import get_async_http_client, get_http_session
+from .rate_limit import provider_slot, provider_slot_async
+from .synthesis_cache import default_synthesis_cache, synthesis_cache_key
 from .types import SFXResult, coerce_sfx_request
 
 if TYPE_CHECKING:
     from collections.abc import Mapping
 
+    import httpx
+    import requests
+
+    from .synthesis_cache import SynthesisCache
     from .types import SFXRequest
 
 _ELEVENLABS_BASE_URL = "https://api.elevenlabs.io/v1"
@@ -35,70 +41,127 @@ def _output_format_to_mime_type(value: str) -> str:
     return mapping[value]
 
 
-def _mp3_to_wav(mp3_bytes: bytes) -> bytes:
-    """Convert MP3 bytes to WAV using ffmpeg."""
-    result = subprocess.run(
-        [
-            "ffmpeg",
-            "-y",
-            "-i",
-            "pipe:0",
-            "-ar",
-            "44100",
-            "-ac",
-            "1",
-            "-sample_fmt",
-            "s16",
-            "-f",
-            "wav",
-            "pipe:1",
-        ],
-        input=mp3_bytes,
-        capture_output=True,
-        check=False,
-    )
-    if result.returncode != 0:
-        msg = f"ffmpeg MP3-to-WAV conversion failed: {result.stderr.decode()}"
-        raise RuntimeError(msg)
-    return result.stdout
-
-
-def generate_sfx_audio_elevenlabs(
-    request: SFXRequest | Mapping[str, Any],
-    *,
-    timeout: int = 60,
-) -> SFXResult:
-    """Generate a meditation sound effect clip with ElevenLabs."""
+def _prepare_sfx_call(request: SFXRequest | Mapping[str, Any]) -> tuple[SFXRequest, dict[str, Any]]:
+    """Return the normalized request and the POST keyword arguments."""
     load_project_env()
 
     normalized_request = coerce_sfx_request(request)
     api_key = get_elevenlabs_api_key()
     output_format = _output_format_to_elevenlabs(normalized_request.outputFormat)
 
-    url = f"{_ELEVENLABS_BASE_URL}/sound-generation"
-    headers = {
-        "Content-Type": "application/json",
-        "xi-api-key": api_key,
+    call = {
+        "url": f"{_ELEVENLABS_BASE_URL}/sound-generation",
+        "headers": {
+            "Content-Type": "application/json",
+            "xi-api-key": api_key,
+        },
+        "params": {"output_format": output_format},
+        "json": normalized_request.as_payload(),
     }
-    params = {"output_format": output_format}
-
-    response = requests.post(
-        url,
-        headers=headers,
-        params=params,
-        json=normalized_request.as_payload(),
-        timeout=timeout,
-    )
-    response.raise_for_status()
+    return normalized_request, call
 
-    audio_bytes = response.content
-    if normalized_request.outputFormat == "wav":
-        audio_bytes = _mp3_to_wav(audio_bytes)
 
+def _sfx_result(normalized_request: SFXRequest, audio_bytes: bytes, duration_ms: int | None = None) -> SFXResult:
     return SFXResult(
         success=True,
         provider="elevenlabs",
         audioBytes=audio_bytes,
         mimeType=_output_format_to_mime_type(normalized_request.outputFormat),
+        durationMs=duration_ms,
         raw=None,
     )
+
+
+def _sfx_cache_key(normalized_request: SFXRequest) -> str:
+    return synthesis_cache_key(
+        "sfx",
+        normalized_request.text,
+        duration_seconds=normalized_request.durationSeconds,
+        prompt_influence=normalized_request.promptInfluence,
+        output_format=normalized_request.outputFormat,
+    )
+
+
+def _cached_sfx_result(cache: SynthesisCache, key: str, normalized_request: SFXRequest) -> SFXResult | None:
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    metadata, audio_bytes = entry
+    return _sfx_result(normalized_request, audio_bytes, metadata.get("durationMs"))
+
+
+def _store_sfx_result(cache: SynthesisCache, key: str, result: SFXResult) -> None:
+    if result.audioBytes:
+        cache.put(key, {"durationMs": result.durationMs}, result.audioBytes)
+
+
+def generate_sfx_audio_elevenlabs(
+    request: SFXRequest | Mapping[str, Any],
+    *,
+    timeout: int = 60,
+    session: requests.Session | None = None,
+    cache: SynthesisCache | None = None,
+) -> SFXResult:
+    """Generate a meditation sound effect clip with ElevenLabs.
+
+    Requests go through the pooled `get_http_session()` unless a `session` is given.
+    Identical prompts and parameters are served from `cache` (or the configured
+    synthesis cache) without calling ElevenLabs.
+    """
+    normalized_request, call = _prepare_sfx_call(request)
+    if cache is None:
+        cache = default_synthesis_cache()
+    cache_key = _sfx_cache_key(normalized_request)
+    if cache is not None:
+        cached = _cached_sfx_result(cache, cache_key, normalized_request)
+        if cached is not None:
+            return cached
+
+    with provider_slot("elevenlabs"):
+        response = (session or get_http_session()).post(**call, timeout=timeout)
+    response.raise_for_status()
+
+    if normalized_request.outputFormat == "wav":
+        decoded = decode_to_wav(response.content)
+        result = _sfx_result(normalized_request, decoded.wav_bytes, decoded.duration_ms)
+    else:
+        result = _sfx_result(normalized_request, response.content)
+
+    if cache is not None:
+        _store_sfx_result(cache, cache_key, result)
+    return result
+
+
+async def generate_sfx_audio_elevenlabs_async(
+    request: SFXRequest | Mapping[str, Any],
+    *,
+    timeout: int = 60,
+    client: httpx.AsyncClient | None = None,
+    cache: SynthesisCache | None = None,
+) -> SFXResult:
+    """Async `generate_sfx_audio_elevenlabs` over the loop's pooled `httpx.AsyncClient`.
+
+    HTTP errors raise `httpx.HTTPStatusError`.
+    """
+    normalized_request, call = _prepare_sfx_call(request)
+    if cache is None:
+        cache = default_synthesis_cache()
+    cache_key = _sfx_cache_key(normalized_request)
+    if cache is not None:
+        cached = await asyncio.to_thread(_cached_sfx_result, cache, cache_key, normalized_request)
+        if cached is not None:
+            return cached
+
+    async with provider_slot_async("elevenlabs"):
+        response = await (client or get_async_http_client()).post(**call, timeout=timeout)
+    response.raise_for_status()
+
+    if normalized_request.outputFormat == "wav":
+        decoded = await asyncio.to_thread(decode_to_wav, response.content)
+        result = _sfx_result(normalized_request, decoded.wav_bytes, decoded.duration_ms)
+    else:
+        result = _sfx_result(normalized_request, response.content)
+
+    if cache is not None:
+        await asyncio.to_thread(_store_sfx_result, cache, cache_key, result)
+    return result
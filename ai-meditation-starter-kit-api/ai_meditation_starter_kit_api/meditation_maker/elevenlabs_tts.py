@@ -1,26 +1,46 @@
 from __future__ import annotations
 
+import asyncio
 import re
-import subprocess
-from typing import TYPE_CHECKING, Any
-
-import requests
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any, BinaryIO
 
+from .audio_decoding import (
+    WAV_SAMPLE_RATE,
+    begin_wav,
+    decode_to_wav,
+    finish_wav,
+    silence_pcm,
+    stream_mp3_to_wav,
+    stream_mp3_to_wav_async,
+    wav_pcm,
+)
 from .config import (
     get_elevenlabs_api_key,
+    get_elevenlabs_max_concurrency,
     get_elevenlabs_voice_id,
     load_project_env,
 )
-from .types import TTSResult, coerce_tts_request
+from .http_session import get_async_http_client, get_http_session
+from .rate_limit import limit_provider_requests, provider_slot, provider_slot_async
+from .synthesis_cache import default_synthesis_cache, synthesis_cache_key
+from .types import TTSRequest, TTSResult, coerce_tts_request
 
 if TYPE_CHECKING:
-    from collections.abc import Mapping
+    from collections.abc import Awaitable, Callable, Mapping
 
-    from .types import TTSRequest
+    import httpx
+    import requests
+
+    from .synthesis_cache import SynthesisCache
 
 _ELEVENLABS_BASE_URL = "https://api.elevenlabs.io/v1"
 _ELEVENLABS_MODEL_ID = "eleven_multilingual_v2"
-_PAUSE_PATTERN = re.compile(r"\[\s*(\d+(?:\.\d+)?)\s*s\s*\]")
+# Pause tokens such as "[2s]" or "[1.5 s]"; the group captures the seconds.
+PAUSE_TOKEN_PATTERN = re.compile(r"\[\s*(\d+(?:\.\d+)?)\s*s\s*\]")
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?\u2026])\s+")
+_STREAM_CHUNK_BYTES = 64 * 1024
+_DEFAULT_CHUNK_MAX_CHARS = 600
 
 
 def _output_format_to_elevenlabs(value: str) -> str:
@@ -42,34 +62,6 @@ def _output_format_to_mime_type(value: str) -> str:
     return mapping[value]
 
 
-def _mp3_to_wav(mp3_bytes: bytes) -> bytes:
-    """Convert MP3 bytes to WAV using ffmpeg."""
-    result = subprocess.run(
-        [
-            "ffmpeg",
-            "-y",
-            "-i",
-            "pipe:0",
-            "-ar",
-            "44100",
-            "-ac",
-            "1",
-            "-sample_fmt",
-            "s16",
-            "-f",
-            "wav",
-            "pipe:1",
-        ],
-        check=False,
-        input=mp3_bytes,
-        capture_output=True,
-    )
-    if result.returncode != 0:
-        msg = f"ffmpeg MP3-to-WAV conversion failed: {result.stderr.decode()}"
-        raise RuntimeError(msg)
-    return result.stdout
-
-
 def _pause_seconds_to_break_tags(seconds: float) -> str:
     # ElevenLabs break tags support up to 3 seconds per tag.
     max_chunk_seconds = 3.0
@@ -89,19 +81,49 @@ def _convert_iembrace_pause_tokens(text: str) -> str:
         seconds = float(match.group(1))
         return _pause_seconds_to_break_tags(seconds)
 
-    return _PAUSE_PATTERN.sub(_replace, text)
+    return PAUSE_TOKEN_PATTERN.sub(_replace, text)
 
 
-def generate_tts_audio_elevenlabs(
+def split_tts_script(text: str, max_chunk_chars: int = _DEFAULT_CHUNK_MAX_CHARS) -> list[str | float]:
+    """Split a script into text chunks and pause lengths in seconds, in order.
+
+    ``[Ns]`` pause tokens become floats, with adjacent pauses merged. The text
+    between them is split at sentence ends and the sentences are packed into
+    chunks of at most `max_chunk_chars`; a single longer sentence stays whole.
+    """
+    parts: list[str | float] = []
+    for index, piece in enumerate(PAUSE_TOKEN_PATTERN.split(text)):
+        if index % 2:
+            # re.split interleaves the captured pause seconds with the text.
+            if parts and isinstance(parts[-1], float):
+                parts[-1] += float(piece)
+            else:
+                parts.append(float(piece))
+            continue
+
+        chunk = ""
+        for sentence in _SENTENCE_BOUNDARY.split(piece.strip()):
+            if not sentence:
+                continue
+            if chunk and len(chunk) + 1 + len(sentence) > max_chunk_chars:
+                parts.append(chunk)
+                chunk = sentence
+            else:
+                chunk = f"{chunk} {sentence}" if chunk else sentence
+        if chunk:
+            parts.append(chunk)
+    return parts
+
+
+def _prepare_tts_call(
     request: TTSRequest | Mapping[str, Any],
-    *,
-    timeout: int = 60,
-    voice_id: str | None = None,
-) -> TTSResult:
-    """Generate meditation TTS with ElevenLabs from the same request shape as iEmbrace.
+    voice_id: str | None,
+    stream: bool = False,
+) -> tuple[TTSRequest, str, dict[str, Any]]:
+    """Return the normalized request, the voice id and the POST keyword arguments.
 
-    Pause tokens like ``[2s]`` and ``[30s]`` in `request.text` are converted to
-    ElevenLabs-compatible break tags before synthesis.
+    With `stream`, the call targets the streaming endpoint, which starts sending
+    audio before the whole script is synthesized.
     """
     load_project_env()
 
@@ -109,37 +131,282 @@ def generate_tts_audio_elevenlabs(
     chosen_voice_id = voice_id or get_elevenlabs_voice_id()
     api_key = get_elevenlabs_api_key()
     output_format = _output_format_to_elevenlabs(normalized_request.outputFormat)
-
     url = f"{_ELEVENLABS_BASE_URL}/text-to-speech/{chosen_voice_id}"
-    headers = {
-        "Content-Type": "application/json",
-        "xi-api-key": api_key,
-    }
-    params = {"output_format": output_format}
-    body = {
-        "text": _convert_iembrace_pause_tokens(normalized_request.text),
-        "model_id": _ELEVENLABS_MODEL_ID,
-    }
+    if stream:
+        url = f"{url}/stream"
 
-    response = requests.post(
-        url,
-        headers=headers,
-        params=params,
-        json=body,
-        timeout=timeout,
-    )
-    response.raise_for_status()
+    call = {
+        "url": url,
+        "headers": {
+            "Content-Type": "application/json",
+            "xi-api-key": api_key,
+        },
+        "params": {"output_format": output_format},
+        "json": {
+            "text": _convert_iembrace_pause_tokens(normalized_request.text),
+            "model_id": _ELEVENLABS_MODEL_ID,
+        },
+    }
+    return normalized_request, chosen_voice_id, call
 
-    audio_bytes = response.content
-    if normalized_request.outputFormat == "wav":
-        audio_bytes = _mp3_to_wav(audio_bytes)
 
+def _tts_result(
+    normalized_request: TTSRequest,
+    voice_id: str,
+    audio_bytes: bytes | None,
+    duration_ms: int | None = None,
+    *,
+    cached: bool = False,
+) -> TTSResult:
     return TTSResult(
         success=True,
         provider="elevenlabs",
         audioUrl=None,
         audioBytes=audio_bytes,
         mimeType=_output_format_to_mime_type(normalized_request.outputFormat),
-        voiceId=chosen_voice_id,
-        raw=None,
+        voiceId=voice_id,
+        durationMs=duration_ms,
+        raw={"cached": True} if cached else None,
+    )
+
+
+def _tts_cache_key(normalized_request: TTSRequest, voice_id: str, call: dict[str, Any]) -> str:
+    return synthesis_cache_key(
+        "tts",
+        call["json"]["text"],
+        voice_id=voice_id,
+        model_id=call["json"]["model_id"],
+        output_format=normalized_request.outputFormat,
     )
+
+
+def _cached_tts_result(cache: SynthesisCache, key: str, normalized_request: TTSRequest) -> TTSResult | None:
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    metadata, audio_bytes = entry
+    return _tts_result(normalized_request, metadata["voiceId"], audio_bytes, metadata.get("durationMs"), cached=True)
+
+
+def _store_tts_result(cache: SynthesisCache, key: str, result: TTSResult) -> None:
+    if result.audioBytes:
+        cache.put(key, {"voiceId": result.voiceId, "durationMs": result.durationMs}, result.audioBytes)
+
+
+def generate_tts_audio_elevenlabs(
+    request: TTSRequest | Mapping[str, Any],
+    *,
+    timeout: int = 60,
+    voice_id: str | None = None,
+    session: requests.Session | None = None,
+    cache: SynthesisCache | None = None,
+) -> TTSResult:
+    """Generate meditation TTS with ElevenLabs from the same request shape as iEmbrace.
+
+    Pause tokens like ``[2s]`` and ``[30s]`` in `request.text` are converted to
+    ElevenLabs-compatible break tags before synthesis. Requests go through the
+    pooled `get_http_session()` unless a `session` is given. Identical text,
+    voice, model and format are served from `cache` (or the cache configured by
+    `SYNTHESIS_CACHE_DIR` and the shared tier) without calling ElevenLabs.
+    """
+    normalized_request, chosen_voice_id, call = _prepare_tts_call(request, voice_id)
+    if cache is None:
+        cache = default_synthesis_cache()
+    cache_key = _tts_cache_key(normalized_request, chosen_voice_id, call)
+    if cache is not None:
+        cached = _cached_tts_result(cache, cache_key, normalized_request)
+        if cached is not None:
+            return cached
+
+    with provider_slot("elevenlabs"):
+        response = (session or get_http_session()).post(**call, timeout=timeout)
+    response.raise_for_status()
+
+    if normalized_request.outputFormat == "wav":
+        decoded = decode_to_wav(response.content)
+        result = _tts_result(normalized_request, chosen_voice_id, decoded.wav_bytes, decoded.duration_ms)
+    else:
+        result = _tts_result(normalized_request, chosen_voice_id, response.content)
+
+    if cache is not None:
+        _store_tts_result(cache, cache_key, result)
+    return result
+
+
+async def generate_tts_audio_elevenlabs_async(
+    request: TTSRequest | Mapping[str, Any],
+    *,
+    timeout: int = 60,
+    voice_id: str | None = None,
+    client: httpx.AsyncClient | None = None,
+    cache: SynthesisCache | None = None,
+) -> TTSResult:
+    """Async `generate_tts_audio_elevenlabs` over the loop's pooled `httpx.AsyncClient`.
+
+    The request never occupies a thread while waiting on ElevenLabs; only the
+    MP3-to-WAV decode and cache reads and writes run in worker threads. HTTP
+    errors raise `httpx.HTTPStatusError`.
+    """
+    normalized_request, chosen_voice_id, call = _prepare_tts_call(request, voice_id)
+    if cache is None:
+        cache = default_synthesis_cache()
+    cache_key = _tts_cache_key(normalized_request, chosen_voice_id, call)
+    if cache is not None:
+        cached = await asyncio.to_thread(_cached_tts_result, cache, cache_key, normalized_request)
+        if cached is not None:
+            return cached
+
+    async with provider_slot_async("elevenlabs"):
+        response = await (client or get_async_http_client()).post(**call, timeout=timeout)
+    response.raise_for_status()
+
+    if normalized_request.outputFormat == "wav":
+        decoded = await asyncio.to_thread(decode_to_wav, response.content)
+        result = _tts_result(normalized_request, chosen_voice_id, decoded.wav_bytes, decoded.duration_ms)
+    else:
+        result = _tts_result(normalized_request, chosen_voice_id, response.content)
+
+    if cache is not None:
+        await asyncio.to_thread(_store_tts_result, cache, cache_key, result)
+    return result
+
+
+def stream_tts_audio_elevenlabs(
+    request: TTSRequest | Mapping[str, Any],
+    destination: BinaryIO,
+    *,
+    timeout: int = 60,
+    voice_id: str | None = None,
+    session: requests.Session | None = None,
+) -> TTSResult:
+    """Stream ElevenLabs TTS into `destination` instead of returning it in memory.
+
+    Audio comes from the streaming endpoint and is written (decoded, for `wav`) as
+    each chunk arrives, so memory use does not grow with the script length. WAV
+    output needs a seekable `destination` such as a temporary file, because the
+    header sizes are only known at the end. The result has no `audioBytes`; for
+    WAV its `durationMs` is exact. Streamed narration is not cached, since long
+    scripts are rarely repeated.
+    """
+    normalized_request, chosen_voice_id, call = _prepare_tts_call(request, voice_id, stream=True)
+
+    with provider_slot("elevenlabs"), (session or get_http_session()).post(
+        **call, timeout=timeout, stream=True
+    ) as response:
+        response.raise_for_status()
+        chunks = response.iter_content(_STREAM_CHUNK_BYTES)
+        if normalized_request.outputFormat != "wav":
+            for chunk in chunks:
+                destination.write(chunk)
+            return _tts_result(normalized_request, chosen_voice_id, None)
+
+        frame_count = stream_mp3_to_wav(chunks, destination)
+
+    return _tts_result(normalized_request, chosen_voice_id, None, frame_count * 1000 // WAV_SAMPLE_RATE)
+
+
+async def stream_tts_audio_elevenlabs_async(
+    request: TTSRequest | Mapping[str, Any],
+    destination: BinaryIO,
+    *,
+    timeout: int = 60,
+    voice_id: str | None = None,
+    client: httpx.AsyncClient | None = None,
+) -> TTSResult:
+    """Async `stream_tts_audio_elevenlabs` over the loop's pooled `httpx.AsyncClient`."""
+    normalized_request, chosen_voice_id, call = _prepare_tts_call(request, voice_id, stream=True)
+
+    url = call.pop("url")
+    async with provider_slot_async("elevenlabs"), (client or get_async_http_client()).stream(
+        "POST", url, **call, timeout=timeout
+    ) as response:
+        response.raise_for_status()
+        chunks = response.aiter_bytes(_STREAM_CHUNK_BYTES)
+        if normalized_request.outputFormat != "wav":
+            async for chunk in chunks:
+                destination.write(chunk)
+            return _tts_result(normalized_request, chosen_voice_id, None)
+
+        frame_count = await stream_mp3_to_wav_async(chunks, destination)
+
+    return _tts_result(normalized_request, chosen_voice_id, None, frame_count * 1000 // WAV_SAMPLE_RATE)
+
+
+async def generate_tts_audio_elevenlabs_chunked_async(
+    request: TTSRequest | Mapping[str, Any],
+    destination: BinaryIO,
+    *,
+    max_concurrency: int | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+    max_chunk_chars: int = _DEFAULT_CHUNK_MAX_CHARS,
+    timeout: int = 60,
+    voice_id: str | None = None,
+    client: httpx.AsyncClient | None = None,
+    cache: SynthesisCache | None = None,
+    synthesize_chunk: Callable[[TTSRequest], Awaitable[TTSResult]] | None = None,
+) -> TTSResult:
+    """Synthesize a long script as concurrent chunks stitched into one WAV.
+
+    The script is split with `split_tts_script` and its chunks are synthesized
+    through `generate_tts_audio_elevenlabs_async` with at most `max_concurrency`
+    HTTP requests in flight (default `ELEVENLABS_MAX_CONCURRENCY`, hedges
+    included; see `limit_provider_requests`), so each chunk is cached and decoded
+    gaplessly and no single request carries the whole script. Pause tokens become
+    exact digital silence between chunks. PCM is written to the seekable
+    `destination` in script order as each chunk and all before it finish, so
+    end-to-end time approaches that of the slowest chunk rather than the sum.
+    Pass one `semaphore` to several concurrent calls to share a single limit.
+    `synthesize_chunk` replaces the ElevenLabs call (and with it `timeout`,
+    `voice_id`, `client` and `cache`), e.g. with a `TTSRouter`; it must return
+    16-bit mono 44.1 kHz WAV `audioBytes`. Only `wav` output is supported; the
+    result has no `audioBytes`.
+    """
+    load_project_env()
+
+    normalized_request = coerce_tts_request(request)
+    if normalized_request.outputFormat != "wav":
+        msg = "Chunked synthesis stitches PCM and only supports outputFormat 'wav'."
+        raise ValueError(msg)
+    chosen_voice_id = voice_id or get_elevenlabs_voice_id()
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max_concurrency or get_elevenlabs_max_concurrency())
+
+    async def _synthesize(text: str) -> TTSResult:
+        chunk_request = TTSRequest(text=text, languageCode=normalized_request.languageCode, outputFormat="wav")
+        if synthesize_chunk is not None:
+            return await synthesize_chunk(chunk_request)
+        return await generate_tts_audio_elevenlabs_async(
+            chunk_request,
+            timeout=timeout,
+            voice_id=chosen_voice_id,
+            client=client,
+            cache=cache,
+        )
+
+    start = begin_wav(destination)
+    data_bytes = 0
+    chunk_result: TTSResult | None = None
+    try:
+        with limit_provider_requests(semaphore):
+            async with asyncio.TaskGroup() as group:
+                pending = [
+                    part if isinstance(part, float) else group.create_task(_synthesize(part))
+                    for part in split_tts_script(normalized_request.text, max_chunk_chars)
+                ]
+                for part in pending:
+                    if isinstance(part, float):
+                        pcm = silence_pcm(part)
+                    else:
+                        chunk_result = await part
+                        pcm = wav_pcm(chunk_result.audioBytes or b"")
+                    destination.write(pcm)
+                    data_bytes += len(pcm)
+    except ExceptionGroup as errors:
+        # The first failure cancels the remaining chunks; surface it unwrapped.
+        raise errors.exceptions[0] from None
+
+    duration_ms = finish_wav(destination, start, data_bytes) * 1000 // WAV_SAMPLE_RATE
+    if synthesize_chunk is not None and chunk_result is not None:
+        # Report the provider and voice that actually spoke.
+        return replace(chunk_result, audioUrl=None, audioBytes=None, durationMs=duration_ms, raw=None)
+    return _tts_result(normalized_request, chosen_voice_id, None, duration_ms)
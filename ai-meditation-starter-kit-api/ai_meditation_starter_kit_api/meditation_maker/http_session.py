@@ -0,0 +1,105 @@
+"""Pooled HTTP clients shared by the provider clients.
+
+ElevenLabs and iEmbrace calls reuse keep-alive connections through one
+`requests.Session` per process (sync clients) and one `httpx.AsyncClient` per
+event loop (async clients), so synthesizing many segments pays for DNS, TCP and
+TLS setup once per host instead of once per request. Pool sizes come from
+`PROVIDER_HTTP_POOL_CONNECTIONS` (hosts kept) and `PROVIDER_HTTP_POOL_MAXSIZE`
+(connections kept per host).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import TYPE_CHECKING
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import get_http_pool_connections, get_http_pool_maxsize, load_project_env
+
+if TYPE_CHECKING:
+    import httpx
+
+_session_lock = threading.Lock()
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def build_http_session(pool_connections: int, pool_maxsize: int) -> requests.Session:
+    """Return a session whose HTTP(S) adapters keep `pool_maxsize` connections per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Return this process's shared session, creating it on first use.
+
+    A forked child (e.g. a process-pool worker) gets its own session rather than
+    inheriting the parent's sockets.
+    """
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            load_project_env()
+            _session = build_http_session(get_http_pool_connections(), get_http_pool_maxsize())
+            _session_pid = pid
+        return _session
+
+
+def close_http_session() -> None:
+    """Close the shared session's pooled connections; the next call opens a new one."""
+    global _session, _session_pid
+
+    with _session_lock:
+        if _session is not None and _session_pid == os.getpid():
+            _session.close()
+        _session = None
+        _session_pid = None
+
+
+def build_async_http_client(pool_connections: int, pool_maxsize: int) -> httpx.AsyncClient:
+    """Return an async client sized like the adapters of `build_http_session`.
+
+    httpx bounds its pool as a whole rather than per host, so the total is sized
+    for `pool_connections` hosts at `pool_maxsize` connections each.
+    """
+    import httpx
+
+    total = pool_connections * pool_maxsize
+    return httpx.AsyncClient(limits=httpx.Limits(max_connections=total, max_keepalive_connections=total))
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the running event loop's shared async client, creating it on first use.
+
+    httpx clients are bound to the loop they first ran on, so each loop gets its own.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        load_project_env()
+        client = build_async_http_client(get_http_pool_connections(), get_http_pool_maxsize())
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_http_client() -> None:
+    """Close the running event loop's shared async client, if it has one."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
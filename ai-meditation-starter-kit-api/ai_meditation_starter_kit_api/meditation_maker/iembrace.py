@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Mapping
-
-import requests
+from typing import TYPE_CHECKING, Any, Mapping
 
 from .config import get_api_base_url, get_user_email, load_project_env
+from .http_session import get_async_http_client, get_http_session
+from .rate_limit import provider_slot, provider_slot_async
 from .types import TTSRequest, TTSResult, coerce_tts_request
 
+if TYPE_CHECKING:
+    import httpx
+    import requests
+
 
 def _unwrap_lambda_payload(payload: Any) -> Any:
     if (
@@ -29,34 +33,33 @@ def _unwrap_lambda_payload(payload: Any) -> Any:
     return payload
 
 
-def generate_personalized_meditation(
+def _prepare_personalization_call(
     mood: str,
     goal: str,
     message_to_loved_one: str,
-    *,
-    timeout: int = 30,
-) -> str:
-    """Generate a personalized meditation script from the iEmbrace API."""
+) -> dict[str, Any]:
+    """Return the POST keyword arguments for a personalization request."""
     load_project_env()
 
     base_url = get_api_base_url()
     user_email = get_user_email()
 
-    url = f"{base_url}/personalization"
-    headers = {
-        "Content-Type": "application/json",
-        "X-User-Email": user_email,
-    }
-    body = {
-        "mood": mood,
-        "goal": goal,
-        "message_to_loved_one": message_to_loved_one,
+    return {
+        "url": f"{base_url}/personalization",
+        "headers": {
+            "Content-Type": "application/json",
+            "X-User-Email": user_email,
+        },
+        "json": {
+            "mood": mood,
+            "goal": goal,
+            "message_to_loved_one": message_to_loved_one,
+        },
     }
 
-    response = requests.post(url, headers=headers, json=body, timeout=timeout)
-    response.raise_for_status()
 
-    payload = _unwrap_lambda_payload(response.json())
+def _script_from_response(response_payload: Any) -> str:
+    payload = _unwrap_lambda_payload(response_payload)
     if not isinstance(payload, dict):
         raise RuntimeError(f"Unexpected response payload type: {type(payload)}")
 
@@ -67,33 +70,67 @@ def generate_personalized_meditation(
     return str(script)
 
 
-def generate_tts_audio_iembrace(
-    request: TTSRequest | Mapping[str, Any],
+def generate_personalized_meditation(
+    mood: str,
+    goal: str,
+    message_to_loved_one: str,
     *,
-    timeout: int = 60,
-) -> TTSResult:
-    """Generate meditation TTS through iEmbrace using the shared `TTSRequest` shape."""
+    timeout: int = 30,
+    session: requests.Session | None = None,
+) -> str:
+    """Generate a personalized meditation script from the iEmbrace API."""
+    call = _prepare_personalization_call(mood, goal, message_to_loved_one)
+
+    with provider_slot("iembrace"):
+        response = (session or get_http_session()).post(**call, timeout=timeout)
+    response.raise_for_status()
+
+    return _script_from_response(response.json())
+
+
+async def generate_personalized_meditation_async(
+    mood: str,
+    goal: str,
+    message_to_loved_one: str,
+    *,
+    timeout: int = 30,
+    client: httpx.AsyncClient | None = None,
+) -> str:
+    """Async `generate_personalized_meditation` over the loop's pooled client."""
+    call = _prepare_personalization_call(mood, goal, message_to_loved_one)
+
+    async with provider_slot_async("iembrace"):
+        response = await (client or get_async_http_client()).post(**call, timeout=timeout)
+    response.raise_for_status()
+
+    return _script_from_response(response.json())
+
+
+def _prepare_tts_call(
+    request: TTSRequest | Mapping[str, Any],
+) -> tuple[TTSRequest, dict[str, Any]]:
+    """Return the normalized request and the POST keyword arguments."""
     load_project_env()
 
     normalized_request = coerce_tts_request(request)
     base_url = get_api_base_url()
     user_email = get_user_email()
 
-    url = f"{base_url}/personalization/tts_service"
-    headers = {
-        "Content-Type": "application/json",
-        "X-User-Email": user_email,
+    call = {
+        "url": f"{base_url}/personalization/tts_service",
+        "headers": {
+            "Content-Type": "application/json",
+            "X-User-Email": user_email,
+        },
+        "json": normalized_request.as_payload(),
     }
+    return normalized_request, call
 
-    response = requests.post(
-        url,
-        headers=headers,
-        json=normalized_request.as_payload(),
-        timeout=timeout,
-    )
-    response.raise_for_status()
 
-    payload = _unwrap_lambda_payload(response.json())
+def _tts_result_from_response(
+    normalized_request: TTSRequest, response_payload: Any
+) -> TTSResult:
+    payload = _unwrap_lambda_payload(response_payload)
     if not isinstance(payload, dict):
         raise RuntimeError(f"Unexpected response payload type: {type(payload)}")
 
@@ -123,3 +160,35 @@ def generate_tts_audio_iembrace(
         voiceId=None,
         raw=payload,
     )
+
+
+def generate_tts_audio_iembrace(
+    request: TTSRequest | Mapping[str, Any],
+    *,
+    timeout: int = 60,
+    session: requests.Session | None = None,
+) -> TTSResult:
+    """Generate meditation TTS through iEmbrace using the shared `TTSRequest` shape."""
+    normalized_request, call = _prepare_tts_call(request)
+
+    with provider_slot("iembrace"):
+        response = (session or get_http_session()).post(**call, timeout=timeout)
+    response.raise_for_status()
+
+    return _tts_result_from_response(normalized_request, response.json())
+
+
+async def generate_tts_audio_iembrace_async(
+    request: TTSRequest | Mapping[str, Any],
+    *,
+    timeout: int = 60,
+    client: httpx.AsyncClient | None = None,
+) -> TTSResult:
+    """Async `generate_tts_audio_iembrace` over the loop's pooled client."""
+    normalized_request, call = _prepare_tts_call(request)
+
+    async with provider_slot_async("iembrace"):
+        response = await (client or get_async_http_client()).post(**call, timeout=timeout)
+    response.raise_for_status()
+
+    return _tts_result_from_response(normalized_request, response.json())
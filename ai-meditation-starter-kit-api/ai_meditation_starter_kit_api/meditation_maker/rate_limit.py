@@ -0,0 +1,388 @@
+"""Fleet-wide rate limits for provider calls, coordinated through Redis.
+
+Every taskiq worker calls ElevenLabs, iEmbrace and Anthropic on its own, so
+bursts from several workers add up to 429s and retries. Provider calls instead
+take a slot from the registered `ProviderRateLimiter`, which the Django app backs
+with Redis (`settings.REDIS_URL`) so one budget is shared by every process.
+Limits are set per provider (`ELEVENLABS`, `IEMBRACE`, `ANTHROPIC`):
+
+- `<PROVIDER>_REQUESTS_PER_SECOND` and `<PROVIDER>_RATE_LIMIT_BURST` bound the
+  sustained request rate and how many requests may start back to back;
+- `<PROVIDER>_MAX_IN_FLIGHT` bounds concurrent requests.
+
+A call queues for its slot for up to `PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS` and
+then raises `TimeoutError`. Unconfigured providers, and processes with no limiter
+registered, call the provider directly. A Redis outage is logged and lets calls
+through as well, so limiting never fails generation on its own.
+
+Within one process, `limit_provider_requests` additionally bounds the async
+requests made from the current context (and tasks created in it) with a
+semaphore, e.g. the per-job `ELEVENLABS_MAX_CONCURRENCY`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+import time
+import uuid
+import weakref
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Protocol
+
+from .config import (
+    get_provider_max_in_flight,
+    get_provider_rate_limit_burst,
+    get_provider_rate_limit_max_wait_seconds,
+    get_provider_requests_per_second,
+    load_project_env,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterator, Mapping
+    from contextlib import AbstractAsyncContextManager, AbstractContextManager
+
+logger = logging.getLogger(__name__)
+
+# An in-flight slot left by a crashed worker is reclaimed after this long.
+_LEASE_MS = 10 * 60 * 1000
+# Polling backoff while every in-flight slot is taken.
+_MIN_POLL_SECONDS = 0.05
+_MAX_POLL_SECONDS = 1.0
+
+# Generic cell rate algorithm. Each call reserves the next free start time, so
+# waiting callers are served in arrival order and the fleet starts requests at
+# exactly the configured rate. Times come from the Redis clock, so worker clock
+# skew does not matter. Returns the microseconds to wait before starting, or
+# that delay negated (without reserving) when it exceeds ARGV[3].
+_RESERVE_START_SCRIPT = """
+local now = redis.call('TIME')
+local now_us = tonumber(now[1]) * 1000000 + tonumber(now[2])
+local interval_us = tonumber(ARGV[1])
+local tat = tonumber(redis.call('GET', KEYS[1])) or now_us
+if tat < now_us then
+    tat = now_us
+end
+local delay_us = tat - tonumber(ARGV[2]) - now_us
+if delay_us < 0 then
+    delay_us = 0
+end
+if delay_us > tonumber(ARGV[3]) then
+    return -delay_us
+end
+local next_tat = tat + interval_us
+redis.call('SET', KEYS[1], string.format('%.0f', next_tat), 'PX', math.ceil((next_tat - now_us) / 1000) + 1000)
+return delay_us
+"""
+
+# Takes one of ARGV[1] in-flight slots for the lease ARGV[3], after dropping
+# leases that have expired. Returns 1 if the slot was taken.
+_ACQUIRE_IN_FLIGHT_SCRIPT = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now_ms)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now_ms + tonumber(ARGV[2]), ARGV[3])
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+_shared_limiter: ProviderRateLimiter | None = None
+_request_semaphore: ContextVar[asyncio.Semaphore | None] = ContextVar("provider_request_semaphore", default=None)
+
+
+@dataclass(frozen=True, slots=True)
+class ProviderLimit:
+    """How fast and how concurrently one provider may be called across the fleet."""
+
+    requests_per_second: float | None = None
+    burst: int = 1
+    max_in_flight: int | None = None
+
+    @property
+    def is_limited(self) -> bool:
+        return self.requests_per_second is not None or self.max_in_flight is not None
+
+
+def provider_limit_from_env(provider: str) -> ProviderLimit:
+    """Read `provider`'s limit from its `<PROVIDER>_...` environment variables."""
+    load_project_env()
+    return ProviderLimit(
+        requests_per_second=get_provider_requests_per_second(provider),
+        burst=get_provider_rate_limit_burst(provider),
+        max_in_flight=get_provider_max_in_flight(provider),
+    )
+
+
+class ProviderRateLimiter(Protocol):
+    """Hands out slots to call a provider; the call runs inside the context."""
+
+    def slot(self, provider: str) -> AbstractContextManager[object]: ...
+
+    def slot_async(self, provider: str) -> AbstractAsyncContextManager[object]: ...
+
+    async def aclose(self) -> None: ...
+
+
+@dataclass(frozen=True, slots=True)
+class _RedisScripts:
+    client: Any
+    reserve_start: Any
+    acquire_in_flight: Any
+
+
+def _register_scripts(client: Any) -> _RedisScripts:
+    return _RedisScripts(
+        client,
+        client.register_script(_RESERVE_START_SCRIPT),
+        client.register_script(_ACQUIRE_IN_FLIGHT_SCRIPT),
+    )
+
+
+def _redis_error_class() -> type[Exception]:
+    from redis.exceptions import RedisError
+
+    return RedisError
+
+
+def _queue_timeout(provider: str, max_wait_seconds: float) -> TimeoutError:
+    msg = f"Timed out after {max_wait_seconds:g}s waiting for a {provider} rate-limit slot."
+    return TimeoutError(msg)
+
+
+def _poll_delay(attempt: int, remaining: float) -> float:
+    """Return a jittered, exponentially growing poll delay capped by `remaining`."""
+    delay = min(_MIN_POLL_SECONDS * 2**attempt, _MAX_POLL_SECONDS)
+    return max(min(random.uniform(delay / 2, delay), remaining), 0.0)
+
+
+class RedisProviderRateLimiter:
+    """Provider rate limits shared by every process that uses the same Redis.
+
+    Each provider gets a token bucket (kept as a theoretical arrival time, see
+    `_RESERVE_START_SCRIPT`) and a sorted set of in-flight leases. A slot first
+    takes an in-flight lease, polling with backoff while all are taken, then
+    reserves its start time and sleeps until it. Leases expire after ten minutes
+    so a crashed worker cannot hold a slot forever. `limits` overrides the
+    environment for the providers it names.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        limits: Mapping[str, ProviderLimit] | None = None,
+        max_wait_seconds: float | None = None,
+        key_prefix: str = "provider-rate-limit",
+    ) -> None:
+        load_project_env()
+        self.url = url
+        self.key_prefix = key_prefix
+        self.max_wait_seconds = (
+            get_provider_rate_limit_max_wait_seconds() if max_wait_seconds is None else max_wait_seconds
+        )
+        self._limits: dict[str, ProviderLimit] = dict(limits or {})
+        self._lock = threading.Lock()
+        self._scripts: _RedisScripts | None = None
+        self._async_scripts: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _RedisScripts] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def limit(self, provider: str) -> ProviderLimit:
+        limit = self._limits.get(provider)
+        if limit is None:
+            limit = self._limits.setdefault(provider, provider_limit_from_env(provider))
+        return limit
+
+    def _key(self, provider: str, name: str) -> str:
+        return f"{self.key_prefix}:{provider}:{name}"
+
+    def _start_args(self, limit: ProviderLimit, remaining: float) -> list[int]:
+        interval_us = round(1_000_000 / limit.requests_per_second)  # type: ignore[operator]
+        return [interval_us, (max(limit.burst, 1) - 1) * interval_us, int(max(remaining, 0.0) * 1_000_000)]
+
+    def _sync_scripts(self) -> _RedisScripts:
+        # redis-py reopens its pooled connections after a fork, so one client serves the process.
+        if self._scripts is None:
+            with self._lock:
+                if self._scripts is None:
+                    import redis
+
+                    self._scripts = _register_scripts(redis.Redis.from_url(self.url))
+        return self._scripts
+
+    def _loop_scripts(self) -> _RedisScripts:
+        # Like httpx clients, asyncio Redis connections are bound to the loop they first ran on.
+        loop = asyncio.get_running_loop()
+        scripts = self._async_scripts.get(loop)
+        if scripts is None:
+            import redis.asyncio
+
+            scripts = _register_scripts(redis.asyncio.Redis.from_url(self.url))
+            self._async_scripts[loop] = scripts
+        return scripts
+
+    def _acquire(self, provider: str, limit: ProviderLimit) -> str | None:
+        scripts = self._sync_scripts()
+        deadline = time.monotonic() + self.max_wait_seconds
+        lease = None
+        if limit.max_in_flight is not None:
+            lease = uuid.uuid4().hex
+            attempt = 0
+            while not scripts.acquire_in_flight(
+                keys=[self._key(provider, "in-flight")], args=[limit.max_in_flight, _LEASE_MS, lease]
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise _queue_timeout(provider, self.max_wait_seconds)
+                time.sleep(_poll_delay(attempt, remaining))
+                attempt += 1
+
+        if limit.requests_per_second is not None:
+            try:
+                delay_us = scripts.reserve_start(
+                    keys=[self._key(provider, "start")], args=self._start_args(limit, deadline - time.monotonic())
+                )
+                if delay_us < 0:
+                    raise _queue_timeout(provider, self.max_wait_seconds)
+                time.sleep(delay_us / 1_000_000)
+            except BaseException:
+                self._release(provider, lease)
+                raise
+        return lease
+
+    def _release(self, provider: str, lease: str | None) -> None:
+        if lease is None:
+            return
+        try:
+            self._sync_scripts().client.zrem(self._key(provider, "in-flight"), lease)
+        except _redis_error_class():
+            logger.warning("Could not release %s rate-limit slot", provider, exc_info=True)
+
+    @contextmanager
+    def slot(self, provider: str) -> Iterator[None]:
+        limit = self.limit(provider)
+        lease = None
+        if limit.is_limited:
+            try:
+                lease = self._acquire(provider, limit)
+            except _redis_error_class():
+                logger.warning("Rate limiter unavailable; calling %s unlimited", provider, exc_info=True)
+        try:
+            yield
+        finally:
+            self._release(provider, lease)
+
+    async def _acquire_async(self, provider: str, limit: ProviderLimit) -> str | None:
+        scripts = self._loop_scripts()
+        deadline = time.monotonic() + self.max_wait_seconds
+        lease = None
+        if limit.max_in_flight is not None:
+            lease = uuid.uuid4().hex
+            attempt = 0
+            while not await scripts.acquire_in_flight(
+                keys=[self._key(provider, "in-flight")], args=[limit.max_in_flight, _LEASE_MS, lease]
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise _queue_timeout(provider, self.max_wait_seconds)
+                await asyncio.sleep(_poll_delay(attempt, remaining))
+                attempt += 1
+
+        if limit.requests_per_second is not None:
+            try:
+                delay_us = await scripts.reserve_start(
+                    keys=[self._key(provider, "start")], args=self._start_args(limit, deadline - time.monotonic())
+                )
+                if delay_us < 0:
+                    raise _queue_timeout(provider, self.max_wait_seconds)
+                await asyncio.sleep(delay_us / 1_000_000)
+            except BaseException:
+                await self._release_async(provider, lease)
+                raise
+        return lease
+
+    async def _release_async(self, provider: str, lease: str | None) -> None:
+        if lease is None:
+            return
+        try:
+            await self._loop_scripts().client.zrem(self._key(provider, "in-flight"), lease)
+        except _redis_error_class():
+            logger.warning("Could not release %s rate-limit slot", provider, exc_info=True)
+
+    @asynccontextmanager
+    async def slot_async(self, provider: str) -> AsyncIterator[None]:
+        limit = self.limit(provider)
+        lease = None
+        if limit.is_limited:
+            try:
+                lease = await self._acquire_async(provider, limit)
+            except _redis_error_class():
+                logger.warning("Rate limiter unavailable; calling %s unlimited", provider, exc_info=True)
+        try:
+            yield
+        finally:
+            await self._release_async(provider, lease)
+
+    async def aclose(self) -> None:
+        """Close this process's Redis clients; the next slot opens new ones.
+
+        Only the running loop's async client can be closed from here; clients of
+        other loops are dropped with their loops.
+        """
+        scripts = self._async_scripts.pop(asyncio.get_running_loop(), None)
+        self._async_scripts.clear()
+        with self._lock:
+            sync_scripts, self._scripts = self._scripts, None
+        if sync_scripts is not None:
+            sync_scripts.client.close()
+        if scripts is not None:
+            await scripts.client.aclose()
+
+
+def set_provider_rate_limiter(limiter: ProviderRateLimiter | None) -> None:
+    """Register the limiter `provider_slot` and `provider_slot_async` take slots from."""
+    global _shared_limiter
+    _shared_limiter = limiter
+
+
+async def aclose_provider_rate_limiter() -> None:
+    """Close the registered limiter's connections, e.g. when a worker shuts down."""
+    if _shared_limiter is not None:
+        await _shared_limiter.aclose()
+
+
+def provider_slot(provider: str) -> AbstractContextManager[object]:
+    """Return a context to make one `provider` call in, waiting for a slot if limited."""
+    return _shared_limiter.slot(provider) if _shared_limiter is not None else nullcontext()
+
+
+@contextmanager
+def limit_provider_requests(semaphore: asyncio.Semaphore) -> Iterator[None]:
+    """Make `provider_slot_async` hold `semaphore` for every request made in this context.
+
+    Tasks created inside the block inherit the limit, so each HTTP request (a
+    hedge included) takes one permit, however the calls above it are fanned out.
+    """
+    token = _request_semaphore.set(semaphore)
+    try:
+        yield
+    finally:
+        _request_semaphore.reset(token)
+
+
+@asynccontextmanager
+async def provider_slot_async(provider: str) -> AsyncIterator[None]:
+    """Async `provider_slot`, also holding the `limit_provider_requests` semaphore if set."""
+    semaphore = _request_semaphore.get()
+    async with (
+        semaphore if semaphore is not None else nullcontext(),
+        _shared_limiter.slot_async(provider) if _shared_limiter is not None else nullcontext(),
+    ):
+        yield
@@ -0,0 +1,75 @@
+"""Compile script pause tokens into gaps between timeline entries.
+
+Instead of having the provider synthesize long stretches of silence, a script is
+split at its ``[Ns]`` pause tokens into speech segments. Each segment becomes
+its own audio asset, and each pause becomes the gap between the `atMs` starts of
+consecutive `wav` timeline entries. Pauses shorter than `min_gap_seconds` stay
+inline in the speech, so brief breaths do not fragment it into tiny assets.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from .elevenlabs_tts import PAUSE_TOKEN_PATTERN
+
+DEFAULT_MIN_GAP_SECONDS = 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class SpeechSegment:
+    """Speech to synthesize as one asset, after `gap_before_ms` of silence."""
+
+    text: str
+    gap_before_ms: int
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledScript:
+    """A script's speech segments and the silence after the last one."""
+
+    segments: tuple[SpeechSegment, ...]
+    trailing_gap_ms: int
+
+    def schedule(self, durations_ms: Sequence[int]) -> tuple[list[int], int]:
+        """Return each segment's `atMs` and the total duration, given segment durations."""
+        if len(durations_ms) != len(self.segments):
+            msg = f"Expected {len(self.segments)} segment durations, got {len(durations_ms)}."
+            raise ValueError(msg)
+
+        starts: list[int] = []
+        cursor = 0
+        for segment, duration_ms in zip(self.segments, durations_ms):
+            cursor += segment.gap_before_ms
+            starts.append(cursor)
+            cursor += duration_ms
+        return starts, cursor + self.trailing_gap_ms
+
+
+def compile_script_pauses(text: str, min_gap_seconds: float = DEFAULT_MIN_GAP_SECONDS) -> CompiledScript:
+    """Split `text` at pause tokens of at least `min_gap_seconds` into speech segments.
+
+    Consecutive pauses, and pauses before any speech, add up into one gap.
+    """
+    # re.split interleaves the captured pause seconds with the text between tokens.
+    pieces = PAUSE_TOKEN_PATTERN.split(text)
+    segments: list[SpeechSegment] = []
+    gap_seconds = 0.0
+    speech = pieces[0]
+    for index in range(1, len(pieces), 2):
+        seconds = float(pieces[index])
+        if seconds < min_gap_seconds and speech.strip():
+            speech = f"{speech}[{pieces[index]}s]{pieces[index + 1]}"
+            continue
+
+        if speech.strip():
+            segments.append(SpeechSegment(" ".join(speech.split()), round(gap_seconds * 1000)))
+            gap_seconds = 0.0
+        gap_seconds += seconds
+        speech = pieces[index + 1]
+
+    if speech.strip():
+        segments.append(SpeechSegment(" ".join(speech.split()), round(gap_seconds * 1000)))
+        gap_seconds = 0.0
+    return CompiledScript(tuple(segments), round(gap_seconds * 1000))
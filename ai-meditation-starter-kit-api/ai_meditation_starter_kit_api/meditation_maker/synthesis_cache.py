@@ -0,0 +1,144 @@
+"""Content-addressed cache for synthesized TTS and SFX audio.
+
+Entries are keyed on the normalized text plus every parameter sent to the
+provider, so repeated intro/closing lines and bell prompts are synthesized once
+no matter which meditation asks for them. A local, size-bounded disk tier
+(`SYNTHESIS_CACHE_DIR`) sits in front of an optional shared tier, which the host
+application registers with `set_shared_synthesis_tier` (the Django app backs it
+with the configured storage).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import unicodedata
+import uuid
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from .config import get_synthesis_cache_dir, get_synthesis_cache_max_bytes, load_project_env
+from .disk_cache import LruDiskTier, default_tier
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever synthesis or decoding changes the audio for the same inputs.
+SYNTHESIS_CACHE_VERSION = 1
+
+_shared_tier: SynthesisCacheTier | None = None
+
+
+def normalize_synthesis_text(text: str) -> str:
+    """Return `text` in NFC form with runs of whitespace collapsed to one space."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def synthesis_cache_key(kind: str, text: str, **parameters: Any) -> str:
+    """Return the cache key for one `kind` of synthesis ("tts" or "sfx") and its inputs."""
+    payload = {
+        "version": SYNTHESIS_CACHE_VERSION,
+        "kind": kind,
+        "text": normalize_synthesis_text(text),
+        **parameters,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def encode_synthesis_entry(metadata: dict[str, Any], audio_bytes: bytes) -> bytes:
+    """Serialize an entry as one line of JSON metadata followed by the raw audio."""
+    return json.dumps(metadata, separators=(",", ":")).encode("utf-8") + b"\n" + audio_bytes
+
+
+def decode_synthesis_entry(payload: bytes) -> tuple[dict[str, Any], bytes] | None:
+    """Parse an `encode_synthesis_entry` payload, or return None if it is damaged."""
+    header, separator, audio_bytes = payload.partition(b"\n")
+    if not separator:
+        return None
+    try:
+        metadata = json.loads(header)
+    except ValueError:
+        return None
+    return (metadata, audio_bytes) if isinstance(metadata, dict) else None
+
+
+class SynthesisCacheTier(Protocol):
+    """Stores serialized entries by key; misses and failures both return None."""
+
+    def get(self, key: str) -> bytes | None: ...
+
+    def put(self, key: str, payload: bytes) -> None: ...
+
+
+@dataclass(slots=True)
+class DiskSynthesisTier(LruDiskTier):
+    """An `LruDiskTier` whose entries are single payload files.
+
+    Entries are written to a temporary name and renamed into place, so
+    concurrent writers and readers never observe a partial file.
+    """
+
+    def get(self, key: str) -> bytes | None:
+        entry_path = self._entry_path(key)
+        try:
+            payload = entry_path.read_bytes()
+        except OSError:
+            return None
+        self._touch(entry_path)
+        return payload
+
+    def put(self, key: str, payload: bytes) -> None:
+        entry_path = self._entry_path(key)
+        temp_path = entry_path.parent / f".{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_bytes(payload)
+            replaced_bytes = entry_path.stat().st_size if entry_path.exists() else 0
+            os.replace(temp_path, entry_path)
+        except OSError:
+            temp_path.unlink(missing_ok=True)
+            logger.warning("Could not write synthesis cache entry %s", key, exc_info=True)
+            return
+        self._added(len(payload) - replaced_bytes)
+
+
+@dataclass(slots=True)
+class SynthesisCache:
+    """An optional local tier in front of an optional shared tier."""
+
+    local: DiskSynthesisTier | None = None
+    shared: SynthesisCacheTier | None = None
+
+    def get(self, key: str) -> tuple[dict[str, Any], bytes] | None:
+        """Return the cached `(metadata, audio_bytes)` for `key`, filling the local tier."""
+        payload = self.local.get(key) if self.local is not None else None
+        if payload is None and self.shared is not None:
+            payload = self.shared.get(key)
+            if payload is not None and self.local is not None:
+                self.local.put(key, payload)
+        return decode_synthesis_entry(payload) if payload is not None else None
+
+    def put(self, key: str, metadata: dict[str, Any], audio_bytes: bytes) -> None:
+        payload = encode_synthesis_entry(metadata, audio_bytes)
+        if self.local is not None:
+            self.local.put(key, payload)
+        if self.shared is not None:
+            self.shared.put(key, payload)
+
+
+def set_shared_synthesis_tier(tier: SynthesisCacheTier | None) -> None:
+    """Register the shared tier `default_synthesis_cache` puts behind the local one."""
+    global _shared_tier
+    _shared_tier = tier
+
+
+def default_synthesis_cache() -> SynthesisCache | None:
+    """Build the cache from `SYNTHESIS_CACHE_DIR` and the registered shared tier, if any."""
+    load_project_env()
+
+    local_dir = get_synthesis_cache_dir()
+    local = default_tier(DiskSynthesisTier, local_dir, get_synthesis_cache_max_bytes()) if local_dir else None
+    if local is None and _shared_tier is None:
+        return None
+    return SynthesisCache(local=local, shared=_shared_tier)
@@ -0,0 +1,44 @@
+"""The NumPy analysis backend against librosa, on the bundled meditation audio."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("librosa")
+
+from ai_meditation_starter_kit_api.meditation_maker.ahap import (  # noqa: E402
+    analyze_audio_array,
+    decode_wav_bytes,
+)
+
+# The repository's `audio/` directory; absent when the package is installed on its own.
+AUDIO_DIR = Path(__file__).resolve().parents[4] / "audio"
+FIXTURES = sorted(AUDIO_DIR.glob("*.wav")) if AUDIO_DIR.is_dir() else []
+
+# Onsets must land on the same analysis frame (one 512-sample hop at 44.1 kHz).
+ONSET_TIME_TOLERANCE = 512 / 44100
+# Intensity and sharpness are in [0, 1]; on these fixtures the backends differ by
+# at most 0.004 per onset and 0.0014 per continuous step.
+PARAMETER_TOLERANCE = 0.005
+
+
+@pytest.mark.skipif(not FIXTURES, reason=f"no WAV fixtures in {AUDIO_DIR}")
+@pytest.mark.parametrize("wav_path", FIXTURES, ids=lambda path: path.stem)
+def test_numpy_backend_matches_librosa(wav_path: Path) -> None:
+    decoded = decode_wav_bytes(wav_path.read_bytes())
+    assert decoded is not None, f"{wav_path.name} is not a PCM/float WAV file"
+    audio_data, sample_rate = decoded
+
+    reference = analyze_audio_array(audio_data, sample_rate, "sfx", backend="librosa")
+    candidate = analyze_audio_array(audio_data, sample_rate, "sfx", backend="numpy")
+
+    assert len(candidate.onset_times) == len(reference.onset_times)
+    np.testing.assert_allclose(candidate.onset_times, reference.onset_times, rtol=0, atol=ONSET_TIME_TOLERANCE)
+    np.testing.assert_array_equal(candidate.onset_modes, reference.onset_modes)
+    for field in ("onset_intensities", "onset_sharpnesses", "continuous_intensities", "continuous_sharpnesses"):
+        np.testing.assert_allclose(
+            getattr(candidate, field), getattr(reference, field), rtol=0, atol=PARAMETER_TOLERANCE, err_msg=field
+        )
@@ -0,0 +1,130 @@
+"""Fleet-wide provider rate limits, run against fakeredis."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+redis = pytest.importorskip("redis")
+import redis.asyncio  # noqa: E402
+
+from ai_meditation_starter_kit_api.meditation_maker import rate_limit  # noqa: E402
+from ai_meditation_starter_kit_api.meditation_maker.rate_limit import (  # noqa: E402
+    ProviderLimit,
+    RedisProviderRateLimiter,
+    provider_slot,
+    provider_slot_async,
+    set_provider_rate_limiter,
+)
+
+# Lower bound on the spacing between rate-limited starts, allowing for clock granularity.
+_SPACING_SLACK = 0.01
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.Redis, "from_url", lambda url: fakeredis.FakeRedis(server=server))
+    monkeypatch.setattr(redis.asyncio.Redis, "from_url", lambda url: fakeredis.FakeAsyncRedis(server=server))
+    yield server
+    set_provider_rate_limiter(None)
+
+
+def _limiter(max_wait_seconds: float = 5.0, **limit) -> RedisProviderRateLimiter:
+    return RedisProviderRateLimiter(
+        "redis://fake", limits={"p": ProviderLimit(**limit)}, max_wait_seconds=max_wait_seconds
+    )
+
+
+def _starts(count: int) -> list[float]:
+    starts = []
+    for _ in range(count):
+        with provider_slot("p"):
+            starts.append(time.monotonic())
+    return starts
+
+
+def test_burst_then_spaced_starts(redis_server):
+    set_provider_rate_limiter(_limiter(requests_per_second=20, burst=3))
+    starts = _starts(6)
+
+    interval = 1 / 20
+    assert starts[2] - starts[0] < interval
+    for earlier, later in zip(starts[2:], starts[3:]):
+        assert later - earlier >= interval - _SPACING_SLACK
+
+
+def test_rate_is_shared_by_every_limiter_on_the_same_redis(redis_server):
+    first, second = _limiter(requests_per_second=10), _limiter(requests_per_second=10)
+    with first.slot("p"):
+        started = time.monotonic()
+    with second.slot("p"):
+        waited = time.monotonic() - started
+    assert waited >= 1 / 10 - _SPACING_SLACK
+
+
+def test_slot_async_caps_in_flight_requests(redis_server):
+    limiter = _limiter(max_in_flight=2)
+    set_provider_rate_limiter(limiter)
+    in_flight = peak = 0
+
+    async def call() -> None:
+        nonlocal in_flight, peak
+        async with provider_slot_async("p"):
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+
+    async def main() -> None:
+        await asyncio.gather(*(call() for _ in range(6)))
+        await limiter.aclose()
+
+    asyncio.run(main())
+    assert peak == 2
+
+    # Every lease was released, so both slots are free again straight away.
+    client = fakeredis.FakeRedis(server=redis_server)
+    assert sum(client.zcard(key) for key in client.keys("*in-flight*")) == 0
+
+
+def test_slot_times_out_waiting_for_its_start(redis_server):
+    limiter = _limiter(max_wait_seconds=0.1, requests_per_second=1)
+    with limiter.slot("p"):
+        pass
+    with pytest.raises(TimeoutError), limiter.slot("p"):
+        pass
+
+
+def test_slot_times_out_waiting_for_an_in_flight_slot(redis_server):
+    limiter = _limiter(max_wait_seconds=0.2, max_in_flight=1)
+    with limiter.slot("p"):
+        started = time.monotonic()
+        with pytest.raises(TimeoutError), limiter.slot("p"):
+            pass
+        assert time.monotonic() - started >= 0.2 - _SPACING_SLACK
+
+
+def test_slot_left_by_a_crashed_worker_is_reclaimed(redis_server, monkeypatch):
+    # Shorten the lease so the test need not wait the production ten minutes.
+    monkeypatch.setattr(rate_limit, "_LEASE_MS", 100)
+    limiter = _limiter(max_wait_seconds=1.0, max_in_flight=1)
+
+    # A worker that dies inside its slot never releases the lease.
+    abandoned = limiter.slot("p")
+    abandoned.__enter__()
+
+    started = time.monotonic()
+    with limiter.slot("p"):
+        waited = time.monotonic() - started
+    assert 0.1 - _SPACING_SLACK <= waited < 1.0
+    del abandoned
+
+
+def test_unlimited_provider_is_not_queued(redis_server):
+    set_provider_rate_limiter(_limiter())
+    starts = _starts(5)
+    assert starts[-1] - starts[0] < 0.05
@@ -0,0 +1,256 @@
+"""Latency-aware routing and hedged requests across TTS providers.
+
+ElevenLabs and iEmbrace take the same `TTSRequest`. `TTSRouter` keeps a rolling
+latency and error profile per provider and sends each request to the fastest
+healthy one. With hedging on, a request that outlives that provider's p95
+latency gets a hedged second request and whichever answers first wins, so one
+slow response no longer sets the tail latency of a whole meditation.
+
+The providers are chosen with `TTS_PROVIDERS` (default `elevenlabs`; add
+`iembrace` to route between both). Hedging is opt-in with `TTS_HEDGING=1`: it
+bills about one request in twenty twice, and each hedge takes its own
+`provider_slot_async` slot and request permit like any other request. The two
+providers speak with different voices, so a caller that stitches several
+requests into one recording should `choose()` a provider once and pin it;
+hedges then go to that same provider.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any
+
+from .audio_decoding import decode_to_wav
+from .config import get_tts_hedging_enabled, get_tts_providers, load_project_env
+from .elevenlabs_tts import generate_tts_audio_elevenlabs_async
+from .http_session import get_async_http_client
+from .iembrace import generate_tts_audio_iembrace_async
+from .types import TTSRequest, TTSResult, coerce_tts_request
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Mapping, Sequence
+
+    TTSProvider = Callable[[TTSRequest], Awaitable[TTSResult]]
+
+# Samples needed before a provider is ranked by its latency or hedged at its p95;
+# until then it is tried first, so every provider gets measured.
+_MIN_SAMPLES = 5
+# Consecutive failures that take a provider out of rotation, and for how long.
+_FAILURES_BEFORE_COOLDOWN = 3
+_COOLDOWN_SECONDS = 30.0
+
+_default_router: TTSRouter | None = None
+
+
+@dataclass(slots=True)
+class LatencyProfile:
+    """Rolling latency and error record of one provider."""
+
+    window: int = 100
+    latencies: deque[float] = field(init=False)
+    outcomes: deque[bool] = field(init=False)
+    consecutive_failures: int = 0
+    unhealthy_until: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.latencies = deque(maxlen=self.window)
+        self.outcomes = deque(maxlen=self.window)
+
+    def record_success(self, seconds: float) -> None:
+        self.latencies.append(seconds)
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= _FAILURES_BEFORE_COOLDOWN:
+            self.unhealthy_until = time.monotonic() + _COOLDOWN_SECONDS
+
+    def record_abandoned(self, seconds: float) -> None:
+        """Record a request cancelled after `seconds`, which took at least that long.
+
+        Keeping these lower bounds stops hedging from hiding the slow tail it cuts off.
+        """
+        self.latencies.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        if len(self.latencies) < _MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    def expected_seconds(self) -> float | None:
+        """Median latency inflated by the retries its error rate implies."""
+        median = self.quantile(0.5)
+        return None if median is None else median / max(1.0 - self.error_rate, 0.05)
+
+
+def _is_cached(result: TTSResult) -> bool:
+    return bool(result.raw and result.raw.get("cached"))
+
+
+class TTSRouter:
+    """Routes TTS requests to the fastest healthy provider, hedging slow ones.
+
+    `providers` maps names to async callables taking a `TTSRequest`; their order
+    breaks ties. Cache hits are not counted as latency samples.
+    """
+
+    def __init__(
+        self,
+        providers: Mapping[str, TTSProvider],
+        *,
+        hedging: bool = False,
+        hedge_quantile: float = 0.95,
+        window: int = 100,
+    ) -> None:
+        if not providers:
+            msg = "TTSRouter needs at least one provider."
+            raise ValueError(msg)
+        self.providers = dict(providers)
+        self.hedging = hedging
+        self.hedge_quantile = hedge_quantile
+        self.profiles = {name: LatencyProfile(window) for name in self.providers}
+
+    def ranked(self) -> list[str]:
+        """Return provider names, healthy before unhealthy, fastest expected first."""
+        order = list(self.providers)
+
+        def _rank(name: str) -> tuple[bool, bool, float, int]:
+            profile = self.profiles[name]
+            expected = profile.expected_seconds()
+            # Unmeasured providers sort first among the healthy ones.
+            return (not profile.healthy, expected is not None, expected or 0.0, order.index(name))
+
+        return sorted(order, key=_rank)
+
+    def choose(self) -> str:
+        """Return the provider a new request would be sent to."""
+        return self.ranked()[0]
+
+    def hedge_delay(self, provider: str) -> float | None:
+        """Seconds after which a request to `provider` gets a hedge, or None for never."""
+        return self.profiles[provider].quantile(self.hedge_quantile) if self.hedging else None
+
+    async def _call(self, provider: str, request: TTSRequest) -> TTSResult:
+        profile = self.profiles[provider]
+        started = time.monotonic()
+        try:
+            result = await self.providers[provider](request)
+        except asyncio.CancelledError:
+            profile.record_abandoned(time.monotonic() - started)
+            raise
+        except Exception:
+            profile.record_failure()
+            raise
+        if not _is_cached(result):
+            profile.record_success(time.monotonic() - started)
+        return result
+
+    async def _hedged(self, request: TTSRequest, primary: str, hedge: str) -> TTSResult:
+        tasks = {asyncio.create_task(self._call(primary, request))}
+        try:
+            delay = self.hedge_delay(primary)
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                tasks.add(asyncio.create_task(self._call(hedge, request)))
+
+            first_error: BaseException | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error  # type: ignore[misc]
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.wait(tasks)
+
+    async def generate_async(self, request: TTSRequest | Mapping[str, Any], *, provider: str | None = None) -> TTSResult:
+        """Synthesize `request` on the best provider, hedging and failing over.
+
+        With `provider`, every attempt (including the hedge) goes to that provider.
+        Otherwise a hedge goes to the next-ranked provider, and when a provider
+        fails the request moves on down the ranking; the last error is raised.
+        """
+        normalized_request = coerce_tts_request(request)
+        if provider is not None:
+            if provider not in self.providers:
+                msg = f"Unknown TTS provider {provider!r}; configured: {', '.join(self.providers)}."
+                raise ValueError(msg)
+            return await self._hedged(normalized_request, provider, provider)
+
+        ranked = self.ranked()
+        last_error: Exception | None = None
+        for index, name in enumerate(ranked):
+            hedge = ranked[index + 1] if index + 1 < len(ranked) else name
+            try:
+                return await self._hedged(normalized_request, name, hedge)
+            except Exception as error:
+                last_error = error
+        raise last_error  # type: ignore[misc]
+
+
+async def _iembrace_audio_async(request: TTSRequest) -> TTSResult:
+    """iEmbrace TTS with its audio downloaded, so results carry `audioBytes` like ElevenLabs'."""
+    result = await generate_tts_audio_iembrace_async(request)
+    response = await get_async_http_client().get(result.audioUrl, timeout=60)  # type: ignore[arg-type]
+    response.raise_for_status()
+    if request.outputFormat != "wav":
+        return replace(result, audioBytes=response.content)
+
+    decoded = await asyncio.to_thread(decode_to_wav, response.content)
+    return replace(result, audioBytes=decoded.wav_bytes, durationMs=decoded.duration_ms)
+
+
+_PROVIDERS: dict[str, TTSProvider] = {
+    "elevenlabs": generate_tts_audio_elevenlabs_async,
+    "iembrace": _iembrace_audio_async,
+}
+
+
+def build_tts_router(names: Sequence[str], *, hedging: bool = False) -> TTSRouter:
+    """Return a router over the named built-in providers (`elevenlabs`, `iembrace`)."""
+    unknown = [name for name in names if name not in _PROVIDERS]
+    if unknown:
+        msg = f"Unknown TTS provider(s): {', '.join(unknown)}. Expected any of: {', '.join(_PROVIDERS)}."
+        raise ValueError(msg)
+    return TTSRouter({name: _PROVIDERS[name] for name in names}, hedging=hedging)
+
+
+def default_tts_router() -> TTSRouter:
+    """Return this process's router over `TTS_PROVIDERS`, creating it on first use.
+
+    One router is shared so its latency profiles accumulate across requests.
+    """
+    global _default_router
+
+    if _default_router is None:
+        load_project_env()
+        _default_router = build_tts_router(get_tts_providers(), hedging=get_tts_hedging_enabled())
+    return _default_router
+
+
+async def generate_tts_audio_routed_async(
+    request: TTSRequest | Mapping[str, Any],
+    *,
+    provider: str | None = None,
+    router: TTSRouter | None = None,
+) -> TTSResult:
+    """Synthesize through `router` (default `default_tts_router()`); see `TTSRouter.generate_async`."""
+    return await (router or default_tts_router()).generate_async(request, provider=provider)
@@ -47,6 +47,7 @@ class TTSResult:
     audioBytes: bytes | None = None
     mimeType: str | None = None
     voiceId: str | None = None
+    durationMs: int | None = None
     raw: dict[str, Any] | None = None
 
 
@@ -105,6 +106,7 @@ class SFXResult:
     provider: str
     audioBytes: bytes | None = None
     mimeType: str | None = None
+    durationMs: int | None = None
     raw: dict[str, Any] | None = None
 
 
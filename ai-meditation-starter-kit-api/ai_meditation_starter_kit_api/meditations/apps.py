@@ -1,6 +1,32 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class MeditationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "ai_meditation_starter_kit_api.meditations"
+
+    def ready(self) -> None:
+        from ai_meditation_starter_kit_api.meditation_maker.config import (
+            get_synthesis_shared_cache_enabled,
+            load_project_env,
+        )
+        from ai_meditation_starter_kit_api.meditation_maker.rate_limit import (
+            RedisProviderRateLimiter,
+            set_provider_rate_limiter,
+        )
+        from ai_meditation_starter_kit_api.meditation_maker.synthesis_cache import (
+            set_shared_synthesis_tier,
+        )
+
+        from .synthesis_cache import StorageSynthesisTier
+
+        # Share synthesized TTS/SFX across processes through the configured storage.
+        load_project_env()
+        if get_synthesis_shared_cache_enabled():
+            set_shared_synthesis_tier(StorageSynthesisTier())
+
+        # Coordinate provider rate limits across every web and worker process.
+        redis_url = getattr(settings, "REDIS_URL", None)
+        if redis_url:
+            set_provider_rate_limiter(RedisProviderRateLimiter(redis_url))
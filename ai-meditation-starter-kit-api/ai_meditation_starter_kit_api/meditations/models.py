@@ -55,6 +55,11 @@ class MeditationAudio(models.Model):
 class MeditationHaptic(models.Model):
     """📳 Persisted meditation haptic (AHAP) asset."""
 
+    class Detail(models.TextChoices):
+        FULL = "full", "Full"
+        REDUCED = "reduced", "Reduced"
+        MINIMAL = "minimal", "Minimal"
+
     public_id = PublicIdField()
     haptic_key = models.CharField(max_length=255, unique=True, db_index=True)
     file = models.FileField(upload_to="meditations/haptics/")
@@ -66,3 +71,24 @@ class MeditationHaptic(models.Model):
 
     def __str__(self):
         return self.haptic_key
+
+    @staticmethod
+    def detail_key(haptic_key: str, detail: str) -> str:
+        """Return the key of the `detail` level stored next to `haptic_key`."""
+        if detail == MeditationHaptic.Detail.FULL:
+            return haptic_key
+        stem, dot, extension = haptic_key.rpartition(".")
+        return f"{stem}.{detail}.{extension}" if dot else f"{haptic_key}.{detail}"
+
+    @staticmethod
+    def split_detail_key(haptic_key: str) -> tuple[str, str]:
+        """Invert `detail_key`: return the full-detail key and level of `haptic_key`."""
+        stem, dot, extension = haptic_key.rpartition(".")
+        for detail in MeditationHaptic.Detail.values:
+            if detail == MeditationHaptic.Detail.FULL or not dot:
+                continue
+            if stem.endswith(f".{detail}"):
+                return f"{stem.removesuffix(f'.{detail}')}.{extension}", detail
+            if extension == detail:
+                return stem, detail
+        return haptic_key, MeditationHaptic.Detail.FULL
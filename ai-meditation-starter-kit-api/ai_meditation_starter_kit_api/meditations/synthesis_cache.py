@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import logging
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage, default_storage
+
+logger = logging.getLogger(__name__)
+
+SYNTHESIS_CACHE_PREFIX = "synthesis-cache"
+
+
+class StorageSynthesisTier:
+    """Shared synthesis cache tier kept in a Django storage backend.
+
+    Every web and worker process that uses the same storage (S3 in production)
+    shares entries, at the cost of one existence check per provider call. It is
+    opt-in with `SYNTHESIS_SHARED_CACHE=1`. There is no eviction here, so bound
+    the prefix with a bucket lifecycle rule (e.g. expire `synthesis-cache/`
+    objects after 30 days) before enabling it. Storage errors are logged and
+    treated as misses so a cache outage never fails synthesis.
+    """
+
+    def __init__(
+        self, storage: Storage | None = None, prefix: str = SYNTHESIS_CACHE_PREFIX
+    ) -> None:
+        self.storage = storage or default_storage
+        self.prefix = prefix
+
+    def _name(self, key: str) -> str:
+        return f"{self.prefix}/{key[:2]}/{key}"
+
+    def get(self, key: str) -> bytes | None:
+        name = self._name(key)
+        try:
+            if not self.storage.exists(name):
+                return None
+            with self.storage.open(name, "rb") as entry:
+                return entry.read()
+        except Exception:
+            logger.warning(
+                "Could not read synthesis cache entry %s", key, exc_info=True
+            )
+            return None
+
+    def put(self, key: str, payload: bytes) -> None:
+        name = self._name(key)
+        try:
+            if not self.storage.exists(name):
+                self.storage.save(name, ContentFile(payload))
+        except Exception:
+            logger.warning(
+                "Could not write synthesis cache entry %s", key, exc_info=True
+            )
@@ -1,20 +1,38 @@
 from __future__ import annotations
 
-import io
+import asyncio
+import functools
 import os
-import wave
+import tempfile
+from collections.abc import Awaitable, Callable
 from importlib import import_module
 from typing import Any
 
 from asgiref.sync import sync_to_async
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 from utils import dedent_strip_format
 
+from ai_meditation_starter_kit_api.meditation_maker.config import (
+    get_elevenlabs_max_concurrency,
+)
 from ai_meditation_starter_kit_api.meditation_maker.elevenlabs_tts import (
-    generate_tts_audio_elevenlabs,
+    generate_tts_audio_elevenlabs_chunked_async,
+)
+from ai_meditation_starter_kit_api.meditation_maker.rate_limit import (
+    provider_slot_async,
+)
+from ai_meditation_starter_kit_api.meditation_maker.script_timeline import (
+    compile_script_pauses,
+)
+from ai_meditation_starter_kit_api.meditation_maker.tts_routing import (
+    default_tts_router,
+)
+from ai_meditation_starter_kit_api.meditation_maker.types import TTSRequest, TTSResult
+from ai_meditation_starter_kit_api.meditations.models import (
+    Meditation,
+    MeditationAudio,
+    MeditationHaptic,
 )
-from ai_meditation_starter_kit_api.meditation_maker.types import TTSRequest
-from ai_meditation_starter_kit_api.meditations.models import Meditation, MeditationAudio
 
 broker = import_module("config.taskiq_config").broker
 
@@ -72,7 +90,9 @@ async def _generate_script_with_claude(llm_input: str) -> str:
     for model_name in configured_models:
         client = chat_anthropic_class(model=model_name, temperature=0.5)
         try:
-            llm_response = await client.ainvoke(llm_input)
+            # Queue for the fleet-wide Anthropic budget rather than bursting into 429s.
+            async with provider_slot_async("anthropic"):
+                llm_response = await client.ainvoke(llm_input)
             script = _extract_script_text(llm_response.content)
             if script:
                 return script
@@ -87,6 +107,71 @@ async def _generate_script_with_claude(llm_input: str) -> str:
     raise RuntimeError(msg) from last_not_found_error
 
 
+async def _store_speech_segment(
+    stem: str,
+    text: str,
+    semaphore: asyncio.Semaphore,
+    synthesize_chunk: Callable[[TTSRequest], Awaitable[TTSResult]],
+) -> int:
+    """Synthesize one speech segment, store it and its haptics; return its duration."""
+    # Chunks are stitched in order into a temporary file and handed to storage in
+    # chunks, so the WAV is never held in memory whole.
+    with tempfile.TemporaryFile() as audio_file:
+        tts_result = await generate_tts_audio_elevenlabs_chunked_async(
+            TTSRequest(text=text, languageCode="en-US", outputFormat="wav"),
+            audio_file,
+            semaphore=semaphore,
+            synthesize_chunk=synthesize_chunk,
+        )
+        if not tts_result.durationMs:
+            msg = "TTS provider returned no audio."
+            raise RuntimeError(msg)
+
+        audio_asset, _ = await MeditationAudio.objects.aget_or_create(
+            audio_key=f"audio/{stem}.wav"
+        )
+        audio_file.seek(0)
+        await sync_to_async(audio_asset.file.save)(
+            f"{stem}.wav",
+            File(audio_file),
+            save=False,
+        )
+        await audio_asset.asave(update_fields=["file", "updated_at"])
+
+        # Imported here so the web process never loads librosa just to enqueue
+        # this task.
+        from ai_meditation_starter_kit_api.meditation_maker.ahap import (
+            generate_ahap_details_from_audio,
+        )
+
+        # Analyze the segment once for every level of detail MeditationHapticView
+        # can serve. The analysis touches no ORM state, so it runs off the shared
+        # sync thread: segments analyze in parallel and storage saves do not
+        # queue behind them.
+        audio_file.seek(0)
+        ahap_payloads = await sync_to_async(
+            generate_ahap_details_from_audio, thread_sensitive=False
+        )(
+            audio_file,
+            tuple(MeditationHaptic.Detail.values),
+            as_bytes=True,
+        )
+
+    haptic_key = f"haptics/{stem}.ahap"
+    for detail, ahap_bytes in ahap_payloads.items():
+        detail_key = MeditationHaptic.detail_key(haptic_key, detail)
+        haptic_asset, _ = await MeditationHaptic.objects.aget_or_create(
+            haptic_key=detail_key
+        )
+        await sync_to_async(haptic_asset.file.save)(
+            detail_key.removeprefix("haptics/"),
+            ContentFile(ahap_bytes),
+            save=False,
+        )
+        await haptic_asset.asave(update_fields=["file", "updated_at"])
+    return tts_result.durationMs
+
+
 @broker.task
 async def generate_meditation_assets(meditation_pk: int) -> None:
     meditation = await Meditation.objects.aget(pk=meditation_pk)
@@ -111,31 +196,56 @@ async def generate_meditation_assets(meditation_pk: int) -> None:
         )
         script = await _generate_script_with_claude(llm_input)
 
-        tts_result = await sync_to_async(generate_tts_audio_elevenlabs)(
-            TTSRequest(text=script, languageCode="en-US", outputFormat="wav")
-        )
-        if not tts_result.audioBytes:
-            msg = "TTS provider returned no audio bytes."
+        # Pause tokens become gaps between timeline entries, so the provider only
+        # synthesizes speech and no silence is downloaded, stored or streamed.
+        compiled_script = compile_script_pauses(script)
+        if not compiled_script.segments:
+            msg = "Generated meditation script contains no speech."
             raise RuntimeError(msg)
-        audio_bytes = tts_result.audioBytes
 
-        with wave.open(io.BytesIO(audio_bytes), "rb") as wav_file:
-            frame_count = wav_file.getnframes()
-            frame_rate = wav_file.getframerate()
-        duration_ms = int((frame_count / frame_rate) * 1000) if frame_rate else 0
-
-        audio_key = f"audio/{meditation.meditation_id}.wav"
-        audio_asset, _ = await MeditationAudio.objects.aget_or_create(audio_key=audio_key)
-        await sync_to_async(audio_asset.file.save)(
-            f"{meditation.meditation_id}.wav",
-            ContentFile(audio_bytes),
-            save=False,
+        # One limit is shared by every segment's chunks. The fastest healthy TTS
+        # provider is chosen once so the whole meditation keeps one voice; with
+        # TTS_HEDGING=1, slow chunks are hedged against that same provider.
+        semaphore = asyncio.Semaphore(get_elevenlabs_max_concurrency())
+        router = default_tts_router()
+        synthesize_chunk = functools.partial(
+            router.generate_async, provider=router.choose()
         )
-        await audio_asset.asave(update_fields=["file", "updated_at"])
+        stems = [
+            f"{meditation.meditation_id}-{index:03d}"
+            for index in range(len(compiled_script.segments))
+        ]
+        try:
+            async with asyncio.TaskGroup() as group:
+                segment_tasks = [
+                    group.create_task(
+                        _store_speech_segment(
+                            stem, segment.text, semaphore, synthesize_chunk
+                        )
+                    )
+                    for stem, segment in zip(stems, compiled_script.segments)
+                ]
+        except ExceptionGroup as errors:
+            raise errors.exceptions[0] from None
+        starts_ms, duration_ms = compiled_script.schedule(
+            [task.result() for task in segment_tasks]
+        )
+
+        timeline: list[dict[str, Any]] = []
+        for stem, at_ms in zip(stems, starts_ms):
+            timeline.append(
+                {
+                    "atMs": at_ms,
+                    "kind": "ahap",
+                    "file": f"haptics/{stem}.ahap",
+                    "platform": "ios",
+                }
+            )
+            timeline.append({"atMs": at_ms, "kind": "wav", "file": f"audio/{stem}.wav"})
 
         meditation.script = script
         meditation.duration_ms = max(duration_ms, 0)
-        meditation.timeline = [{"atMs": 0, "kind": "wav", "file": audio_key}]
+        meditation.timeline = timeline
         meditation.status = Meditation.Status.READY
         meditation.error_message = ""
         await meditation.asave(
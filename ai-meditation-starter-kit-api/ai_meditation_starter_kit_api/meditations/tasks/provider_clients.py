@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from importlib import import_module
+
+from taskiq import TaskiqEvents, TaskiqState
+
+from ai_meditation_starter_kit_api.meditation_maker.http_session import (
+    aclose_async_http_client,
+    close_http_session,
+)
+from ai_meditation_starter_kit_api.meditation_maker.rate_limit import (
+    aclose_provider_rate_limiter,
+)
+
+broker = import_module("config.taskiq_config").broker
+
+
+@broker.on_event(TaskiqEvents.WORKER_SHUTDOWN)
+async def close_provider_clients_on_worker_shutdown(state: TaskiqState) -> None:
+    """Close the pooled provider connections the worker kept alive."""
+    await aclose_async_http_client()
+    close_http_session()
+    await aclose_provider_rate_limiter()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import logging
+import os
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from taskiq import TaskiqEvents, TaskiqState
+
+broker = import_module("config.taskiq_config").broker
+
+logger = logging.getLogger(__name__)
+
+
+def _warmup_enabled() -> bool:
+    return os.environ.get("AHAP_WORKER_WARMUP", "1").strip() != "0"
+
+
+@broker.on_event(TaskiqEvents.WORKER_STARTUP)
+async def warm_up_ahap_on_worker_startup(state: TaskiqState) -> None:
+    """Compile AHAP analysis before the worker takes jobs.
+
+    Without this, the first meditation after every deploy or scale-up pays for
+    librosa's lazy imports and numba compilation. Set `AHAP_WORKER_WARMUP=0` to
+    skip, and point `NUMBA_CACHE_DIR` at persistent storage to reuse compiled
+    kernels across deploys.
+    """
+    if not _warmup_enabled():
+        return
+
+    try:
+        from ai_meditation_starter_kit_api.meditation_maker.ahap import warm_up_ahap
+
+        seconds = await sync_to_async(warm_up_ahap)()
+    except Exception:
+        # A failed warmup only costs the first job its compile time.
+        logger.exception("AHAP warmup failed")
+        return
+
+    logger.info("AHAP warmup finished in %.2fs", seconds)
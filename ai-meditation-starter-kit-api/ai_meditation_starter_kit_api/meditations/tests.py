@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from .models import MeditationHaptic
+from .views import HAPTIC_DETAIL_HEADER, HAPTICS_ROUTE_NAME
+
+Detail = MeditationHaptic.Detail
+
+
+class MeditationHapticViewTests(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.storage_settings = override_settings(
+            MEDIA_ROOT=cls.media_root,
+            STORAGES={
+                "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+                "staticfiles": {
+                    "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+                },
+            },
+        )
+        cls.storage_settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.storage_settings.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email="listener@example.com", password="unused"
+        )
+        self.client.force_authenticate(user)
+
+    def _store(self, haptic_key: str, *details: str) -> None:
+        for detail in details:
+            detail_key = MeditationHaptic.detail_key(haptic_key, detail)
+            haptic = MeditationHaptic(haptic_key=detail_key)
+            haptic.file.save(
+                detail_key.removeprefix("haptics/"),
+                ContentFile(detail.encode()),
+                save=True,
+            )
+
+    def _get(self, haptic_path: str, query=None, **headers):
+        url = reverse(HAPTICS_ROUTE_NAME, kwargs={"haptic_path": haptic_path})
+        response = self.client.get(url, query, **headers)
+        self.assertEqual(response.status_code, 200)
+        body = b"".join(response.streaming_content).decode()
+        response.close()
+        return body, response
+
+    def test_defaults_to_full_detail(self):
+        self._store("haptics/calm.ahap", *Detail.values)
+        body, response = self._get("calm.ahap")
+        self.assertEqual(body, Detail.FULL)
+        self.assertEqual(response[HAPTIC_DETAIL_HEADER], Detail.FULL)
+        self.assertIn("Save-Data", response["Vary"])
+
+    def test_query_parameter_wins_over_header(self):
+        self._store("haptics/calm.ahap", *Detail.values)
+        body, _ = self._get(
+            "calm.ahap",
+            {"detail": Detail.MINIMAL},
+            HTTP_X_HAPTIC_DETAIL=Detail.REDUCED,
+        )
+        self.assertEqual(body, Detail.MINIMAL)
+
+    def test_detail_header(self):
+        self._store("haptics/calm.ahap", *Detail.values)
+        body, response = self._get("calm.ahap", HTTP_X_HAPTIC_DETAIL=Detail.MINIMAL)
+        self.assertEqual(body, Detail.MINIMAL)
+        self.assertEqual(response[HAPTIC_DETAIL_HEADER], Detail.MINIMAL)
+
+    def test_save_data_asks_for_reduced_detail(self):
+        self._store("haptics/calm.ahap", *Detail.values)
+        body, _ = self._get("calm.ahap", HTTP_SAVE_DATA="on")
+        self.assertEqual(body, Detail.REDUCED)
+
+    def test_legacy_meditation_falls_back_to_full_detail(self):
+        self._store("haptics/calm.ahap", Detail.FULL)
+        body, response = self._get("calm.ahap", {"detail": Detail.REDUCED})
+        self.assertEqual(body, Detail.FULL)
+        self.assertEqual(response[HAPTIC_DETAIL_HEADER], Detail.FULL)
+
+    def test_detail_key_path_is_not_detailed_twice(self):
+        self._store("haptics/calm.ahap", *Detail.values)
+        body, response = self._get("calm.reduced.ahap")
+        self.assertEqual(body, Detail.REDUCED)
+        self.assertEqual(response[HAPTIC_DETAIL_HEADER], Detail.REDUCED)
+
+        body, _ = self._get("calm.reduced.ahap", HTTP_X_HAPTIC_DETAIL=Detail.MINIMAL)
+        self.assertEqual(body, Detail.MINIMAL)
+
+    def test_detail_key_path_without_full_detail_asset_is_not_found(self):
+        self._store("haptics/calm.ahap", Detail.REDUCED)
+        url = reverse(HAPTICS_ROUTE_NAME, kwargs={"haptic_path": "calm.reduced.ahap"})
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -12,6 +12,7 @@ from django.http import FileResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import patch_vary_headers
 from django.utils.text import slugify
 from rest_framework import viewsets
 from rest_framework.exceptions import NotFound
@@ -24,6 +25,7 @@ from .serializers import MeditationCreateSerializer, MeditationModelSerializer
 
 AUDIO_ROUTE_NAME = "meditations-audio"
 HAPTICS_ROUTE_NAME = "meditations-haptics"
+HAPTIC_DETAIL_HEADER = "X-Haptic-Detail"
 
 
 def _normalize_asset_key(raw_key: str) -> str:
@@ -158,6 +160,44 @@ def _resolve_model_haptic_asset(haptic_key: str):
     raise NotFound(msg)
 
 
+def _requested_haptic_detail(
+    request, default: str = MeditationHaptic.Detail.FULL
+) -> str:
+    """Read the client's haptic level of detail hint.
+
+    An explicit `?detail=` query parameter wins over the `X-Haptic-Detail`
+    header, then over a non-full `default` (the level named in the URL);
+    otherwise `Save-Data: on` asks for reduced detail. Unknown values fall back
+    to full detail.
+    """
+    requested = (
+        request.query_params.get("detail")
+        or request.headers.get(HAPTIC_DETAIL_HEADER)
+        or ""
+    ).strip().lower()
+    if requested in MeditationHaptic.Detail.values:
+        return requested
+    if default != MeditationHaptic.Detail.FULL:
+        return default
+    if request.headers.get("Save-Data", "").strip().lower() == "on":
+        return MeditationHaptic.Detail.REDUCED
+    return MeditationHaptic.Detail.FULL
+
+
+def _resolve_haptic_detail_asset(haptic_asset: MeditationHaptic, detail: str):
+    """Return the `detail` variant of a full-detail asset, or the asset if missing."""
+    if detail == MeditationHaptic.Detail.FULL:
+        return haptic_asset, MeditationHaptic.Detail.FULL
+
+    detail_asset = MeditationHaptic.objects.filter(
+        haptic_key=MeditationHaptic.detail_key(haptic_asset.haptic_key, detail)
+    ).first()
+    if detail_asset is None:
+        # Meditations generated before levels of detail only have full detail.
+        return haptic_asset, MeditationHaptic.Detail.FULL
+    return detail_asset, detail
+
+
 def _build_meditation_title(description: str) -> str:
     compact_description = " ".join(description.split())
     if not compact_description:
@@ -241,8 +281,19 @@ class MeditationHapticView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, haptic_path: str):
-        haptic_asset = _resolve_model_haptic_asset(haptic_path)
+        # Resolve a level-of-detail path through its full-detail asset, so the
+        # requested level is applied to the base key rather than on top of it.
+        full_detail_path, url_detail = MeditationHaptic.split_detail_key(
+            _normalize_asset_key(haptic_path)
+        )
+        haptic_asset, detail = _resolve_haptic_detail_asset(
+            _resolve_model_haptic_asset(full_detail_path),
+            _requested_haptic_detail(request, default=url_detail),
+        )
         content_type = (
             mimetypes.guess_type(haptic_asset.file.name)[0] or "application/json"
         )
-        return FileResponse(haptic_asset.file.open("rb"), content_type=content_type)
+        response = FileResponse(haptic_asset.file.open("rb"), content_type=content_type)
+        response[HAPTIC_DETAIL_HEADER] = detail
+        patch_vary_headers(response, (HAPTIC_DETAIL_HEADER, "Save-Data"))
+        return response
@@ -0,0 +1,340 @@
+"""Benchmark AHAP generation and flag regressions against a stored baseline.
+
+Runs `convert_wav_to_ahap`, and `analyze_audio_array` on samples already in
+memory, over every WAV in `audio/` and over synthetic long-form tracks (5, 30 and
+60 minutes by default), recording wall time, peak RSS and output event counts per
+case. Each case runs in a fresh interpreter so peak RSS is per case, after
+`warm_up_ahap` so numba JIT compilation is not timed. The AHAP cache is disabled
+for every case.
+
+The committed baseline (`scripts/ahap_benchmark_baseline.json`) checks event
+counts and peak RSS, which hold across machines for the same backend. Wall time
+does not, so it is only compared with `--check-time`, against a baseline recorded
+on the same machine:
+
+    python scripts/benchmark_ahap.py                      # check the committed baseline
+    python scripts/benchmark_ahap.py --save-baseline      # update it after an intended change
+    python scripts/benchmark_ahap.py --baseline .benchmarks/local.json --save-baseline  # on main
+    python scripts/benchmark_ahap.py --baseline .benchmarks/local.json --check-time     # on a branch
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import importlib.util
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+# Ensure the meditation_maker package is importable.
+REPO_ROOT = Path(__file__).resolve().parents[1]
+API_ROOT = REPO_ROOT / "ai-meditation-starter-kit-api"
+sys.path.insert(0, str(API_ROOT))
+
+AUDIO_DIR = REPO_ROOT / "audio"
+DEFAULT_BASELINE = REPO_ROOT / "scripts" / "ahap_benchmark_baseline.json"
+SYNTHETIC_DIR = Path(tempfile.gettempdir()) / "ahap-benchmark"
+SYNTHETIC_SAMPLE_RATE = 44100
+# Longer synthetic tracks only run the streaming converter: a full in-memory
+# STFT of 30+ minutes needs several GB.
+IN_MEMORY_MAX_MINUTES = 5
+_SYNTHETIC_CHUNK_SECONDS = 10
+_BELL_INTERVAL_SECONDS = 8.0
+_BELL_PARTIALS = ((528.0, 1.0), (1122.0, 0.45), (1764.0, 0.25), (2907.0, 0.12))
+
+
+def write_synthetic_track(path: Path, minutes: int, sample_rate: int = SYNTHETIC_SAMPLE_RATE) -> None:
+    """Write a deterministic meditation-like mono track: pad drone, noise bed and bells."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    total_samples = int(minutes * 60 * sample_rate)
+    chunk_samples = _SYNTHETIC_CHUNK_SECONDS * sample_rate
+
+    with wave.open(str(temp_path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        for chunk_index, start in enumerate(range(0, total_samples, chunk_samples)):
+            t = np.arange(start, min(start + chunk_samples, total_samples)) / sample_rate
+            swell = 0.5 + 0.5 * np.sin(2 * np.pi * t / 11.0)
+            signal = 0.12 * swell * (np.sin(2 * np.pi * 110.0 * t) + 0.5 * np.sin(2 * np.pi * 165.0 * t))
+            signal += 0.02 * swell * np.random.default_rng(chunk_index).standard_normal(len(t))
+
+            # Each bell rings for one interval with exponentially decaying partials.
+            since_bell = np.mod(t, _BELL_INTERVAL_SECONDS)
+            envelope = np.exp(-since_bell * 0.9)
+            for frequency, gain in _BELL_PARTIALS:
+                signal += 0.25 * gain * envelope * np.sin(2 * np.pi * frequency * since_bell)
+
+            pcm = np.clip(signal, -1.0, 1.0) * 32767
+            wav_file.writeframes(pcm.astype("<i2").tobytes())
+
+    os.replace(temp_path, path)
+
+
+def synthetic_track(minutes: int) -> Path:
+    """Return the cached synthetic track for `minutes`, writing it on first use."""
+    path = SYNTHETIC_DIR / f"synthetic-{minutes}min.wav"
+    if not path.exists():
+        print(f"Writing {minutes}-minute synthetic track to {path}...")
+        write_synthetic_track(path, minutes)
+    return path
+
+
+def benchmark_cases(paths: list[Path], durations: list[int]) -> list[tuple[str, str, Path]]:
+    """Return `(case name, kind, audio path)` for every corpus file and synthetic track."""
+    cases: list[tuple[str, str, Path]] = []
+    for path in paths:
+        cases.append((f"convert/{path.stem}", "convert", path))
+        cases.append((f"analyze/{path.stem}", "analyze", path))
+    for minutes in durations:
+        name = f"synthetic-{minutes}min"
+        if minutes <= IN_MEMORY_MAX_MINUTES:
+            cases.append((f"convert/{name}", "convert", Path(name)))
+        cases.append((f"convert-streaming/{name}", "convert-streaming", Path(name)))
+    return cases
+
+
+def _event_counts(ahap_data: dict[str, object]) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for entry in ahap_data["Pattern"]:  # type: ignore[union-attr]
+        kind = entry["Event"]["EventType"] if "Event" in entry else next(iter(entry))
+        counts[kind] = counts.get(kind, 0) + 1
+    return counts
+
+
+def _load_mono(path: Path) -> tuple[np.ndarray, int]:
+    """Return mono samples of `path` and their sample rate."""
+    from ai_meditation_starter_kit_api.meditation_maker.ahap import decode_wav_bytes
+
+    decoded = decode_wav_bytes(path.read_bytes())
+    if decoded is None:
+        import librosa
+
+        audio_data, sample_rate = librosa.load(str(path), sr=None, mono=True)
+        return audio_data, int(sample_rate)
+    return decoded
+
+
+def resolved_backend(backend: str) -> str:
+    """Return the backend `auto` picks here, which decides the expected event counts."""
+    if backend != "auto":
+        return backend
+    return "librosa" if importlib.util.find_spec("librosa") is not None else "numpy"
+
+
+def run_case(kind: str, path: Path, mode: str, sample_rate: int, backend: str) -> dict[str, object]:
+    """Run one benchmark case in this process and return its measurements."""
+    # An empty value wins over .env, so no case is served from the AHAP cache.
+    os.environ["AHAP_CACHE_DIR"] = ""
+
+    from ai_meditation_starter_kit_api.meditation_maker.ahap import (
+        analyze_audio_array,
+        build_ahap,
+        convert_wav_to_ahap,
+        warm_up_ahap,
+    )
+
+    warm_up_ahap(sample_rate, backend)
+
+    if kind == "analyze":
+        audio_data, source_sample_rate = _load_mono(path)
+        started = time.perf_counter()
+        events = analyze_audio_array(audio_data, source_sample_rate, mode, sample_rate=sample_rate, backend=backend)
+        ahap_data = build_ahap(events, "none")
+        seconds = time.perf_counter() - started
+    else:
+        with tempfile.TemporaryDirectory() as output_dir:
+            started = time.perf_counter()
+            output_files = convert_wav_to_ahap(
+                str(path),
+                output_dir,
+                mode,
+                "none",
+                sample_rate=sample_rate,
+                streaming=kind == "convert-streaming",
+                backend=backend,
+            )
+            seconds = time.perf_counter() - started
+            ahap_data = json.loads(Path(output_files[0]).read_text())
+
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+    return {"seconds": seconds, "peak_rss_mb": peak_rss_mb, "events": _event_counts(ahap_data)}
+
+
+def measure(kind: str, path: Path, args: argparse.Namespace) -> dict[str, object]:
+    """Run one case in a fresh interpreter; return its measurements or an error."""
+    command = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--run-case",
+        kind,
+        str(path),
+        "--mode",
+        args.mode,
+        "--sample-rate",
+        str(args.sample_rate),
+        "--backend",
+        args.backend,
+    ]
+    result = subprocess.run(command, capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        error_lines = result.stderr.strip().splitlines()
+        return {"error": error_lines[-1] if error_lines else f"exit code {result.returncode}"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def find_regressions(
+    current: dict[str, object],
+    baseline: dict[str, object],
+    time_tolerance: float | None,
+    rss_tolerance: float,
+) -> list[str]:
+    """Describe every way `current` is worse than (or differs in output from) `baseline`.
+
+    Wall time is only compared when `time_tolerance` is given.
+    """
+    problems: list[str] = []
+    if time_tolerance is not None:
+        time_limit = float(baseline["seconds"]) * (1 + time_tolerance)  # type: ignore[arg-type]
+        if float(current["seconds"]) > time_limit:  # type: ignore[arg-type]
+            problems.append(f"time {current['seconds']:.2f}s vs {baseline['seconds']:.2f}s baseline")
+    rss_limit = float(baseline["peak_rss_mb"]) * (1 + rss_tolerance)  # type: ignore[arg-type]
+    if float(current["peak_rss_mb"]) > rss_limit:  # type: ignore[arg-type]
+        problems.append(f"RSS {current['peak_rss_mb']:.0f} MB vs {baseline['peak_rss_mb']:.0f} MB baseline")
+    if current["events"] != baseline["events"]:
+        problems.append(f"events {current['events']} vs {baseline['events']} baseline")
+    return problems
+
+
+def _format_events(events: dict[str, int]) -> str:
+    return " ".join(f"{kind.removeprefix('Haptic')}={count}" for kind, count in sorted(events.items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark AHAP generation and flag regressions.")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="WAV files to benchmark (defaults to every WAV in audio/).",
+    )
+    parser.add_argument(
+        "--durations",
+        nargs="*",
+        type=int,
+        default=[5, 30, 60],
+        help="Synthetic long-form track lengths in minutes (pass none to skip).",
+    )
+    parser.add_argument("--cases", default="*", help="Only run cases matching this glob, e.g. 'convert/*'.")
+    parser.add_argument("--mode", default="sfx", help="Haptic mode passed to the analyzer.")
+    parser.add_argument("--sample-rate", type=int, default=44100, help="Analysis sample rate.")
+    parser.add_argument("--backend", default="auto", help="Analysis backend: auto, librosa or numpy.")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per case; the fastest time counts.")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    parser.add_argument(
+        "--check-time",
+        action="store_true",
+        help="Also compare wall time; only meaningful against a baseline recorded on this machine.",
+    )
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="Allowed wall-time increase.")
+    parser.add_argument("--rss-tolerance", type=float, default=0.20, help="Allowed peak-RSS increase.")
+    parser.add_argument("--run-case", nargs=2, metavar=("KIND", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        kind, path = args.run_case
+        print(json.dumps(run_case(kind, Path(path), args.mode, args.sample_rate, args.backend)))
+        return
+
+    paths = args.paths or sorted(AUDIO_DIR.glob("*.wav"))
+    cases = [case for case in benchmark_cases(paths, args.durations) if fnmatch.fnmatch(case[0], args.cases)]
+    if not cases:
+        print("ERROR: No benchmark cases selected.")
+        sys.exit(1)
+
+    backend = resolved_backend(args.backend)
+    baseline_cases: dict[str, dict[str, object]] = {}
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if (baseline["backend"], baseline["sample_rate"], baseline["mode"]) != (
+            backend,
+            args.sample_rate,
+            args.mode,
+        ):
+            print(
+                f"ERROR: {args.baseline} was recorded with backend={baseline['backend']} "
+                f"sample_rate={baseline['sample_rate']} mode={baseline.get('mode', 'sfx')}; "
+                "pass matching options or another --baseline."
+            )
+            sys.exit(1)
+        baseline_cases = baseline["cases"]
+    time_tolerance = args.time_tolerance if args.check_time else None
+
+    print(f"{'case':58} {'seconds':>8} {'RSS MB':>7}  events")
+    results: dict[str, dict[str, object]] = {}
+    failures = 0
+    for name, kind, path in cases:
+        if path.name.startswith("synthetic-"):
+            path = synthetic_track(int(path.name.removeprefix("synthetic-").removesuffix("min")))
+
+        samples = [measure(kind, path, args) for _ in range(max(args.repeat, 1))]
+        errors = [sample["error"] for sample in samples if "error" in sample]
+        if errors:
+            failures += 1
+            print(f"{name:58} ERROR  {errors[0]}")
+            continue
+
+        current = {
+            "seconds": min(float(sample["seconds"]) for sample in samples),  # type: ignore[arg-type]
+            "peak_rss_mb": max(float(sample["peak_rss_mb"]) for sample in samples),  # type: ignore[arg-type]
+            "events": samples[0]["events"],
+        }
+        results[name] = current
+
+        problems: list[str] = []
+        if name in baseline_cases:
+            problems = find_regressions(current, baseline_cases[name], time_tolerance, args.rss_tolerance)
+        failures += bool(problems)
+        status = f"  REGRESSION: {'; '.join(problems)}" if problems else ""
+        print(
+            f"{name:58} {current['seconds']:>8.2f} {current['peak_rss_mb']:>7.0f}  "
+            f"{_format_events(current['events'])}{status}"  # type: ignore[arg-type]
+        )
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "machine": platform.platform(),
+            "python": platform.python_version(),
+            "sample_rate": args.sample_rate,
+            "mode": args.mode,
+            "backend": backend,
+            "cases": results,
+        }
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n")
+        print(f"\nSaved baseline for {len(results)} case(s) to {args.baseline}")
+    elif not baseline_cases:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one.")
+
+    if failures:
+        print(f"\n{failures} case(s) failed or regressed.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,14 @@
 """Generate a basic meditation using ElevenLabs TTS and SFX.
 
 Produces WAV audio files and a meditation JSON definition. AHAP haptic files
-are generated afterward if librosa is available.
+are generated afterward, with librosa when it is installed and the pure-NumPy
+analysis backend otherwise.
 """
 
 from __future__ import annotations
 
 import json
 import sys
-import wave
 from pathlib import Path
 
 # Ensure the meditation_maker package is importable.
@@ -16,6 +16,7 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 API_ROOT = REPO_ROOT / "ai-meditation-starter-kit-api"
 sys.path.insert(0, str(API_ROOT))
 
+from ai_meditation_starter_kit_api.meditation_maker.audio_decoding import read_wav_info
 from ai_meditation_starter_kit_api.meditation_maker.elevenlabs_tts import (
     generate_tts_audio_elevenlabs,
 )
@@ -42,14 +43,8 @@ SEGMENTS = [
 
 
 def _wav_duration_ms(path: Path) -> int:
-    with wave.open(str(path), "rb") as wf:
-        rate = wf.getframerate()
-        channels = wf.getnchannels()
-        sampwidth = wf.getsampwidth()
-        # nframes can be INT32_MAX when WAV was written via pipe; derive from file size.
-        data_bytes = path.stat().st_size - 44  # 44-byte WAV header
-        frames = data_bytes // (channels * sampwidth)
-        return int(frames / rate * 1000)
+    # read_wav_info also measures older files whose header was written via a pipe.
+    return read_wav_info(path).duration_ms
 
 
 def main() -> None:
@@ -151,14 +146,22 @@ def main() -> None:
 
     # Generate AHAP haptic files from audio.
     try:
-        from ai_meditation_starter_kit_api.meditation_maker.ahap import (
-            convert_wav_to_ahap,
+        from ai_meditation_starter_kit_api.meditation_maker.ahap_batch import (
+            convert_wavs_to_ahap,
         )
 
         print("\nGenerating AHAP haptic files...")
-        for name, path in audio_files.items():
-            print(f"  Processing {name}...")
-            convert_wav_to_ahap(str(path), str(HAPTICS_DIR), mode="sfx", split="none")
+        results = convert_wavs_to_ahap(
+            [str(path) for path in audio_files.values()],
+            str(HAPTICS_DIR),
+            mode="sfx",
+            split="none",
+        )
+        for name, result in zip(audio_files, results):
+            if not result.success:
+                print(f"  ERROR: AHAP generation failed for '{name}': {result.error}")
+                sys.exit(1)
+            print(f"  Processed {name} ({result.seconds:.1f}s)")
         print("AHAP generation complete.")
 
         # Add AHAP entries to the timeline.
@@ -187,8 +190,8 @@ def main() -> None:
         print("Updated meditation JSON with AHAP entries.")
 
     except ImportError:
-        print("\nlibrosa not available — skipping AHAP generation.")
-        print("Run with a venv that has librosa to generate haptics.")
+        print("\nAHAP dependencies not available — skipping AHAP generation.")
+        print("Run with a venv that has numpy to generate haptics.")
 
 
 if __name__ == "__main__":
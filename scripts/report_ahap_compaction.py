@@ -0,0 +1,66 @@
+"""Report AHAP size versus fidelity for compact output.
+
+Analyzes each WAV file once and compares the default AHAP output with the
+compact output (minified JSON, bounded float precision, merged continuous
+events and parameter curves).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure the meditation_maker package is importable.
+REPO_ROOT = Path(__file__).resolve().parents[1]
+API_ROOT = REPO_ROOT / "ai-meditation-starter-kit-api"
+sys.path.insert(0, str(API_ROOT))
+
+from ai_meditation_starter_kit_api.meditation_maker.ahap import (
+    analyze_audio_file,
+    compaction_report,
+)
+
+AUDIO_DIR = REPO_ROOT / "audio"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare full and compact AHAP output.")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="WAV files to analyze (defaults to every WAV in audio/).",
+    )
+    parser.add_argument("--mode", default="sfx", help="Haptic mode passed to the analyzer.")
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(AUDIO_DIR.glob("*.wav"))
+    if not paths:
+        print(f"ERROR: No WAV files found in {AUDIO_DIR}")
+        sys.exit(1)
+
+    print(
+        f"{'file':48} {'full':>9} {'compact':>9} {'ratio':>6} "
+        f"{'entries':>11} {'curves':>6} {'int err max/mean':>17} {'shp err max/mean':>17}"
+    )
+    total_full = 0
+    total_compact = 0
+    for path in paths:
+        events = analyze_audio_file(str(path), args.mode)
+        report = compaction_report(events)
+        total_full += report.full_bytes
+        total_compact += report.compact_bytes
+        print(
+            f"{path.name:48} {report.full_bytes:>9} {report.compact_bytes:>9} {report.size_ratio:>6.1%} "
+            f"{report.full_entries:>5}->{report.compact_entries:<5} {report.parameter_curves:>6} "
+            f"{report.max_intensity_error:>8.3f}/{report.mean_intensity_error:<8.3f} "
+            f"{report.max_sharpness_error:>8.3f}/{report.mean_sharpness_error:<8.3f}"
+        )
+
+    ratio = total_compact / total_full if total_full else 1.0
+    print(f"\nTotal: {total_full} -> {total_compact} bytes ({ratio:.1%})")
+
+
+if __name__ == "__main__":
+    main()
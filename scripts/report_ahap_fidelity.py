@@ -0,0 +1,93 @@
+"""Report AHAP fidelity and speed of reduced analysis sample rates.
+
+Analyzes each WAV file at the full 44.1 kHz rate and at each candidate rate,
+then compares onset timing, onset intensity/sharpness, haptic modes and the
+continuous envelope against the full-rate events.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure the meditation_maker package is importable.
+REPO_ROOT = Path(__file__).resolve().parents[1]
+API_ROOT = REPO_ROOT / "ai-meditation-starter-kit-api"
+sys.path.insert(0, str(API_ROOT))
+
+from ai_meditation_starter_kit_api.meditation_maker.ahap import (
+    FAST_ANALYSIS_SAMPLE_RATE,
+    analyze_audio_file,
+    fidelity_report,
+)
+
+AUDIO_DIR = REPO_ROOT / "audio"
+FULL_SAMPLE_RATE = 44100
+
+
+def _timed_analysis(path: Path, mode: str, sample_rate: int):  # type: ignore[no-untyped-def]
+    started = time.perf_counter()
+    events = analyze_audio_file(str(path), mode, sample_rate=sample_rate)
+    return events, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare reduced-rate AHAP analysis with full-rate output.")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="WAV files to analyze (defaults to every WAV in audio/).",
+    )
+    parser.add_argument(
+        "--rates",
+        nargs="+",
+        type=int,
+        default=[FAST_ANALYSIS_SAMPLE_RATE, 16000],
+        help="Candidate analysis sample rates.",
+    )
+    parser.add_argument("--mode", default="sfx", help="Haptic mode passed to the analyzer.")
+    parser.add_argument("--tolerance", type=float, default=0.025, help="Onset match tolerance in seconds.")
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(AUDIO_DIR.glob("*.wav"))
+    if not paths:
+        print(f"ERROR: No WAV files found in {AUDIO_DIR}")
+        sys.exit(1)
+
+    # Warm up librosa/numba so the first file's timing is not dominated by JIT compilation.
+    _timed_analysis(paths[0], args.mode, FULL_SAMPLE_RATE)
+
+    print(
+        f"{'file':44} {'rate':>6} {'onsets':>9} {'recall':>6} {'prec':>6} {'dt ms':>6} {'modes':>6} "
+        f"{'onset i/s max':>13} {'cont i max/mean':>15} {'cont s max/mean':>15} {'speedup':>7}"
+    )
+    total_full = 0.0
+    total_candidate = {rate: 0.0 for rate in args.rates}
+    for path in paths:
+        reference, full_seconds = _timed_analysis(path, args.mode, FULL_SAMPLE_RATE)
+        total_full += full_seconds
+        for rate in args.rates:
+            candidate, seconds = _timed_analysis(path, args.mode, rate)
+            total_candidate[rate] += seconds
+            report = fidelity_report(reference, candidate, onset_tolerance=args.tolerance)
+            print(
+                f"{path.name:44} {rate:>6} {report.reference_onsets:>4}/{report.candidate_onsets:<4} "
+                f"{report.onset_recall:>6.1%} {report.onset_precision:>6.1%} "
+                f"{report.mean_timing_error * 1000:>6.1f} {report.mode_agreement:>6.1%} "
+                f"{report.max_onset_intensity_error:>6.3f}/{report.max_onset_sharpness_error:<6.3f} "
+                f"{report.max_intensity_error:>7.3f}/{report.mean_intensity_error:<7.3f} "
+                f"{report.max_sharpness_error:>7.3f}/{report.mean_sharpness_error:<7.3f} "
+                f"{full_seconds / seconds if seconds else 0.0:>6.1f}x"
+            )
+
+    print(f"\nFull rate ({FULL_SAMPLE_RATE} Hz): {total_full:.2f}s")
+    for rate, seconds in total_candidate.items():
+        speedup = total_full / seconds if seconds else 0.0
+        print(f"{rate} Hz: {seconds:.2f}s ({speedup:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
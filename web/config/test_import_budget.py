@@ -0,0 +1,125 @@
+"""Cold import cost of the web and worker entry points.
+
+Each entry point is imported in a fresh interpreter under `python -X importtime`.
+The default run fails when an entry point loads the scientific stack (which
+only AHAP generation needs). The millisecond budgets depend on the host and its
+disk cache, so they are only checked with `IMPORT_BUDGET_CHECK=1`;
+`IMPORT_BUDGET_SCALE` multiplies every budget on slow hosts.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+WEB_ROOT = Path(__file__).resolve().parents[1]
+# Sibling checkout of the package; in the Docker image it is pip-installed instead.
+API_ROOT = WEB_ROOT.parent / "ai-meditation-starter-kit-api"
+
+# Modules that only AHAP generation needs; none of them may load at import time.
+AHAP_MODULES = ("librosa", "numba", "scipy", "soundfile", "sklearn")
+
+# name -> (statements to time, budget in ms, forbidden modules, needs Django)
+ENTRY_POINTS = {
+    "meditation_maker": (
+        "import ai_meditation_starter_kit_api.meditation_maker",
+        300,
+        (*AHAP_MODULES, "numpy"),
+        False,
+    ),
+    # Django apps may pull numpy in on their own (pgvector, langchain), so only the
+    # AHAP-only modules are checked here.
+    "web": (
+        "import django; django.setup(); import config.urls; "
+        "import ai_meditation_starter_kit_api.meditations.tasks.generate_meditation_assets",
+        4000,
+        AHAP_MODULES,
+        True,
+    ),
+    "worker": (
+        "import config.taskiq_config; import config.taskiq_tasks",
+        4000,
+        AHAP_MODULES,
+        True,
+    ),
+}
+
+RUNS = 3
+_MARKER = "import-budget-start"
+
+
+def _imports(statements: str, *, needs_django: bool) -> dict[str, int]:
+    """Return microseconds spent importing each top-level module `statements` imports."""
+    env = dict(os.environ)
+    paths = [
+        str(WEB_ROOT),
+        str(API_ROOT) if API_ROOT.is_dir() else "",
+        env.get("PYTHONPATH", ""),
+    ]
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, paths))
+    if needs_django:
+        env.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+    # Interpreter start-up imports are logged too; the marker separates them from ours.
+    probe = f"import sys; sys.stderr.write({_MARKER!r} + '\\n'); " + statements
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=WEB_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr.strip().splitlines()[-1:]
+
+    imports: dict[str, int] = {}
+    started = False
+    for line in result.stderr.splitlines():
+        if line == _MARKER:
+            started = True
+            continue
+        if not started or not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if not cumulative.strip().isdigit():
+            continue  # the column header
+        # Nested imports are indented under the module that triggered them.
+        if name.startswith("  "):
+            imports.setdefault(name.strip(), 0)
+        else:
+            imports[name.strip()] = imports.get(name.strip(), 0) + int(cumulative)
+    return imports
+
+
+@pytest.mark.parametrize("entry_point", list(ENTRY_POINTS))
+def test_entry_point_loads_no_ahap_modules(entry_point: str) -> None:
+    statements, _, forbidden, needs_django = ENTRY_POINTS[entry_point]
+    loaded = {
+        name.partition(".")[0]
+        for name in _imports(statements, needs_django=needs_django)
+    }
+    assert not loaded & set(
+        forbidden
+    ), f"{entry_point} loaded {', '.join(sorted(loaded & set(forbidden)))}"
+
+
+@pytest.mark.exploratory
+@pytest.mark.skipif(
+    os.getenv("IMPORT_BUDGET_CHECK") != "1",
+    reason="import timing depends on the host; set IMPORT_BUDGET_CHECK=1 to run",
+)
+@pytest.mark.parametrize("entry_point", list(ENTRY_POINTS))
+def test_entry_point_import_budget(entry_point: str) -> None:
+    statements, budget_ms, _, needs_django = ENTRY_POINTS[entry_point]
+    budget_ms *= float(os.getenv("IMPORT_BUDGET_SCALE", "1"))
+
+    samples = [_imports(statements, needs_django=needs_django) for _ in range(RUNS)]
+    # Only top-level imports carry a time, so the sum is the entry point's total.
+    elapsed_ms = min(sum(sample.values()) for sample in samples) / 1000
+    assert (
+        elapsed_ms <= budget_ms
+    ), f"{entry_point} took {elapsed_ms:.0f} ms to import (budget {budget_ms:.0f} ms)"